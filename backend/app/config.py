@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, Any, List, Literal
 
 
 class Settings(BaseSettings):
@@ -12,11 +13,125 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: str
     OLLAMA_MODEL: str = "qwen2-vl:latest"
     
+    # Per-task model routing. Tasks missing from the map use OLLAMA_MODEL, so
+    # text-only jobs can be pointed at a small model, e.g.
+    # OLLAMA_TASK_MODELS='{"concepts": "qwen2.5:3b", "weak_topics": "qwen2.5:3b"}'
+    # Tasks: vision, summary, page_insights, explanation, concepts, quiz, weak_topics, analysis,
+    # chat, chat_summary,
+    # embedding (defaults to OLLAMA_EMBEDDING_MODEL rather than OLLAMA_MODEL)
+    OLLAMA_TASK_MODELS: Dict[str, str] = {}
+    OLLAMA_EMBEDDING_MODEL: str = "nomic-embed-text"
+    
+    # Per-task generation options merged over OLLAMA_DEFAULT_OPTIONS
+    OLLAMA_DEFAULT_OPTIONS: Dict[str, Any] = {
+        "temperature": 0.7,
+        "top_p": 0.9
+    }
+    OLLAMA_TASK_OPTIONS: Dict[str, Dict[str, Any]] = {
+        "vision": {"temperature": 0.1, "num_predict": 2048},
+        "summary": {"temperature": 0.5, "num_predict": 1024},
+        "page_insights": {"temperature": 0.3, "num_predict": 384},
+        "explanation": {"num_predict": 2048},
+        "concepts": {"temperature": 0.2, "num_predict": 256},
+        "quiz": {"num_predict": 4096},
+        "weak_topics": {"temperature": 0.3, "num_predict": 128},
+        "analysis": {"temperature": 0.5, "num_predict": 3072},
+        "chat": {"temperature": 0.3, "num_predict": 1024},
+        "chat_summary": {"temperature": 0.2, "num_predict": 256}
+    }
+    
+    # Strip headers/footers, page numbers and extraction artifacts before prompting
+    TEXT_NORMALIZATION: bool = True
+    
+    # Token-aware chunking, computed once per document and stored with it
+    CHUNK_MAX_TOKENS: int = 512
+    CHUNK_OVERLAP_TOKENS: int = 64
+    
+    # Prompt input budgets (estimated tokens of document text) per task
+    PROMPT_TOKEN_BUDGETS: Dict[str, int] = {
+        "explanation": 2000,
+        "concepts": 1500,
+        "quiz": 1500,
+        "page_insights": 1000,
+        "weak_topics": 250,
+        "chat": 2000,
+        "chat_summary": 1500
+    }
+    
+    # Quiz generation: one small prompt per document segment, run in parallel
+    QUIZ_QUESTIONS_PER_SEGMENT: int = 3
+    QUIZ_MAX_SEGMENTS: int = 8
+    QUIZ_PARALLEL_PROMPTS: int = 4
+    
+    # Question bank: pre-generated questions that quiz creation samples from
+    QUESTION_BANK_TARGET: int = 20  # unused questions kept per document and difficulty
+    QUESTION_BANK_LOW_WATERMARK: int = 10  # refill in the background below this
+    QUESTION_BANK_RECENT_QUIZZES: int = 5  # a user's latest quizzes whose questions are not reused
+    QUESTION_BANK_SEED_DIFFICULTIES: List[str] = ["easy", "medium", "hard"]
+    
+    # Near-duplicate question detection (MinHash + LSH over question and option text)
+    MINHASH_PERMUTATIONS: int = 64
+    MINHASH_BANDS: int = 16
+    QUESTION_DUPLICATE_THRESHOLD: float = 0.6  # estimated Jaccard similarity
+    QUESTION_REPLACEMENT_ROUNDS: int = 2  # re-requests for slots lost to duplicates
+    
+    # Weak topics: ranked page focus topics of wrong answers, optionally refined by the LLM
+    WEAK_TOPICS_MAX: int = 5
+    WEAK_TOPICS_LLM_REFINEMENT: bool = False
+    TOPIC_MASTERY_DECAY: float = 0.3  # weight of each new answer in the topic mastery average
+    
+    # Document Q&A chat
+    CHAT_RETRIEVAL_CHUNKS: int = 4
+    CHAT_RECENT_MESSAGES: int = 6  # verbatim messages kept before folding into the summary
+    CHAT_RETRIEVAL_CACHE_SIZE: int = 32  # cached query -> chunks entries per conversation
+    
+    # Semantic search over chunks and page summaries
+    SEMANTIC_SEARCH_ENABLED: bool = True
+    EMBEDDING_BATCH_SIZE: int = 32
+    VECTOR_IVF_THRESHOLD: int = 20000  # vectors per user before switching to an IVF index
+    VECTOR_IVF_NPROBE: int = 8
+    VECTOR_INDEX_CACHE_USERS: int = 64
+    
+    # Ollama resilience
+    OLLAMA_TIMEOUT: float = 120.0
+    OLLAMA_MAX_RETRIES: int = 2
+    OLLAMA_RETRY_BASE_DELAY: float = 0.5
+    OLLAMA_RETRY_MAX_DELAY: float = 8.0
+    OLLAMA_BREAKER_FAILURE_THRESHOLD: int = 5
+    OLLAMA_BREAKER_RESET_SECONDS: float = 30.0
+    
+    # Deadlines (seconds) for AI work started by interactive requests, background jobs
+    # and streamed responses (which keep the client informed while they run)
+    AI_INTERACTIVE_DEADLINE: float = 45.0
+    AI_BACKGROUND_DEADLINE: float = 1800.0
+    AI_STREAM_DEADLINE: float = 180.0
+    AI_ENRICHMENT_DEADLINE: float = 180.0
+    
+    # Easy explanation + Wikipedia context: "eager" builds them while processing
+    # every upload, "lazy" builds them on the first GET /api/documents/{id}/enrichment
+    DOCUMENT_ENRICHMENT_MODE: Literal["eager", "lazy"] = "lazy"
+    
+    # Produce summary, key concepts (and eager easy explanation) from one prompt
+    # instead of one prompt each; falls back per field when the JSON is unusable
+    AI_COMBINED_ANALYSIS: bool = False
+    
     # JWT Authentication
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     
+    def model_for_task(self, task: str = None) -> str:
+        """Resolve the Ollama model used for a task."""
+        if task == "embedding":
+            return self.OLLAMA_TASK_MODELS.get(task) or self.OLLAMA_EMBEDDING_MODEL
+        return self.OLLAMA_TASK_MODELS.get(task) or self.OLLAMA_MODEL
+    
+    def options_for_task(self, task: str = None) -> Dict[str, Any]:
+        """Resolve the Ollama generation options used for a task."""
+        options = dict(self.OLLAMA_DEFAULT_OPTIONS)
+        options.update(self.OLLAMA_TASK_OPTIONS.get(task, {}))
+        return options
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -22,6 +22,26 @@ async def connect_to_mongo():
     except Exception as e:
         print(f"❌ MongoDB connection error: {e}")
         raise e
+    
+    await create_indexes()
+
+
+async def create_indexes():
+    """Ensure indexes used by query hot paths exist (no-op if already present)."""
+    await db.search_postings.create_index([("user_id", 1), ("term", 1)])
+    await db.search_postings.create_index("document_id")
+    await db.search_documents.create_index("user_id")
+    await db.search_documents.create_index("document_id", unique=True)
+    await db.embeddings.create_index([("user_id", 1), ("document_id", 1), ("part", 1)])
+    await db.embeddings.create_index("document_id")
+    await db.review_items.create_index([("user_id", 1), ("due_at", 1)])
+    await db.review_items.create_index([("user_id", 1), ("quiz_id", 1), ("question_id", 1)], unique=True)
+    await db.topic_mastery.create_index([("user_id", 1), ("topic_key", 1)], unique=True)
+    await db.topic_mastery.create_index([("user_id", 1), ("mastery", 1)])
+    await db.daily_activity.create_index([("user_id", 1), ("day", 1)], unique=True)
+    await db.quiz_results.create_index([("user_id", 1), ("completed_at", -1)])
+    await db.question_bank.create_index([("document_id", 1), ("difficulty", 1)])
+    await db.conversations.create_index([("user_id", 1), ("document_id", 1)])
 
 
 async def close_mongo_connection():
@@ -56,3 +76,39 @@ def get_quiz_results_collection():
 
 def get_progress_collection():
     return db.learning_progress
+
+
+def get_search_postings_collection():
+    return db.search_postings
+
+
+def get_search_documents_collection():
+    return db.search_documents
+
+
+def get_embeddings_collection():
+    return db.embeddings
+
+
+def get_conversations_collection():
+    return db.conversations
+
+
+def get_question_bank_collection():
+    return db.question_bank
+
+
+def get_user_stats_collection():
+    return db.user_stats
+
+
+def get_daily_activity_collection():
+    return db.daily_activity
+
+
+def get_topic_mastery_collection():
+    return db.topic_mastery
+
+
+def get_review_items_collection():
+    return db.review_items
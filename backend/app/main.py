@@ -4,8 +4,10 @@ from contextlib import asynccontextmanager
 import time
 
 from app.database import connect_to_mongo, close_mongo_connection
-from app.routers import auth, documents, quiz, progress
+from app.routers import auth, documents, quiz, progress, search, chat, review, dashboard
+from app.services.ai_service import ai_service
 from app.utils.logger import logger, log_request, log_startup
+from app.utils.serializers import FastJSONResponse
 
 
 @asynccontextmanager
@@ -27,7 +29,8 @@ app = FastAPI(
     title="Education Dashboard API",
     description="AI-powered educational platform with document processing, quiz generation, and learning analytics",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 
@@ -60,6 +63,10 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(documents.router, prefix="/api/documents", tags=["Documents"])
 app.include_router(quiz.router, prefix="/api/quiz", tags=["Quiz & Exams"])
 app.include_router(progress.router, prefix="/api/progress", tags=["Learning Progress"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
+app.include_router(review.router, prefix="/api/review", tags=["Review"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 
 
 @app.get("/", tags=["Health"])
@@ -75,8 +82,16 @@ async def root():
 @app.get("/api/health", tags=["Health"])
 async def health_check():
     """Detailed health check."""
+    breaker = ai_service.breaker.snapshot()
+    ai_status = {
+        "closed": "available",
+        "half_open": "recovering",
+        "open": "unavailable"
+    }[breaker["state"]]
+    
     return {
-        "status": "healthy",
+        "status": "healthy" if ai_status == "available" else "degraded",
         "database": "connected",
-        "ai_service": "available"
+        "ai_service": ai_status,
+        "ai_circuit": breaker
     }
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
+from datetime import datetime
+
+
+class ChatRequest(BaseModel):
+    """A question about a document, optionally continuing a conversation."""
+    message: str = Field(..., min_length=1, max_length=2000)
+    conversation_id: Optional[str] = None
+
+
+class ChatMessage(BaseModel):
+    """A single chat message."""
+    role: Literal["user", "assistant"]
+    content: str
+
+
+class ConversationResponse(BaseModel):
+    """Stored state of a document conversation."""
+    id: str
+    document_id: str
+    summary: str = ""
+    messages: List[ChatMessage] = []
+    turn_count: int = 0
+    created_at: datetime
+    updated_at: datetime
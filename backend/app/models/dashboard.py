@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+
+from app.models.document import ProcessingStatus
+from app.models.progress import ProgressOverview
+from app.models.user import UserResponse
+
+
+class DashboardDocument(BaseModel):
+    """Recent document card (no content or AI output)."""
+    id: str
+    title: str
+    file_type: str
+    processing_status: ProcessingStatus
+    created_at: datetime
+
+
+class DashboardResult(BaseModel):
+    """Recent exam result row (no graded answers)."""
+    id: str
+    quiz_title: str
+    difficulty: str
+    score_percentage: float
+    correct_answers: int
+    total_questions: int
+    completed_at: datetime
+
+
+class DashboardResponse(BaseModel):
+    """Everything the dashboard renders, in one response."""
+    user: UserResponse
+    overview: ProgressOverview
+    recent_documents: List[DashboardDocument]
+    recent_results: List[DashboardResult]
@@ -34,6 +34,17 @@ class WikiContext(BaseModel):
     url: str
 
 
+class NormalizationStats(BaseModel):
+    """Text removed by normalization before prompting."""
+    chars_before: int
+    chars_after: int
+    chars_saved: int
+    tokens_before: int
+    tokens_after: int
+    tokens_saved: int
+    boilerplate_lines_removed: int = 0
+
+
 class DocumentResponse(BaseModel):
     """Document response model."""
     id: str
@@ -48,11 +59,19 @@ class DocumentResponse(BaseModel):
     key_concepts: List[str] = []
     wiki_context: List[WikiContext] = []
     page_count: int = 0
+    normalization_stats: Optional[NormalizationStats] = None
     processing_status: ProcessingStatus = ProcessingStatus.PENDING
     created_at: datetime
     updated_at: datetime
 
 
+class DocumentEnrichmentResponse(BaseModel):
+    """On-demand easy explanation and Wikipedia context for a document."""
+    document_id: str
+    easy_explanation: Optional[str] = None
+    wiki_context: List[WikiContext] = []
+
+
 class DocumentListResponse(BaseModel):
     """List of documents response."""
     documents: List[DocumentResponse]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Literal
 from datetime import datetime, date
 
 
@@ -21,6 +21,14 @@ class TopicProgress(BaseModel):
     mastery_level: float  # 0-100%
 
 
+class DifficultyStat(BaseModel):
+    """Quiz results for one difficulty level."""
+    difficulty: str
+    quizzes_taken: int = 0
+    average_score: float = 0.0
+    total_time: int = 0  # minutes
+
+
 class Achievement(BaseModel):
     """User achievement."""
     type: str
@@ -35,6 +43,7 @@ class LearningProgressResponse(BaseModel):
     daily_stats: List[DailyStat] = []
     topic_progress: List[TopicProgress] = []
     achievements: List[Achievement] = []
+    difficulty_breakdown: List[DifficultyStat] = []
     
     # Aggregated stats
     total_study_time: int = 0
@@ -53,3 +62,44 @@ class ProgressOverview(BaseModel):
     average_score: float
     study_streak: int
     recent_activity: List[DailyStat]
+
+
+# Analytics
+class ScoreTrendPoint(BaseModel):
+    """Results within one day/week/month."""
+    period_start: datetime
+    quizzes_taken: int
+    average_score: float
+    study_time: int  # minutes
+
+
+class ScoreTrendResponse(BaseModel):
+    """Score trend over time."""
+    window: Literal["day", "week", "month"]
+    points: List[ScoreTrendPoint]
+
+
+class DifficultyAnalytics(BaseModel):
+    """Results for one difficulty level."""
+    difficulty: str
+    quizzes_taken: int
+    average_score: float
+    accuracy: float  # % of questions answered correctly
+
+
+class DocumentMastery(BaseModel):
+    """Results for one document."""
+    document_id: str
+    title: Optional[str] = None
+    attempts: int
+    average_score: float
+    best_score: float
+    mastery: float  # % of questions answered correctly
+    last_attempt: datetime
+
+
+class ScoreBucket(BaseModel):
+    """Number of results within a score band."""
+    min_score: int
+    max_score: int
+    count: int
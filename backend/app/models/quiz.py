@@ -10,6 +10,12 @@ class Difficulty(str, Enum):
     HARD = "hard"
 
 
+class AnalysisStatus(str, Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class QuizOption(BaseModel):
     """Quiz question option."""
     option_id: str  # A, B, C, D
@@ -75,8 +81,8 @@ class AnswerDetail(BaseModel):
     explanation: str
 
 
-class ExamResultResponse(BaseModel):
-    """Exam result response."""
+class ExamResultSummary(BaseModel):
+    """Exam result without its graded answers."""
     id: str
     user_id: str
     quiz_id: str
@@ -88,12 +94,24 @@ class ExamResultResponse(BaseModel):
     score_percentage: float
     time_taken: int
     difficulty: Difficulty
-    answers: List[AnswerDetail]
     weak_topics: List[str] = []
+    weak_topics_status: AnalysisStatus = AnalysisStatus.COMPLETED
     completed_at: datetime
 
 
+class ExamResultResponse(ExamResultSummary):
+    """Exam result response."""
+    answers: List[AnswerDetail]
+
+
+class WeakTopicsResponse(BaseModel):
+    """Weak topic analysis state of an exam result."""
+    result_id: str
+    status: AnalysisStatus
+    weak_topics: List[str] = []
+
+
 class ExamResultListResponse(BaseModel):
     """List of exam results."""
-    results: List[ExamResultResponse]
+    results: List[ExamResultSummary]
     total: int
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+from app.models.quiz import QuizQuestion
+
+
+class ReviewItem(BaseModel):
+    """A question due for review (answers stripped)."""
+    id: str
+    document_id: str
+    quiz_id: str
+    question: QuizQuestion
+    repetitions: int
+    due_at: datetime
+
+
+class ReviewQueueResponse(BaseModel):
+    """Review items due now."""
+    items: List[ReviewItem]
+    total_due: int
+
+
+class ReviewAnswer(BaseModel):
+    """Answer to one review item."""
+    item_id: str
+    selected_answer: str  # A, B, C, or D
+
+
+class ReviewSubmission(BaseModel):
+    """A batch of review answers."""
+    answers: List[ReviewAnswer] = Field(..., min_length=1, max_length=100)
+
+
+class ReviewResult(BaseModel):
+    """Outcome of one reviewed item."""
+    item_id: str
+    is_correct: bool
+    correct_answer: str
+    explanation: str
+    interval_days: int
+    next_due_at: datetime
+
+
+class ReviewSessionResponse(BaseModel):
+    """Graded review session."""
+    results: List[ReviewResult]
+    correct: int
+    total: int
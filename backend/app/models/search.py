@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import List, Literal
+
+
+class SearchHit(BaseModel):
+    """A page matching a search query."""
+    document_id: str
+    title: str
+    page_number: int
+    score: float
+    snippet: str = ""
+
+
+class SearchResponse(BaseModel):
+    """Full-text search results."""
+    query: str
+    hits: List[SearchHit]
+    total: int
+    took_ms: float
+
+
+class SemanticHit(BaseModel):
+    """A chunk or page summary semantically similar to a query."""
+    document_id: str
+    title: str
+    kind: Literal["chunk", "page_summary"]
+    page_start: int
+    page_end: int
+    score: float
+    text: str
+
+
+class SemanticSearchResponse(BaseModel):
+    """Semantic search results."""
+    query: str
+    hits: List[SemanticHit]
+    took_ms: float
@@ -63,7 +63,6 @@ async def register(user_data: UserCreate):
     progress = get_progress_collection()
     await progress.insert_one({
         "user_id": result.inserted_id,
-        "daily_stats": [],
         "topic_progress": [],
         "achievements": [],
         "updated_at": now
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+import json
+
+from app.config import settings
+from app.database import get_conversations_collection
+from app.models.chat import ChatRequest, ChatMessage, ConversationResponse
+from app.services.ai_service import ai_service
+from app.services.chat_service import chat_service
+from app.services.resilience import deadline_scope
+from app.utils.security import get_current_user
+from app.utils.logger import logger
+
+router = APIRouter()
+
+
+def conversation_to_response(conversation: dict) -> ConversationResponse:
+    """Convert MongoDB conversation to response model."""
+    return ConversationResponse(
+        id=str(conversation["_id"]),
+        document_id=str(conversation["document_id"]),
+        summary=conversation.get("summary", ""),
+        messages=[ChatMessage(**m) for m in conversation.get("messages", [])],
+        turn_count=conversation.get("turn_count", 0),
+        created_at=conversation["created_at"],
+        updated_at=conversation["updated_at"]
+    )
+
+
+def _ndjson(event: dict) -> str:
+    """Encode a streaming event as one NDJSON line."""
+    return json.dumps(jsonable_encoder(event)) + "\n"
+
+
+@router.post("/{document_id}/messages")
+async def ask_document(
+    document_id: str,
+    chat_request: ChatRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Ask a question about a document, streaming NDJSON events.
+    Emits {"type": "meta"} with the conversation id and source pages, then
+    {"type": "token"} events, then {"type": "done"} or {"type": "error"}.
+    """
+    try:
+        doc_id = ObjectId(document_id)
+    except:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+
+    index = await chat_service.get_document_index(current_user["_id"], doc_id)
+    if index is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+
+    if not index.chunks:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document not yet processed. Please wait for processing to complete."
+        )
+
+    conversation = await chat_service.get_or_create_conversation(
+        current_user["_id"], doc_id, chat_request.conversation_id
+    )
+    if conversation is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+
+    question = chat_request.message.strip()
+    indices, query_key, cache_hit = chat_service.retrieve(index, conversation, question)
+    context = chat_service.build_context(index, indices)
+    pages = sorted({page for i in indices for page in range(index.chunks[i]["page_start"], index.chunks[i]["page_end"] + 1)})
+
+    async def event_stream():
+        yield _ndjson({"type": "meta", "conversation_id": str(conversation["_id"]), "pages": pages})
+
+        parts = []
+        try:
+            with deadline_scope(settings.AI_STREAM_DEADLINE):
+                async for token in ai_service.stream_document_answer(
+                    index.title,
+                    context,
+                    conversation.get("summary", ""),
+                    conversation.get("messages", []),
+                    question
+                ):
+                    parts.append(token)
+                    yield _ndjson({"type": "token", "content": token})
+        except Exception as e:
+            logger.warning(f"⚠️ Chat │ Answer stopped early for {document_id}: {e}")
+
+        if not parts:
+            yield _ndjson({
+                "type": "error",
+                "detail": "Failed to answer the question. Please try again."
+            })
+            return
+
+        await chat_service.record_turn(
+            conversation, question, "".join(parts), indices, query_key, cache_hit, index.version
+        )
+        yield _ndjson({"type": "done", "turn_count": conversation["turn_count"]})
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
+@router.get("/conversations/{conversation_id}", response_model=ConversationResponse)
+async def get_conversation(
+    conversation_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the stored summary and recent messages of a conversation."""
+    conversations = get_conversations_collection()
+
+    try:
+        conversation = await conversations.find_one(
+            {"_id": ObjectId(conversation_id), "user_id": current_user["_id"]},
+            {"retrieval_cache": 0}
+        )
+    except:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+
+    if not conversation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+
+    return conversation_to_response(conversation)
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, Query
+import asyncio
+
+from app.models.dashboard import DashboardResponse, DashboardDocument, DashboardResult
+from app.database import get_documents_collection, get_quiz_results_collection
+from app.routers.auth import user_to_response
+from app.routers.progress import get_progress_overview
+from app.utils.security import get_current_user
+
+router = APIRouter()
+
+# Only the fields the dashboard cards render
+DOCUMENT_CARD_PROJECTION = {"title": 1, "file_type": 1, "processing_status": 1, "created_at": 1}
+RESULT_ROW_PROJECTION = {
+    "quiz_title": 1, "difficulty": 1, "score_percentage": 1,
+    "correct_answers": 1, "total_questions": 1, "completed_at": 1
+}
+
+
+async def recent_documents(user_id, limit: int) -> list:
+    cursor = get_documents_collection().find(
+        {"user_id": user_id}, DOCUMENT_CARD_PROJECTION
+    ).sort("created_at", -1).limit(limit)
+    return [
+        DashboardDocument(
+            id=str(doc["_id"]),
+            title=doc["title"],
+            file_type=doc["file_type"],
+            processing_status=doc["processing_status"],
+            created_at=doc["created_at"]
+        )
+        for doc in await cursor.to_list(length=limit)
+    ]
+
+
+async def recent_results(user_id, limit: int) -> list:
+    cursor = get_quiz_results_collection().find(
+        {"user_id": user_id}, RESULT_ROW_PROJECTION
+    ).sort("completed_at", -1).limit(limit)
+    return [
+        DashboardResult(id=str(result.pop("_id")), **result)
+        for result in await cursor.to_list(length=limit)
+    ]
+
+
+@router.get("/", response_model=DashboardResponse)
+async def get_dashboard(
+    documents_limit: int = Query(4, ge=1, le=20),
+    results_limit: int = Query(5, ge=1, le=20),
+    current_user: dict = Depends(get_current_user)
+):
+    """Everything the dashboard renders, with its queries run concurrently."""
+    overview, documents, results = await asyncio.gather(
+        get_progress_overview(current_user),
+        recent_documents(current_user["_id"], documents_limit),
+        recent_results(current_user["_id"], results_limit)
+    )
+    
+    return DashboardResponse(
+        user=user_to_response(current_user),
+        overview=overview,
+        recent_documents=documents,
+        recent_results=results
+    )
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Depends, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from typing import List
 from bson import ObjectId
 
-from app.models.document import DocumentResponse, DocumentListResponse, ProcessingStatus
+from app.models.document import (
+    DocumentResponse, DocumentListResponse, DocumentEnrichmentResponse, ProcessingStatus
+)
 from app.database import get_documents_collection, get_users_collection
 from app.utils.security import get_current_user
 from app.utils.file_handler import (
@@ -13,42 +16,88 @@ from app.utils.file_handler import (
     extract_text,
     delete_file
 )
+from app.config import settings
 from app.services.ai_service import ai_service
+from app.services.activity_service import activity_service
+from app.services.question_bank_service import question_bank_service
+from app.services.review_service import review_service
+from app.services.search_service import search_service
+from app.services.semantic_search_service import semantic_search_service
+from app.services.resilience import AIServiceUnavailable, deadline_scope
+from app.utils.http_cache import cached_json, is_conditional, not_modified, version_etag
 from app.utils.logger import logger
+from app.utils.serializers import FastJSONResponse, document_dict
+from app.utils.single_flight import SingleFlight
+from app.utils.text_chunker import chunk_pages
+from app.utils.text_normalizer import normalize_pages
 
 router = APIRouter()
 
+# Coalesces concurrent first requests for a document's enrichment
+enrichment_flight = SingleFlight()
 
-def document_to_response(doc: dict) -> DocumentResponse:
-    """Convert MongoDB document to response model."""
-    return DocumentResponse(
-        id=str(doc["_id"]),
-        user_id=str(doc["user_id"]),
-        title=doc["title"],
-        file_type=doc["file_type"],
-        file_size=doc["file_size"],
-        extracted_text=doc.get("extracted_text"),
-        summary=doc.get("summary"),
-        easy_explanation=doc.get("easy_explanation"),
-        key_concepts=doc.get("key_concepts", []),
-        page_count=doc.get("page_count", 0),
-        processing_status=doc.get("processing_status", ProcessingStatus.PENDING),
-        created_at=doc["created_at"],
-        updated_at=doc["updated_at"]
-    )
+# Internal processing artifacts that are never part of a document response
+DOCUMENT_READ_PROJECTION = {"chunks": 0}
+
+# Every write to a document sets updated_at, so it alone versions document responses
+DOCUMENT_VERSION_PROJECTION = {"updated_at": 1}
+
+
+def document_etag(doc: dict) -> str:
+    return version_etag("document", doc["_id"], doc["updated_at"])
+
+
+def document_list_etag(user_id: ObjectId, page: int, limit: int, total: int, docs: List[dict]) -> str:
+    return version_etag("documents", user_id, page, limit, total, [(d["_id"], d["updated_at"]) for d in docs])
+
+
+async def materialize_enrichment(doc: dict) -> dict:
+    """
+    Generate whichever of easy_explanation / wiki_context is missing,
+    store it on the document and return both fields.
+    """
+    documents = get_documents_collection()
+    updates = {}
+    
+    with deadline_scope(settings.AI_ENRICHMENT_DEADLINE):
+        if not doc.get("easy_explanation"):
+            updates["easy_explanation"] = await ai_service.generate_easy_explanation(
+                doc["extracted_text"], doc["title"], doc.get("chunks")
+            )
+        if doc.get("wiki_context") is None:
+            updates["wiki_context"] = await ai_service.enrich_context_with_wiki(
+                doc.get("key_concepts", [])
+            )
+    
+    if updates:
+        updates["updated_at"] = datetime.utcnow()
+        await documents.update_one({"_id": doc["_id"]}, {"$set": updates})
+        logger.info(f"✨ Enrichment │ Stored {', '.join(k for k in updates if k != 'updated_at')} for {doc['_id']}")
+    
+    return {
+        "easy_explanation": updates.get("easy_explanation", doc.get("easy_explanation")),
+        "wiki_context": updates.get("wiki_context", doc.get("wiki_context")) or []
+    }
 
 
 async def process_document(document_id: str, file_path: str, file_type: str, title: str):
     """Background task to process document with AI."""
+    with deadline_scope(settings.AI_BACKGROUND_DEADLINE):
+        await _run_processing_pipeline(document_id, file_path, file_type, title)
+
+
+async def _run_processing_pipeline(document_id: str, file_path: str, file_type: str, title: str):
+    """Extract text and generate all AI insights for a document."""
     documents = get_documents_collection()
     
     logger.info(f"🔄 Processing │ Started processing document: {title} ({document_id})")
     
     try:
         # Update status to processing
-        await documents.update_one(
+        owner = await documents.find_one_and_update(
             {"_id": ObjectId(document_id)},
-            {"$set": {"processing_status": ProcessingStatus.PROCESSING}}
+            {"$set": {"processing_status": ProcessingStatus.PROCESSING, "updated_at": datetime.utcnow()}},
+            projection={"user_id": 1}
         )
         
         # Extract text
@@ -62,17 +111,51 @@ async def process_document(document_id: str, file_path: str, file_type: str, tit
             logger.info(f"🔄 Processing │ Extracting text from {file_type} for {document_id}")
             extracted_text, page_count, pages = extract_text(file_path, file_type)
         
+        # Strip running headers/footers, page numbers and artifacts before prompting
+        normalization_stats = None
+        if settings.TEXT_NORMALIZATION and extracted_text:
+            if file_type == "pdf":
+                pages, normalization_stats = normalize_pages(pages)
+                extracted_text = "\n\n".join(p for p in pages if p)
+            else:
+                # DOCX/image pages are slices of the text, so clean the text as a whole
+                normalized, normalization_stats = normalize_pages([extracted_text])
+                extracted_text = normalized[0]
+                pages, _ = normalize_pages(pages)
+            logger.info(
+                f"🧹 Processing │ Normalized text for {document_id}: "
+                f"saved {normalization_stats['chars_saved']} chars (~{normalization_stats['tokens_saved']} tokens)"
+            )
+        
         if not extracted_text:
             raise Exception("Failed to extract text from document")
         
+        # Split once into token-budgeted chunks; stored so later prompts can reuse them
+        chunks = chunk_pages(
+            pages or [extracted_text],
+            max_tokens=settings.CHUNK_MAX_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS
+        )
+        
+        eager_enrichment = settings.DOCUMENT_ENRICHMENT_MODE == "eager"
+        
+        # Optionally send the document once for summary, concepts and explanation;
+        # anything the combined call fails to produce falls back to its own prompt below
+        analysis = {}
+        if settings.AI_COMBINED_ANALYSIS:
+            logger.info(f"🔄 Processing │ Running combined analysis for {document_id}")
+            analysis = await ai_service.analyze_document(
+                extracted_text, title, include_explanation=eager_enrichment
+            )
+        
         logger.info(f"🔄 Processing │ Generatng summary for {document_id}")
         # Generate summary (Clean Text)
-        summary = await ai_service.generate_summary(extracted_text, title)
+        summary = analysis.get("summary") or await ai_service.generate_summary(extracted_text, title)
         
         # Initialize page_summaries in DB
         await documents.update_one(
             {"_id": ObjectId(document_id)},
-            {"$set": {"summary": summary, "page_summaries": []}}
+            {"$set": {"summary": summary, "page_summaries": [], "updated_at": datetime.utcnow()}}
         )
         
         # Generate per-page insights
@@ -96,24 +179,33 @@ async def process_document(document_id: str, file_path: str, file_type: str, tit
             # Incrementally update DB
             await documents.update_one(
                 {"_id": ObjectId(document_id)},
-                {"$push": {"page_summaries": page_summary}}
+                {"$push": {"page_summaries": page_summary}, "$set": {"updated_at": datetime.utcnow()}}
             )
 
-        logger.info(f"🔄 Processing │ Generatng easy explanation for {document_id}")
-        # Generate easy explanation
-        easy_explanation = await ai_service.generate_easy_explanation(extracted_text, title)
-        
         # Extract key concepts
-        key_concepts = await ai_service.extract_key_concepts(extracted_text)
+        key_concepts = analysis.get("key_concepts") or await ai_service.extract_key_concepts(extracted_text, chunks)
         
-        # Fetch Wikipedia context for top concepts
-        wiki_context = await ai_service.enrich_context_with_wiki(key_concepts)
+        # Easy explanation and Wikipedia context are generated here only in eager
+        # mode; in lazy mode they are cleared and built on first /enrichment request
+        easy_explanation = None
+        wiki_context = None
+        if eager_enrichment:
+            logger.info(f"🔄 Processing │ Generatng easy explanation for {document_id}")
+            easy_explanation = (
+                analysis.get("easy_explanation")
+                or await ai_service.generate_easy_explanation(extracted_text, title, chunks)
+            )
+            
+            # Fetch Wikipedia context for top concepts
+            wiki_context = await ai_service.enrich_context_with_wiki(key_concepts)
         
         # Update document with results
         await documents.update_one(
             {"_id": ObjectId(document_id)},
             {"$set": {
                 "extracted_text": extracted_text,
+                "chunks": chunks,
+                "normalization_stats": normalization_stats,
                 "easy_explanation": easy_explanation,
                 "key_concepts": key_concepts,
                 # page_summaries is already updated incrementally
@@ -124,6 +216,33 @@ async def process_document(document_id: str, file_path: str, file_type: str, tit
             }}
         )
         
+        # Refresh the full-text index; search is best-effort and must not fail processing
+        try:
+            await search_service.index_document(owner["user_id"], ObjectId(document_id), title, pages)
+        except Exception as e:
+            logger.warning(f"⚠️ Processing │ Search indexing failed for {document_id}: {e}")
+        
+        if settings.SEMANTIC_SEARCH_ENABLED:
+            try:
+                await semantic_search_service.index_document(
+                    owner["user_id"], ObjectId(document_id), title, chunks, page_summaries
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Processing │ Embedding failed for {document_id}: {e}")
+        
+        # Questions banked from a previous run describe the old text (and would count
+        # towards the refill target), so a reprocessed document starts a fresh bank
+        await question_bank_service.remove_document(ObjectId(document_id))
+        
+        # Pre-generate quiz questions so quiz creation can sample instead of waiting
+        await question_bank_service.seed_document({
+            "_id": ObjectId(document_id),
+            "user_id": owner["user_id"],
+            "extracted_text": extracted_text,
+            "chunks": chunks,
+            "page_summaries": page_summaries
+        })
+        
         logger.info(f"✅ Processing │ Successfully completed for {title} ({document_id})")
         
     except Exception as e:
@@ -202,6 +321,7 @@ async def upload_document(
         {"_id": current_user["_id"]},
         {"$inc": {"total_documents": 1}}
     )
+    await activity_service.record(current_user["_id"], documents_uploaded=1)
     
     # Start background processing
     logger.info(f"🔄 Upload │ Queuing background processing for {result.inserted_id}")
@@ -213,58 +333,85 @@ async def upload_document(
         file.filename or "Untitled"
     )
     
-    return document_to_response(doc)
+    return FastJSONResponse(document_dict(doc), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/", response_model=DocumentListResponse)
 async def list_documents(
+    request: Request,
     page: int = 1,
     limit: int = 10,
     current_user: dict = Depends(get_current_user)
 ):
-    """List user's documents."""
+    """
+    List user's documents.
+    A revalidating client is answered from ids and update times alone when
+    nothing on the page changed.
+    """
     logger.debug(f"📂 List Docs │ User {current_user['_id']} requesting page {page}")
     documents = get_documents_collection()
+    query = {"user_id": current_user["_id"]}
     
     skip = (page - 1) * limit
     
+    # Get total count
+    total = await documents.count_documents(query)
+    
+    if is_conditional(request):
+        versions = await documents.find(query, DOCUMENT_VERSION_PROJECTION).sort(
+            "created_at", -1
+        ).skip(skip).limit(limit).to_list(length=limit)
+        response = not_modified(request, document_list_etag(current_user["_id"], page, limit, total, versions))
+        if response:
+            return response
+    
     # Get documents
-    cursor = documents.find({"user_id": current_user["_id"]}).sort("created_at", -1).skip(skip).limit(limit)
+    cursor = documents.find(query, DOCUMENT_READ_PROJECTION).sort("created_at", -1).skip(skip).limit(limit)
     docs = await cursor.to_list(length=limit)
     
-    # Get total count
-    total = await documents.count_documents({"user_id": current_user["_id"]})
-    
-    return DocumentListResponse(
-        documents=[document_to_response(doc) for doc in docs],
-        total=total,
-        page=page,
-        limit=limit
+    return cached_json(
+        {
+            "documents": [document_dict(doc) for doc in docs],
+            "total": total,
+            "page": page,
+            "limit": limit
+        },
+        document_list_etag(current_user["_id"], page, limit, total, docs)
     )
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get a specific document."""
+    """
+    Get a specific document.
+    A revalidating client whose copy is current gets a 304 after a fetch of
+    `updated_at` alone, without reading the document text.
+    """
     logger.info(f"👀 View Doc │ User {current_user['_id']} accessing {document_id}")
     documents = get_documents_collection()
     
     try:
-        doc = await documents.find_one({
-            "_id": ObjectId(document_id),
-            "user_id": current_user["_id"]
-        })
+        query = {"_id": ObjectId(document_id), "user_id": current_user["_id"]}
     except:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
+    if is_conditional(request):
+        version = await documents.find_one(query, DOCUMENT_VERSION_PROJECTION)
+        if version:
+            response = not_modified(request, document_etag(version))
+            if response:
+                return response
+    
+    doc = await documents.find_one(query, DOCUMENT_READ_PROJECTION)
     if not doc:
         logger.warning(f"⚠️ View Doc │ Document {document_id} not found for user")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
-    return document_to_response(doc)
+    return cached_json(document_dict(doc), document_etag(doc))
 
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -290,8 +437,12 @@ async def delete_document(
     # Delete file
     delete_file(doc["file_path"])
     
-    # Delete document record
+    # Delete document record, its search index rows, banked questions and review items
     await documents.delete_one({"_id": ObjectId(document_id)})
+    await search_service.remove_document(ObjectId(document_id))
+    await semantic_search_service.remove_document(current_user["_id"], ObjectId(document_id))
+    await question_bank_service.remove_document(ObjectId(document_id))
+    await review_service.remove_document(ObjectId(document_id))
     
     # Update user's document count
     users = get_users_collection()
@@ -325,9 +476,10 @@ async def reprocess_document(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
     # Reset status
+    now = datetime.utcnow()
     await documents.update_one(
         {"_id": ObjectId(document_id)},
-        {"$set": {"processing_status": ProcessingStatus.PENDING}}
+        {"$set": {"processing_status": ProcessingStatus.PENDING, "updated_at": now}}
     )
     
     # Start reprocessing
@@ -340,4 +492,104 @@ async def reprocess_document(
     )
     
     doc["processing_status"] = ProcessingStatus.PENDING
-    return document_to_response(doc)
+    doc["updated_at"] = now
+    return FastJSONResponse(document_dict(doc))
+
+
+@router.get("/{document_id}/explanation/stream")
+async def stream_explanation(
+    document_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream the easy explanation as plain text, generating and storing it if missing."""
+    documents = get_documents_collection()
+    
+    try:
+        doc = await documents.find_one({
+            "_id": ObjectId(document_id),
+            "user_id": current_user["_id"]
+        })
+    except:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    
+    if doc.get("easy_explanation"):
+        return StreamingResponse(iter([doc["easy_explanation"]]), media_type="text/plain; charset=utf-8")
+    
+    if not doc.get("extracted_text"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document not yet processed. Please wait for processing to complete."
+        )
+    
+    async def token_stream():
+        parts = []
+        try:
+            with deadline_scope(settings.AI_STREAM_DEADLINE):
+                async for token in ai_service.stream_easy_explanation(
+                    doc["extracted_text"], doc["title"], doc.get("chunks")
+                ):
+                    parts.append(token)
+                    yield token
+        except Exception as e:
+            logger.warning(f"⚠️ Explanation Stream │ Stopped early for {document_id}: {e}")
+            return
+        
+        await documents.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {"easy_explanation": "".join(parts), "updated_at": datetime.utcnow()}}
+        )
+    
+    return StreamingResponse(token_stream(), media_type="text/plain; charset=utf-8")
+
+
+@router.get("/{document_id}/enrichment", response_model=DocumentEnrichmentResponse)
+async def get_document_enrichment(
+    document_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the easy explanation and Wikipedia context, generating them on first request.
+    Concurrent first requests share a single generation.
+    """
+    documents = get_documents_collection()
+    
+    try:
+        doc = await documents.find_one(
+            {"_id": ObjectId(document_id), "user_id": current_user["_id"]},
+            {
+                "title": 1, "extracted_text": 1, "chunks": 1, "key_concepts": 1,
+                "easy_explanation": 1, "wiki_context": 1
+            }
+        )
+    except:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    
+    if doc.get("easy_explanation") and doc.get("wiki_context") is not None:
+        enrichment = {"easy_explanation": doc["easy_explanation"], "wiki_context": doc["wiki_context"]}
+    else:
+        if not doc.get("extracted_text"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Document not yet processed. Please wait for processing to complete."
+            )
+        try:
+            enrichment = await enrichment_flight.run(
+                document_id, lambda: materialize_enrichment(doc)
+            )
+        except AIServiceUnavailable:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="AI service is busy or unavailable. Please try again shortly."
+            )
+    
+    return DocumentEnrichmentResponse(
+        document_id=document_id,
+        easy_explanation=enrichment["easy_explanation"],
+        wiki_context=enrichment["wiki_context"]
+    )
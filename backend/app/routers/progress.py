@@ -1,61 +1,56 @@
-from fastapi import APIRouter, Depends
-from datetime import datetime, date, timedelta
-from bson import ObjectId
-
-from app.models.progress import LearningProgressResponse, ProgressOverview, DailyStat, TopicProgress, Achievement
-from app.database import (
-    get_progress_collection, get_users_collection,
-    get_documents_collection, get_quiz_results_collection
+from fastapi import APIRouter, Depends, Query
+import asyncio
+from typing import List
+from datetime import datetime
+
+from app.models.progress import (
+    LearningProgressResponse, ProgressOverview, DailyStat, TopicProgress, Achievement, DifficultyStat,
+    ScoreTrendResponse, ScoreTrendPoint, DifficultyAnalytics, DocumentMastery, ScoreBucket
 )
+from app.database import get_progress_collection, get_users_collection
+from app.services.activity_service import activity_service
+from app.services.analytics_service import analytics_service
+from app.services.mastery_service import mastery_service
+from app.services.stats_service import stats_service, DIFFICULTIES
 from app.utils.security import get_current_user
 
 router = APIRouter()
 
 
+def topic_to_response(topic: dict) -> TopicProgress:
+    """Convert a topic mastery document to response model."""
+    return TopicProgress(
+        topic=topic["topic"],
+        total_questions=topic["total_questions"],
+        correct_answers=topic["correct_answers"],
+        mastery_level=round(topic["mastery"], 1)
+    )
+
+
 @router.get("/overview", response_model=ProgressOverview)
 async def get_progress_overview(current_user: dict = Depends(get_current_user)):
     """Get quick progress overview for dashboard."""
-    users = get_users_collection()
-    results = get_quiz_results_collection()
-    
-    # Get user stats
-    user = await users.find_one({"_id": current_user["_id"]})
-    
-    # Calculate average score from results
-    cursor = results.find({"user_id": current_user["_id"]})
-    result_list = await cursor.to_list(length=1000)
-    
-    avg_score = 0.0
-    if result_list:
-        avg_score = sum(r["score_percentage"] for r in result_list) / len(result_list)
-    
-    # Get recent activity (last 7 days)
-    recent_activity = []
-    progress = get_progress_collection()
-    user_progress = await progress.find_one({"user_id": current_user["_id"]})
-    
-    if user_progress and user_progress.get("daily_stats"):
-        # Get last 7 stats
-        recent_activity = [
-            DailyStat(**stat) 
-            for stat in user_progress["daily_stats"][-7:]
-        ]
+    stats, recent_activity = await asyncio.gather(
+        stats_service.get_stats(current_user["_id"]),
+        activity_service.get_recent(current_user["_id"], 7)  # last 7 days
+    )
     
     return ProgressOverview(
-        total_documents=user.get("total_documents", 0),
-        total_quizzes_taken=user.get("total_quizzes_taken", 0),
-        average_score=round(avg_score, 1),
-        study_streak=user.get("study_streak", 0),
-        recent_activity=recent_activity
+        total_documents=current_user.get("total_documents", 0),
+        total_quizzes_taken=stats.get("result_count", 0),
+        average_score=round(stats_service.average_score(stats), 1),
+        study_streak=stats_service.current_streak(stats),
+        recent_activity=[DailyStat(**stat) for stat in recent_activity]
     )
 
 
 @router.get("/detailed", response_model=LearningProgressResponse)
-async def get_detailed_progress(current_user: dict = Depends(get_current_user)):
-    """Get detailed learning progress."""
+async def get_detailed_progress(
+    days: int = Query(30, ge=1, le=365),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get detailed learning progress, with daily activity for the last `days` days."""
     progress = get_progress_collection()
-    users = get_users_collection()
-    results = get_quiz_results_collection()
     
     # Get or create progress document
     user_progress = await progress.find_one({"user_id": current_user["_id"]})
@@ -63,113 +58,105 @@ async def get_detailed_progress(current_user: dict = Depends(get_current_user)):
     if not user_progress:
         user_progress = {
             "user_id": current_user["_id"],
-            "daily_stats": [],
             "topic_progress": [],
             "achievements": [],
             "updated_at": datetime.utcnow()
         }
         await progress.insert_one(user_progress)
     
-    # Get user stats
-    user = await users.find_one({"_id": current_user["_id"]})
-    
-    # Calculate aggregated stats
-    cursor = results.find({"user_id": current_user["_id"]})
-    result_list = await cursor.to_list(length=1000)
-    
-    total_study_time = sum(r.get("time_taken", 0) for r in result_list) // 60  # Convert to minutes
-    avg_score = 0.0
-    if result_list:
-        avg_score = sum(r["score_percentage"] for r in result_list) / len(result_list)
+    stats = await stats_service.get_stats(current_user["_id"])
     
     # Build response
-    daily_stats = [DailyStat(**stat) for stat in user_progress.get("daily_stats", [])]
-    topic_progress = [TopicProgress(**tp) for tp in user_progress.get("topic_progress", [])]
+    daily_stats = [DailyStat(**stat) for stat in await activity_service.get_recent(current_user["_id"], days)]
+    topic_progress = [topic_to_response(t) for t in await mastery_service.get_topics(current_user["_id"])]
     achievements = [Achievement(**a) for a in user_progress.get("achievements", [])]
     
+    by_difficulty = stats.get("by_difficulty", {})
+    difficulty_breakdown = [
+        DifficultyStat(
+            difficulty=difficulty,
+            quizzes_taken=by_difficulty[difficulty]["count"],
+            average_score=round(by_difficulty[difficulty]["score_sum"] / by_difficulty[difficulty]["count"], 1),
+            total_time=by_difficulty[difficulty]["time_taken_sum"] // 60
+        )
+        for difficulty in DIFFICULTIES
+        if by_difficulty.get(difficulty, {}).get("count")
+    ]
+    
     return LearningProgressResponse(
         user_id=str(current_user["_id"]),
         daily_stats=daily_stats,
         topic_progress=topic_progress,
         achievements=achievements,
-        total_study_time=total_study_time,
-        average_score=round(avg_score, 1),
-        current_streak=user.get("study_streak", 0),
-        best_streak=user.get("study_streak", 0),
-        total_documents=user.get("total_documents", 0),
-        total_quizzes=user.get("total_quizzes_taken", 0),
+        difficulty_breakdown=difficulty_breakdown,
+        total_study_time=stats.get("time_taken_sum", 0) // 60,  # Convert to minutes
+        average_score=round(stats_service.average_score(stats), 1),
+        current_streak=stats_service.current_streak(stats),
+        best_streak=stats.get("best_streak", 0),
+        total_documents=current_user.get("total_documents", 0),
+        total_quizzes=stats.get("result_count", 0),
         updated_at=user_progress.get("updated_at", datetime.utcnow())
     )
 
 
+@router.get("/topics/weak", response_model=List[TopicProgress])
+async def get_weak_topics(
+    limit: int = Query(5, ge=1, le=50),
+    min_questions: int = Query(3, ge=1),
+    current_user: dict = Depends(get_current_user)
+):
+    """Topics with the lowest mastery among those answered at least `min_questions` times."""
+    topics = await mastery_service.weakest_topics(current_user["_id"], limit, min_questions)
+    return [topic_to_response(t) for t in topics]
+
+
 @router.post("/log-activity")
 async def log_study_activity(
     study_time: int = 0,
     current_user: dict = Depends(get_current_user)
 ):
-    """Log daily study activity."""
-    progress = get_progress_collection()
+    """Log daily study activity (study_time in minutes)."""
     users = get_users_collection()
     
-    today = date.today()
-    today_str = today.isoformat()
-    
-    # Get current progress
-    user_progress = await progress.find_one({"user_id": current_user["_id"]})
-    
-    if not user_progress:
-        user_progress = {
-            "user_id": current_user["_id"],
-            "daily_stats": [],
-            "topic_progress": [],
-            "achievements": [],
-            "updated_at": datetime.utcnow()
-        }
-    
-    daily_stats = user_progress.get("daily_stats", [])
-    
-    # Find or create today's stat
-    today_stat = None
-    for stat in daily_stats:
-        if str(stat.get("date")) == today_str:
-            today_stat = stat
-            break
-    
-    if today_stat:
-        today_stat["study_time"] = today_stat.get("study_time", 0) + study_time
-    else:
-        daily_stats.append({
-            "date": today_str,
-            "documents_uploaded": 0,
-            "quizzes_taken": 0,
-            "questions_answered": 0,
-            "correct_answers": 0,
-            "study_time": study_time
-        })
+    await activity_service.record(current_user["_id"], study_seconds=study_time * 60)
     
-    # Keep only last 30 days
-    daily_stats = daily_stats[-30:]
-    
-    # Update progress
-    await progress.update_one(
-        {"user_id": current_user["_id"]},
-        {"$set": {
-            "daily_stats": daily_stats,
-            "updated_at": datetime.utcnow()
-        }},
-        upsert=True
+    # Advance the study streak
+    stats = await stats_service.record_activity(current_user["_id"])
+    await users.update_one(
+        {"_id": current_user["_id"]},
+        {"$set": {"study_streak": stats["current_streak"]}}
     )
     
-    # Check and update study streak
-    user = await users.find_one({"_id": current_user["_id"]})
-    yesterday = (today - timedelta(days=1)).isoformat()
-    
-    has_yesterday = any(str(s.get("date")) == yesterday for s in daily_stats)
-    
-    if has_yesterday or user.get("study_streak", 0) == 0:
-        await users.update_one(
-            {"_id": current_user["_id"]},
-            {"$inc": {"study_streak": 1}}
-        )
-    
     return {"message": "Activity logged successfully"}
+
+
+@router.get("/analytics/score-trend", response_model=ScoreTrendResponse)
+async def get_score_trend(
+    window: str = Query("week", pattern="^(day|week|month)$"),
+    periods: int = Query(12, ge=1, le=104),
+    current_user: dict = Depends(get_current_user)
+):
+    """Average score, quiz count and study time per day, week or month."""
+    points = await analytics_service.score_trend(current_user["_id"], window, periods)
+    return ScoreTrendResponse(window=window, points=[ScoreTrendPoint(**p) for p in points])
+
+
+@router.get("/analytics/difficulty", response_model=List[DifficultyAnalytics])
+async def get_difficulty_analytics(current_user: dict = Depends(get_current_user)):
+    """Quiz count, average score and accuracy per difficulty."""
+    rows = await analytics_service.by_difficulty(current_user["_id"])
+    return [DifficultyAnalytics(**row) for row in rows]
+
+
+@router.get("/analytics/documents", response_model=List[DocumentMastery])
+async def get_document_mastery(current_user: dict = Depends(get_current_user)):
+    """Attempts, scores and mastery per document."""
+    rows = await analytics_service.by_document(current_user["_id"])
+    return [DocumentMastery(**row) for row in rows]
+
+
+@router.get("/analytics/score-distribution", response_model=List[ScoreBucket])
+async def get_score_distribution(current_user: dict = Depends(get_current_user)):
+    """Number of results per 20-point score band."""
+    rows = await analytics_service.score_distribution(current_user["_id"])
+    return [ScoreBucket(**row) for row in rows]
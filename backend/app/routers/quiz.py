@@ -1,60 +1,89 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from typing import List
 from bson import ObjectId
+import asyncio
+import json
+import time
 import uuid
 
 from app.models.quiz import (
-    QuizCreate, QuizResponse, QuizListResponse, QuizQuestion, QuizOption,
-    ExamSubmission, ExamResultResponse, ExamResultListResponse, AnswerDetail, Difficulty
+    QuizCreate, QuizResponse, QuizListResponse,
+    ExamSubmission, ExamResultResponse, ExamResultListResponse,
+    AnalysisStatus, WeakTopicsResponse
 )
 from app.database import (
     get_quizzes_collection, get_quiz_results_collection,
     get_documents_collection, get_users_collection, get_progress_collection
 )
+from app.config import settings
 from app.utils.security import get_current_user
+from app.services.activity_service import activity_service
 from app.services.ai_service import ai_service
+from app.services.analytics_service import analytics_service
+from app.services.mastery_service import mastery_service
+from app.services.question_bank_service import question_bank_service
+from app.services.quiz_service import quiz_service
+from app.services.resilience import AIServiceUnavailable, deadline_scope
+from app.services.review_service import review_service
+from app.services.stats_service import stats_service
+from app.services.weak_topic_service import weak_topic_service
+from app.utils.http_cache import (
+    cached_json, etag_for, is_conditional, json_bytes_response, not_modified, version_etag
+)
+from app.utils.exam_answers import ANSWER_FIELDS, compact_answers, correctness
+from app.utils.logger import logger
+from app.utils.serializers import (
+    FastJSONResponse, dumps, question_dict, quiz_dict, result_dict, result_summary_dict
+)
 
 router = APIRouter()
 
+WEAK_TOPICS_POLL_INTERVAL = 0.5  # seconds between checks while long-polling
 
-def quiz_to_response(quiz: dict, include_answers: bool = False) -> QuizResponse:
-    """Convert MongoDB quiz to response model."""
-    questions = []
-    for q in quiz.get("questions", []):
-        question = QuizQuestion(
-            id=q["id"],
-            question_text=q["question_text"],
-            options=[QuizOption(**opt) for opt in q["options"]],
-            correct_answer=q["correct_answer"] if include_answers else "",
-            explanation=q["explanation"] if include_answers else ""
-        )
-        questions.append(question)
-    
-    return QuizResponse(
-        id=str(quiz["_id"]),
-        user_id=str(quiz["user_id"]),
-        document_id=str(quiz["document_id"]),
-        title=quiz["title"],
-        difficulty=quiz["difficulty"],
-        question_count=quiz["question_count"],
-        questions=questions,
-        created_at=quiz["created_at"]
-    )
+# Reads that rebuild quizzes from their questions skip the stored student view
+QUIZ_READ_PROJECTION = {"student_view": 0, "student_etag": 0}
 
+# Quizzes never change after creation; a result only changes when its weak topics are refined
+RESULT_VERSION_PROJECTION = {"weak_topics_status": 1, "weak_topics_updated_at": 1}
 
-@router.post("/create", response_model=QuizResponse, status_code=status.HTTP_201_CREATED)
-async def create_quiz(
-    quiz_data: QuizCreate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Create a quiz from a document."""
+
+def result_version(result: dict) -> tuple:
+    return result["_id"], result.get("weak_topics_status"), result.get("weak_topics_updated_at")
+
+
+def quiz_answers_etag(quiz_id: ObjectId) -> str:
+    return version_etag("quiz-answers", quiz_id)
+
+
+def format_question(q: dict) -> dict:
+    """Normalize a generated question into the stored quiz question shape."""
+    question = {
+        "id": str(uuid.uuid4()),
+        "question_text": q.get("question_text", ""),
+        "options": q.get("options", []),
+        "correct_answer": q.get("correct_answer", "A"),
+        "explanation": q.get("explanation", "")
+    }
+    # Provenance from grounded generation (source page and its focus topic)
+    if q.get("page_number"):
+        question["page_number"] = q["page_number"]
+        question["topic"] = q.get("topic")
+    # Question bank entry this was drawn from, so recent quizzes can avoid repeats
+    if q.get("_id"):
+        question["bank_id"] = str(q["_id"])
+    return question
+
+
+async def get_processed_document(document_id: str, current_user: dict) -> dict:
+    """Fetch a user's document, ensuring its text has been extracted."""
     documents = get_documents_collection()
     
-    # Get document
     try:
         doc = await documents.find_one({
-            "_id": ObjectId(quiz_data.document_id),
+            "_id": ObjectId(document_id),
             "user_id": current_user["_id"]
         })
     except:
@@ -69,37 +98,23 @@ async def create_quiz(
             detail="Document not yet processed. Please wait for processing to complete."
         )
     
-    # Generate quiz questions using AI
-    questions_data = await ai_service.generate_quiz_questions(
-        doc["extracted_text"],
-        quiz_data.difficulty.value,
-        quiz_data.question_count,
-        quiz_data.title
-    )
-    
-    if not questions_data:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate quiz questions. Please try again."
-        )
-    
-    # Format questions
-    questions = []
-    for q in questions_data:
-        question = {
-            "id": str(uuid.uuid4()),
-            "question_text": q.get("question_text", ""),
-            "options": q.get("options", []),
-            "correct_answer": q.get("correct_answer", "A"),
-            "explanation": q.get("explanation", "")
-        }
-        questions.append(question)
-    
-    # Create quiz document
+    return doc
+
+
+def set_student_view(quiz: dict) -> dict:
+    """Serialize the answer-stripped quiz once, with its ETag, onto the quiz document."""
+    quiz["student_view"] = dumps(quiz_dict(quiz, include_answers=False))
+    quiz["student_etag"] = etag_for(quiz["student_view"])
+    return quiz
+
+
+async def save_quiz(quiz_data: QuizCreate, questions: List[dict], current_user: dict) -> dict:
+    """Insert a quiz document and return it with its id."""
     quizzes = get_quizzes_collection()
     now = datetime.utcnow()
     
     quiz = {
+        "_id": ObjectId(),
         "user_id": current_user["_id"],
         "document_id": ObjectId(quiz_data.document_id),
         "title": quiz_data.title,
@@ -109,18 +124,149 @@ async def create_quiz(
         "created_at": now
     }
     
-    result = await quizzes.insert_one(quiz)
-    quiz["_id"] = result.inserted_id
+    # Students fetch the quiz many times while taking it; serialize it for them once
+    set_student_view(quiz)
+    await quizzes.insert_one(quiz)
+    return quiz
+
+
+def _ndjson(event: dict) -> str:
+    """Encode a streaming event as one NDJSON line."""
+    return json.dumps(jsonable_encoder(event)) + "\n"
+
+
+@router.post("/create", response_model=QuizResponse, status_code=status.HTTP_201_CREATED)
+async def create_quiz(
+    quiz_data: QuizCreate,
+    background_tasks: BackgroundTasks,
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Create a quiz from a document.
+    Questions are sampled from the document's question bank, skipping ones used in
+    the user's recent quizzes; only a shortfall is generated while the request waits.
+    """
+    doc = await get_processed_document(quiz_data.document_id, current_user)
+    difficulty = quiz_data.difficulty.value
+    
+    recent = await question_bank_service.recently_used(current_user["_id"], doc["_id"])
+    drawn = await question_bank_service.draw(
+        doc["_id"], difficulty, quiz_data.question_count, recent
+    )
+    # Rows banked before questions were validated may be malformed; leave them out
+    questions_data = [q for q in map(quiz_service.clean_question, drawn) if q is not None]
     
-    return quiz_to_response(quiz, include_answers=False)
+    from_bank = len(questions_data)
+    shortfall = quiz_data.question_count - from_bank
+    if shortfall > 0:
+        # Generate the remainder now and bank it so later quizzes can reuse it
+        try:
+            with deadline_scope(settings.AI_INTERACTIVE_DEADLINE):
+                questions_data.extend(await question_bank_service.generate(
+                    doc, difficulty, shortfall, quiz_data.title
+                ))
+        except AIServiceUnavailable:
+            if not questions_data:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="AI service is busy or unavailable. Please try again shortly."
+                )
+        except Exception as e:
+            # Serve the banked questions if there are any; otherwise fail below
+            logger.error(f"❌ Quiz │ Generating {shortfall} questions failed: {e}")
+    
+    if not questions_data:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate quiz questions. Please try again."
+        )
+    
+    questions = [format_question(q) for q in questions_data]
+    quiz = await save_quiz(quiz_data, questions, current_user)
+    
+    # Whatever this quiz used is now excluded for the user; refill if little is left
+    used = recent | {q["_id"] for q in drawn} | {q["_id"] for q in questions_data}
+    remaining = await question_bank_service.available(doc["_id"], difficulty, used)
+    if remaining < settings.QUESTION_BANK_LOW_WATERMARK:
+        background_tasks.add_task(question_bank_service.refill, doc, difficulty)
+    
+    logger.info(
+        f"📝 Quiz │ {len(questions)} questions ({from_bank} from bank), "
+        f"{remaining} {difficulty} left in bank"
+    )
+    
+    return json_bytes_response(
+        request, quiz["student_view"], quiz["student_etag"], status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.post("/create/stream")
+async def create_quiz_stream(
+    quiz_data: QuizCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Create a quiz from a document, streaming NDJSON events.
+    Emits one {"type": "question"} event per question as soon as it is generated,
+    then a final {"type": "quiz"} event with the saved quiz, or {"type": "error"}.
+    """
+    doc = await get_processed_document(quiz_data.document_id, current_user)
+    # Questions near-identical to banked (or earlier streamed) ones are skipped
+    seen = await question_bank_service.document_index(doc["_id"], quiz_data.difficulty.value)
+    
+    async def event_stream():
+        questions = []
+        try:
+            with deadline_scope(settings.AI_STREAM_DEADLINE):
+                async for q in ai_service.stream_quiz_questions(
+                    doc["extracted_text"],
+                    quiz_data.difficulty.value,
+                    quiz_data.question_count,
+                    quiz_data.title,
+                    quiz_service.context_chunks(doc)
+                ):
+                    # Malformed or near-duplicate questions are skipped, never saved
+                    kept = quiz_service.dedupe([q], seen)
+                    if not kept:
+                        continue
+                    question = format_question(kept[0])
+                    event = {
+                        "type": "question",
+                        "index": len(questions),
+                        "question": question_dict(question, include_answers=False)
+                    }
+                    questions.append(question)
+                    yield _ndjson(event)
+        except Exception as e:
+            # Keep whatever was generated before the failure
+            logger.warning(f"⚠️ Quiz Stream │ Generation stopped early: {e}")
+        
+        if not questions:
+            yield _ndjson({
+                "type": "error",
+                "detail": "Failed to generate quiz questions. Please try again."
+            })
+            return
+        
+        try:
+            quiz = await save_quiz(quiz_data, questions, current_user)
+        except Exception as e:
+            logger.error(f"❌ Quiz Stream │ Saving the quiz failed: {e}")
+            yield _ndjson({"type": "error", "detail": "Failed to save the quiz. Please try again."})
+            return
+        yield _ndjson({"type": "quiz", "quiz": quiz_dict(quiz, include_answers=False)})
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
 
 
 @router.get("/", response_model=QuizListResponse)
 async def list_quizzes(
+    request: Request,
     document_id: str = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """List user's quizzes."""
+    """List user's quizzes. Quizzes are immutable, so their ids alone version the list."""
     quizzes = get_quizzes_collection()
     
     query = {"user_id": current_user["_id"]}
@@ -130,44 +276,82 @@ async def list_quizzes(
         except:
             pass
     
-    cursor = quizzes.find(query).sort("created_at", -1)
+    if is_conditional(request):
+        ids = await quizzes.find(query, {"_id": 1}).sort("created_at", -1).to_list(length=100)
+        response = not_modified(request, version_etag("quizzes", query, [q["_id"] for q in ids]))
+        if response:
+            return response
+    
+    cursor = quizzes.find(query, QUIZ_READ_PROJECTION).sort("created_at", -1)
     quiz_list = await cursor.to_list(length=100)
     
-    return QuizListResponse(
-        quizzes=[quiz_to_response(q, include_answers=False) for q in quiz_list],
-        total=len(quiz_list)
+    return cached_json(
+        {
+            "quizzes": [quiz_dict(q, include_answers=False) for q in quiz_list],
+            "total": len(quiz_list)
+        },
+        version_etag("quizzes", query, [q["_id"] for q in quiz_list])
     )
 
 
 @router.get("/{quiz_id}", response_model=QuizResponse)
 async def get_quiz(
     quiz_id: str,
+    request: Request,
     include_answers: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get a specific quiz."""
+    """
+    Get a specific quiz.
+    The student view is served as its stored serialization, with an ETag so
+    unchanged copies revalidate as 304; only `include_answers` builds a response.
+    """
     quizzes = get_quizzes_collection()
+    projection = QUIZ_READ_PROJECTION if include_answers else {"student_view": 1, "student_etag": 1}
     
     try:
-        quiz = await quizzes.find_one({
-            "_id": ObjectId(quiz_id),
-            "user_id": current_user["_id"]
-        })
+        query = {"_id": ObjectId(quiz_id), "user_id": current_user["_id"]}
     except:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     
+    if is_conditional(request):
+        # Only the ETag is read to answer a client whose copy is current
+        version = await quizzes.find_one(query, {"student_etag": 1})
+        if version:
+            etag = quiz_answers_etag(version["_id"]) if include_answers else version.get("student_etag")
+            response = not_modified(request, etag) if etag else None
+            if response:
+                return response
+    
+    quiz = await quizzes.find_one(query, projection)
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     
-    return quiz_to_response(quiz, include_answers=include_answers)
+    if include_answers:
+        return cached_json(quiz_dict(quiz, include_answers=True), quiz_answers_etag(quiz["_id"]))
+    
+    if "student_view" not in quiz:
+        # Quizzes saved before student views existed get theirs stored on first read
+        quiz = set_student_view(await quizzes.find_one({"_id": quiz["_id"]}, QUIZ_READ_PROJECTION))
+        await quizzes.update_one(
+            {"_id": quiz["_id"]},
+            {"$set": {"student_view": quiz["student_view"], "student_etag": quiz["student_etag"]}}
+        )
+    
+    return json_bytes_response(request, quiz["student_view"], quiz["student_etag"])
 
 
 @router.post("/submit", response_model=ExamResultResponse)
 async def submit_exam(
     submission: ExamSubmission,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
-    """Submit exam answers and get results."""
+    """
+    Submit exam answers and get results.
+    Weak topics are derived locally from page topics; when the LLM refines them in
+    the background, poll GET /results/{id}/weak-topics.
+    """
     quizzes = get_quizzes_collection()
     
     # Get quiz with answers
@@ -175,7 +359,7 @@ async def submit_exam(
         quiz = await quizzes.find_one({
             "_id": ObjectId(submission.quiz_id),
             "user_id": current_user["_id"]
-        })
+        }, QUIZ_READ_PROJECTION)
     except:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     
@@ -186,46 +370,33 @@ async def submit_exam(
     answer_lookup = {a.question_id: a.selected_answer for a in submission.answers}
     
     # Evaluate answers
-    answers_detail = []
-    correct_count = 0
-    wrong_answers_data = []
-    
-    for q in quiz["questions"]:
-        selected = answer_lookup.get(q["id"], "")
-        is_correct = selected == q["correct_answer"]
-        
-        if is_correct:
-            correct_count += 1
-        else:
-            wrong_answers_data.append({
-                "question_text": q["question_text"],
-                "selected_answer": selected,
-                "correct_answer": q["correct_answer"]
-            })
-        
-        answers_detail.append(AnswerDetail(
-            question_id=q["id"],
-            question_text=q["question_text"],
-            selected_answer=selected,
-            correct_answer=q["correct_answer"],
-            is_correct=is_correct,
-            explanation=q["explanation"]
-        ))
+    graded = compact_answers(quiz["questions"], answer_lookup)
+    is_correct = correctness(graded)
+    correct_count = sum(is_correct)
+    wrong_answers_data = [
+        {
+            "question_text": q["question_text"],
+            "selected_answer": selected,
+            "correct_answer": q["correct_answer"]
+        }
+        for q, selected, ok in zip(quiz["questions"], graded["selected_answers"], is_correct)
+        if not ok
+    ]
     
     total_questions = len(quiz["questions"])
     wrong_count = total_questions - correct_count
     score_percentage = (correct_count / total_questions * 100) if total_questions > 0 else 0
     
-    # Analyze weak topics if there are wrong answers
-    weak_topics = []
-    if wrong_answers_data:
-        documents = get_documents_collection()
-        doc = await documents.find_one({"_id": quiz["document_id"]})
-        if doc and doc.get("summary"):
-            weak_topics = await ai_service.analyze_weak_topics(
-                wrong_answers_data, 
-                doc["summary"]
-            )
+    # Weak topics come from page focus topics locally; the LLM only refines them
+    # afterwards, so grading never waits on the AI
+    wrong_ids = {q["id"] for q, ok in zip(quiz["questions"], is_correct) if not ok}
+    question_topics = await weak_topic_service.question_topics(
+        current_user["_id"], quiz["document_id"], quiz["questions"]
+    )
+    weak_topics = weak_topic_service.rank_topics(quiz["questions"], question_topics, wrong_ids)
+    refine_weak_topics = bool(wrong_answers_data) and (
+        settings.WEAK_TOPICS_LLM_REFINEMENT or not weak_topics
+    )
     
     # Save result
     results = get_quiz_results_collection()
@@ -242,110 +413,185 @@ async def submit_exam(
         "score_percentage": round(score_percentage, 2),
         "time_taken": submission.time_taken,
         "difficulty": quiz["difficulty"],
-        "answers": [a.dict() for a in answers_detail],
+        # Question text, correct options and explanations are joined from the quiz on read
+        **graded,
         "weak_topics": weak_topics,
+        "weak_topics_status": (
+            AnalysisStatus.PENDING.value if refine_weak_topics else AnalysisStatus.COMPLETED.value
+        ),
         "completed_at": now
     }
     
     insert_result = await results.insert_one(result_doc)
     result_doc["_id"] = insert_result.inserted_id
     
-    # Update user stats
+    # Stats, review queue, mastery and activity are separate collections; write them together.
+    # The result goes in first so a stats rebuild running meanwhile already sees it
+    # (record_result then knows not to add it again).
+    stats, _, _, _ = await asyncio.gather(
+        stats_service.record_result(
+            current_user["_id"],
+            result_doc["_id"],
+            quiz["difficulty"],
+            result_doc["score_percentage"],
+            submission.time_taken,
+            correct_count,
+            total_questions
+        ),
+        review_service.add_wrong_answers(
+            current_user["_id"],
+            quiz["document_id"],
+            quiz["_id"],
+            [q["id"] for q in quiz["questions"] if q["id"] in wrong_ids]
+        ),
+        mastery_service.record(
+            current_user["_id"],
+            [(topic, q["id"] not in wrong_ids) for q, topic in zip(quiz["questions"], question_topics)]
+        ),
+        activity_service.record(
+            current_user["_id"],
+            quizzes_taken=1,
+            questions_answered=total_questions,
+            correct_answers=correct_count,
+            study_seconds=submission.time_taken
+        )
+    )
+    analytics_service.invalidate(current_user["_id"])
+    
+    # The streak comes from the updated stats
     users = get_users_collection()
     await users.update_one(
         {"_id": current_user["_id"]},
-        {"$inc": {
-            "total_quizzes_taken": 1,
-            "total_correct_answers": correct_count,
-            "total_questions_answered": total_questions
-        }}
+        {
+            "$inc": {
+                "total_quizzes_taken": 1,
+                "total_correct_answers": correct_count,
+                "total_questions_answered": total_questions
+            },
+            "$set": {"study_streak": stats["current_streak"]}
+        }
     )
     
-    return ExamResultResponse(
-        id=str(result_doc["_id"]),
-        user_id=str(result_doc["user_id"]),
-        quiz_id=str(result_doc["quiz_id"]),
-        document_id=str(result_doc["document_id"]),
-        quiz_title=result_doc["quiz_title"],
-        total_questions=result_doc["total_questions"],
-        correct_answers=result_doc["correct_answers"],
-        wrong_answers=result_doc["wrong_answers"],
-        score_percentage=result_doc["score_percentage"],
-        time_taken=result_doc["time_taken"],
-        difficulty=Difficulty(result_doc["difficulty"]),
-        answers=answers_detail,
-        weak_topics=result_doc["weak_topics"],
-        completed_at=result_doc["completed_at"]
-    )
+    if refine_weak_topics:
+        background_tasks.add_task(
+            weak_topic_service.analyze_result,
+            result_doc["_id"],
+            quiz["document_id"],
+            wrong_answers_data,
+            weak_topics
+        )
+    
+    return FastJSONResponse(result_dict(result_doc, quiz["questions"]))
 
 
 @router.get("/results/all", response_model=ExamResultListResponse)
 async def list_exam_results(
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
     """List all exam results for the user."""
     results = get_quiz_results_collection()
+    query = {"user_id": current_user["_id"]}
+    
+    if is_conditional(request):
+        versions = await results.find(query, RESULT_VERSION_PROJECTION).sort("completed_at", -1).to_list(length=100)
+        response = not_modified(request, version_etag("results", query, [result_version(r) for r in versions]))
+        if response:
+            return response
     
-    cursor = results.find({"user_id": current_user["_id"]}).sort("completed_at", -1)
+    cursor = results.find(query, {field: 0 for field in ANSWER_FIELDS}).sort("completed_at", -1)
     result_list = await cursor.to_list(length=100)
     
-    response_list = []
-    for r in result_list:
-        response_list.append(ExamResultResponse(
-            id=str(r["_id"]),
-            user_id=str(r["user_id"]),
-            quiz_id=str(r["quiz_id"]),
-            document_id=str(r["document_id"]),
-            quiz_title=r["quiz_title"],
-            total_questions=r["total_questions"],
-            correct_answers=r["correct_answers"],
-            wrong_answers=r["wrong_answers"],
-            score_percentage=r["score_percentage"],
-            time_taken=r["time_taken"],
-            difficulty=Difficulty(r["difficulty"]),
-            answers=[AnswerDetail(**a) for a in r.get("answers", [])],
-            weak_topics=r.get("weak_topics", []),
-            completed_at=r["completed_at"]
-        ))
-    
-    return ExamResultListResponse(
-        results=response_list,
-        total=len(response_list)
+    return cached_json(
+        {
+            "results": [result_summary_dict(r) for r in result_list],
+            "total": len(result_list)
+        },
+        version_etag("results", query, [result_version(r) for r in result_list])
     )
 
 
+@router.post("/results/weak-topics/recompute")
+async def recompute_weak_topics(
+    current_user: dict = Depends(get_current_user)
+):
+    """Recompute weak topics for all of the user's past results with the local engine."""
+    updated = await weak_topic_service.recompute_results(current_user["_id"])
+    return {"updated": updated}
+
+
 @router.get("/results/{result_id}", response_model=ExamResultResponse)
 async def get_exam_result(
     result_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get a specific exam result."""
+    """
+    Get a specific exam result.
+    A revalidating client whose copy is current gets a 304 before the answers
+    are read or joined with the quiz.
+    """
     results = get_quiz_results_collection()
     
     try:
-        result = await results.find_one({
-            "_id": ObjectId(result_id),
-            "user_id": current_user["_id"]
-        })
+        query = {"_id": ObjectId(result_id), "user_id": current_user["_id"]}
     except:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result not found")
     
+    if is_conditional(request):
+        version = await results.find_one(query, RESULT_VERSION_PROJECTION)
+        if version:
+            response = not_modified(request, version_etag("result", *result_version(version)))
+            if response:
+                return response
+    
+    result = await results.find_one(query)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result not found")
     
-    return ExamResultResponse(
-        id=str(result["_id"]),
-        user_id=str(result["user_id"]),
-        quiz_id=str(result["quiz_id"]),
-        document_id=str(result["document_id"]),
-        quiz_title=result["quiz_title"],
-        total_questions=result["total_questions"],
-        correct_answers=result["correct_answers"],
-        wrong_answers=result["wrong_answers"],
-        score_percentage=result["score_percentage"],
-        time_taken=result["time_taken"],
-        difficulty=Difficulty(result["difficulty"]),
-        answers=[AnswerDetail(**a) for a in result.get("answers", [])],
-        weak_topics=result.get("weak_topics", []),
-        completed_at=result["completed_at"]
+    questions = None
+    if "question_ids" in result:
+        quiz = await get_quizzes_collection().find_one(
+            {"_id": result["quiz_id"]},
+            {"questions.id": 1, "questions.question_text": 1, "questions.correct_answer": 1, "questions.explanation": 1}
+        )
+        questions = quiz["questions"] if quiz else []
+    
+    return cached_json(result_dict(result, questions), version_etag("result", *result_version(result)))
+
+
+@router.get("/results/{result_id}/weak-topics", response_model=WeakTopicsResponse)
+async def get_weak_topics(
+    result_id: str,
+    wait: float = Query(0, ge=0, le=30),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the weak topic analysis of an exam result.
+    With `wait` > 0 this long-polls: it returns as soon as the analysis is no
+    longer pending, or after `wait` seconds.
+    """
+    results = get_quiz_results_collection()
+    
+    try:
+        query = {"_id": ObjectId(result_id), "user_id": current_user["_id"]}
+    except:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result not found")
+    
+    projection = {"weak_topics": 1, "weak_topics_status": 1}
+    deadline = time.monotonic() + wait
+    while True:
+        result = await results.find_one(query, projection)
+        if not result:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result not found")
+        
+        analysis_status = result.get("weak_topics_status", AnalysisStatus.COMPLETED.value)
+        if analysis_status != AnalysisStatus.PENDING.value or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(WEAK_TOPICS_POLL_INTERVAL)
+    
+    return WeakTopicsResponse(
+        result_id=result_id,
+        status=AnalysisStatus(analysis_status),
+        weak_topics=result.get("weak_topics", [])
     )
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.models.quiz import QuizQuestion, QuizOption
+from app.models.review import (
+    ReviewItem, ReviewQueueResponse, ReviewSubmission, ReviewResult, ReviewSessionResponse
+)
+from app.services.review_service import review_service
+from app.utils.security import get_current_user
+
+router = APIRouter()
+
+
+def review_item_to_response(item: dict, question: dict) -> ReviewItem:
+    """Convert a review item and its quiz question to response model (answers stripped)."""
+    return ReviewItem(
+        id=str(item["_id"]),
+        document_id=str(item["document_id"]),
+        quiz_id=str(item["quiz_id"]),
+        question=QuizQuestion(
+            id=question["id"],
+            question_text=question["question_text"],
+            options=[QuizOption(**opt) for opt in question["options"]],
+            correct_answer="",
+            explanation=""
+        ),
+        repetitions=item.get("repetitions", 0),
+        due_at=item["due_at"]
+    )
+
+
+@router.get("/due", response_model=ReviewQueueResponse)
+async def get_due_reviews(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get questions due for review today."""
+    paired, total_due = await review_service.due_items(current_user["_id"], limit)
+    return ReviewQueueResponse(
+        items=[review_item_to_response(item, question) for item, question in paired],
+        total_due=total_due
+    )
+
+
+@router.post("/submit", response_model=ReviewSessionResponse)
+async def submit_review(
+    submission: ReviewSubmission,
+    current_user: dict = Depends(get_current_user)
+):
+    """Grade a review session and reschedule its items."""
+    answers = {a.item_id: a.selected_answer for a in submission.answers}
+    results = await review_service.grade(current_user["_id"], answers)
+    return ReviewSessionResponse(
+        results=[ReviewResult(**r) for r in results],
+        correct=sum(1 for r in results if r["is_correct"]),
+        total=len(results)
+    )
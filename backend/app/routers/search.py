@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+import time
+
+from app.config import settings
+from app.models.search import SearchResponse, SearchHit, SemanticSearchResponse, SemanticHit
+from app.services.resilience import AIServiceUnavailable, deadline_scope
+from app.services.search_service import search_service
+from app.services.semantic_search_service import semantic_search_service
+from app.utils.security import get_current_user
+from app.utils.logger import logger
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResponse)
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """Full-text search over the pages of the user's documents."""
+    start_time = time.perf_counter()
+    hits, total = await search_service.search(current_user["_id"], q, limit)
+    took_ms = (time.perf_counter() - start_time) * 1000
+    
+    logger.debug(f"🔎 Search │ '{q}' → {total} pages in {took_ms:.1f}ms")
+    
+    return SearchResponse(
+        query=q,
+        hits=[SearchHit(**hit) for hit in hits],
+        total=total,
+        took_ms=round(took_ms, 2)
+    )
+
+
+@router.get("/semantic", response_model=SemanticSearchResponse)
+async def semantic_search(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """Semantic search over chunks and page summaries of the user's documents."""
+    if not settings.SEMANTIC_SEARCH_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Semantic search is disabled")
+    
+    start_time = time.perf_counter()
+    try:
+        with deadline_scope(settings.AI_INTERACTIVE_DEADLINE):
+            hits = await semantic_search_service.search(current_user["_id"], q, limit)
+    except AIServiceUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service is busy or unavailable. Please try again shortly."
+        )
+    took_ms = (time.perf_counter() - start_time) * 1000
+    
+    return SemanticSearchResponse(
+        query=q,
+        hits=[SemanticHit(**hit) for hit in hits],
+        took_ms=round(took_ms, 2)
+    )
@@ -0,0 +1,133 @@
+"""Per-day learning activity stored as one document per user and day."""
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Any, Optional, Set
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.database import get_daily_activity_collection, get_progress_collection
+from app.utils.logger import logger
+
+DUPLICATE_KEY = 11000
+
+COUNTERS = ("documents_uploaded", "quizzes_taken", "questions_answered", "correct_answers", "study_seconds")
+
+
+class ActivityService:
+    """
+    Records daily activity with a single atomic `$inc` upsert on a
+    (user_id, day) document, so concurrent events never lose updates and
+    history is kept indefinitely. Date-range reads go through the unique
+    (user_id, day) index. Days are UTC ISO dates.
+
+    Activity used to be kept in a `daily_stats` array on the user's
+    learning_progress document; it is copied here once per user on their
+    first read.
+    """
+
+    def __init__(self):
+        self._migrated: Set[ObjectId] = set()
+
+    async def migrate_legacy(self, user_id: ObjectId):
+        """
+        Copy the user's old learning_progress.daily_stats entries into
+        daily_activity, then drop the array. Each copied day is flagged
+        `legacy_copied`, so a migration that is retried (after a failure, or
+        run twice concurrently) never adds the same entry again.
+        """
+        if user_id in self._migrated:
+            return
+        progress = await get_progress_collection().find_one(
+            {"user_id": user_id, "daily_stats": {"$exists": True}},
+            {"daily_stats": 1}
+        )
+
+        operations = []
+        for stat in (progress or {}).get("daily_stats") or []:
+            if not stat.get("date"):
+                continue
+            increments = {
+                counter: stat.get(counter, 0)
+                for counter in ("documents_uploaded", "quizzes_taken", "questions_answered", "correct_answers")
+            }
+            increments["study_seconds"] = stat.get("study_time", 0) * 60
+            operations.append(UpdateOne(
+                {"user_id": user_id, "day": str(stat["date"])[:10], "legacy_copied": {"$ne": True}},
+                {"$inc": increments, "$set": {"legacy_copied": True, "updated_at": datetime.utcnow()}},
+                upsert=True
+            ))
+
+        try:
+            # A duplicate key means the day document exists: either already copied (the filter
+            # skipped it) or created by a concurrent record(), which one more pass picks up.
+            # Whatever still collides after that pass was already copied.
+            for _ in range(2):
+                if not operations:
+                    break
+                try:
+                    await get_daily_activity_collection().bulk_write(operations, ordered=False)
+                    operations = []
+                except BulkWriteError as e:
+                    errors = e.details.get("writeErrors", [])
+                    if any(error["code"] != DUPLICATE_KEY for error in errors):
+                        raise
+                    operations = [operations[error["index"]] for error in errors]
+
+            if progress is not None:
+                await get_progress_collection().update_one(
+                    {"_id": progress["_id"]}, {"$unset": {"daily_stats": ""}}
+                )
+                logger.info(
+                    f"📅 Activity │ Migrated {len(progress.get('daily_stats') or [])} legacy days for user {user_id}"
+                )
+        except Exception as e:
+            # The array is kept; the next read tries again
+            logger.warning(f"⚠️ Activity │ Legacy migration failed for user {user_id}: {e}")
+            return
+        self._migrated.add(user_id)
+
+    async def record(self, user_id: ObjectId, day: Optional[date] = None, **increments: int):
+        """Add to today's (or `day`'s) counters, e.g. record(uid, quizzes_taken=1)."""
+        unknown = set(increments) - set(COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown activity counters: {sorted(unknown)}")
+
+        day = day or datetime.utcnow().date()
+        await get_daily_activity_collection().update_one(
+            {"user_id": user_id, "day": day.isoformat()},
+            {
+                "$inc": increments,
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+
+    async def get_range(self, user_id: ObjectId, start: date, end: date) -> List[Dict[str, Any]]:
+        """Days with activity between start and end (inclusive), oldest first, as DailyStat dicts."""
+        await self.migrate_legacy(user_id)
+        cursor = get_daily_activity_collection().find(
+            {"user_id": user_id, "day": {"$gte": start.isoformat(), "$lte": end.isoformat()}},
+            {"_id": 0, "user_id": 0, "updated_at": 0}
+        ).sort("day", 1)
+
+        return [
+            {
+                "date": row["day"],
+                "documents_uploaded": row.get("documents_uploaded", 0),
+                "quizzes_taken": row.get("quizzes_taken", 0),
+                "questions_answered": row.get("questions_answered", 0),
+                "correct_answers": row.get("correct_answers", 0),
+                "study_time": row.get("study_seconds", 0) // 60
+            }
+            for row in await cursor.to_list(length=None)
+        ]
+
+    async def get_recent(self, user_id: ObjectId, days: int) -> List[Dict[str, Any]]:
+        """Activity for the last `days` days including today."""
+        today = datetime.utcnow().date()
+        return await self.get_range(user_id, today - timedelta(days=days - 1), today)
+
+
+# Singleton instance
+activity_service = ActivityService()
@@ -1,13 +1,19 @@
+import asyncio
 import httpx
 import base64
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 try:
     import wikipedia
 except ImportError:
     wikipedia = None
 
 from app.config import settings
+from app.services.resilience import (
+    AIServiceUnavailable, CircuitBreaker, remaining_time, sleep_before_retry
+)
+from app.utils.json_stream import JSONObjectStreamParser
+from app.utils.text_chunker import truncate_to_tokens, select_chunks
 from app.utils.logger import logger, log_ai_operation
 
 
@@ -17,66 +23,265 @@ class AIService:
     def __init__(self):
         self.base_url = settings.OLLAMA_BASE_URL.rstrip("/")
         self.model = settings.OLLAMA_MODEL
+        self.breaker = CircuitBreaker(
+            "ollama",
+            failure_threshold=settings.OLLAMA_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.OLLAMA_BREAKER_RESET_SECONDS
+        )
     
-    async def _make_request(self, prompt: str, images: List[str] = None) -> str:
-        """Make a request to Ollama API."""
+    def _is_retryable(self, error: Exception) -> bool:
+        """Transport failures, timeouts, 429 and 5xx are worth retrying; other 4xx are not."""
+        if isinstance(error, httpx.HTTPStatusError):
+            code = error.response.status_code
+            return code == 429 or code >= 500
+        return isinstance(error, httpx.TransportError)
+    
+    def _record_failure(self, error: Exception, deadline_bound: bool, is_probe: bool):
+        """
+        Count a retryable failure against the breaker, unless it is a timeout
+        that only happened because the caller's deadline was shorter than
+        OLLAMA_TIMEOUT: a slow but healthy Ollama must not open the circuit.
+        """
+        if deadline_bound and isinstance(error, httpx.TimeoutException):
+            if is_probe:
+                self.breaker.release_probe()
+            return
+        self.breaker.record_failure(error)
+    
+    async def _post(self, url: str, payload: Dict[str, Any], idempotent: bool = True) -> Dict[str, Any]:
+        """
+        POST to Ollama with the circuit breaker, the caller's deadline and
+        jittered exponential retries (idempotent prompts only).
+        """
+        max_attempts = 1 + (settings.OLLAMA_MAX_RETRIES if idempotent else 0)
+        
+        for attempt in range(max_attempts):
+            timeout = settings.OLLAMA_TIMEOUT
+            remaining = remaining_time()
+            if remaining is not None:
+                if remaining <= 0:
+                    raise AIServiceUnavailable("AI request deadline exceeded")
+                timeout = min(timeout, remaining)
+            deadline_bound = timeout < settings.OLLAMA_TIMEOUT
+            
+            if not self.breaker.allow_request():
+                raise AIServiceUnavailable("AI service is temporarily unavailable")
+            is_probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+            
+            try:
+                async with httpx.AsyncClient(timeout=timeout) as client:
+                    response = await client.post(url, json=payload)
+                    response.raise_for_status()
+                    result = response.json()
+                self.breaker.record_success()
+                return result
+            except Exception as e:
+                if not self._is_retryable(e):
+                    # Ollama answered (e.g. 4xx for a bad payload), so it is reachable
+                    self.breaker.record_success()
+                    raise
+                self._record_failure(e, deadline_bound, is_probe)
+                
+                is_last = attempt == max_attempts - 1
+                if is_last or not await sleep_before_retry(
+                    attempt, settings.OLLAMA_RETRY_BASE_DELAY, settings.OLLAMA_RETRY_MAX_DELAY
+                ):
+                    # Callers handle an unreachable AI as unavailability (503), not as a crash
+                    raise AIServiceUnavailable(f"AI service request failed: {e}") from e
+                logger.warning(f"🔁 AI Retry │ Attempt {attempt + 1}/{max_attempts} failed: {e}")
+            except BaseException:
+                # Cancelled before an outcome; the probe slot must not stay taken
+                if is_probe:
+                    self.breaker.release_probe()
+                raise
+    
+    async def _stream(self, url: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        POST to Ollama with streaming enabled and yield each NDJSON chunk.
+        Failures before the first chunk are retried like _post; once output
+        has been yielded the stream cannot be replayed, so errors propagate.
+        """
+        max_attempts = 1 + settings.OLLAMA_MAX_RETRIES
+        
+        for attempt in range(max_attempts):
+            timeout = settings.OLLAMA_TIMEOUT
+            remaining = remaining_time()
+            if remaining is not None:
+                if remaining <= 0:
+                    raise AIServiceUnavailable("AI request deadline exceeded")
+                timeout = min(timeout, remaining)
+            deadline_bound = timeout < settings.OLLAMA_TIMEOUT
+            
+            if not self.breaker.allow_request():
+                raise AIServiceUnavailable("AI service is temporarily unavailable")
+            is_probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+            
+            started = False
+            try:
+                async with httpx.AsyncClient(timeout=timeout) as client:
+                    async with client.stream("POST", url, json=payload) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line.strip():
+                                continue
+                            chunk = json.loads(line)
+                            if chunk.get("error"):
+                                raise RuntimeError(chunk["error"])
+                            if not started:
+                                started = True
+                                self.breaker.record_success()
+                            yield chunk
+                            if chunk.get("done"):
+                                return
+                            remaining = remaining_time()
+                            if remaining is not None and remaining <= 0:
+                                raise AIServiceUnavailable("AI request deadline exceeded")
+                return
+            except AIServiceUnavailable:
+                raise
+            except Exception as e:
+                if started or not self._is_retryable(e):
+                    if not started:
+                        self.breaker.record_success()
+                    raise
+                self._record_failure(e, deadline_bound, is_probe)
+                
+                is_last = attempt == max_attempts - 1
+                if is_last or not await sleep_before_retry(
+                    attempt, settings.OLLAMA_RETRY_BASE_DELAY, settings.OLLAMA_RETRY_MAX_DELAY
+                ):
+                    # Callers handle an unreachable AI as unavailability (503), not as a crash
+                    raise AIServiceUnavailable(f"AI service request failed: {e}") from e
+                logger.warning(f"🔁 AI Retry │ Stream attempt {attempt + 1}/{max_attempts} failed: {e}")
+            except BaseException:
+                # Cancelled or closed by a disconnecting client; free the probe slot
+                if is_probe:
+                    self.breaker.release_probe()
+                raise
+    
+    async def _make_request(
+        self, prompt: str, images: List[str] = None, task: str = None, idempotent: bool = True
+    ) -> str:
+        """Make a request to Ollama API using the model routed for the task."""
         url = f"{self.base_url}/api/generate"
         
         payload = {
-            "model": self.model,
+            "model": settings.model_for_task(task),
             "prompt": prompt,
             "stream": False,
-            "options": {
-                "temperature": 0.7,
-                "top_p": 0.9
-            }
+            "options": settings.options_for_task(task)
         }
         
         if images:
             payload["images"] = images
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                result = response.json()
-                return result.get("response", "")
-            except Exception as e:
-                logger.error(f"AI Service Error: {e}", exc_info=True)
-                raise
+        try:
+            result = await self._post(url, payload, idempotent=idempotent)
+            return result.get("response", "")
+        except AIServiceUnavailable as e:
+            logger.warning(f"AI Service Unavailable: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"AI Service Error: {e}", exc_info=True)
+            raise
     
-    async def _make_chat_request(self, messages: List[Dict], images: List[str] = None) -> str:
-        """Make a chat request to Ollama API."""
+    async def _make_chat_request(
+        self, messages: List[Dict], images: List[str] = None, task: str = None, idempotent: bool = True
+    ) -> str:
+        """Make a chat request to Ollama API using the model routed for the task."""
         url = f"{self.base_url}/api/chat"
         
         payload = {
-            "model": self.model,
+            "model": settings.model_for_task(task),
             "messages": messages,
             "stream": False,
-            "options": {
-                "temperature": 0.7,
-                "top_p": 0.9
-            }
+            "options": settings.options_for_task(task)
         }
         
         if images and messages:
             messages[-1]["images"] = images
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                result = response.json()
-                return result.get("message", {}).get("content", "")
-            except Exception as e:
-                logger.error(f"AI Chat Service Error: {e}", exc_info=True)
-                raise
+        try:
+            result = await self._post(url, payload, idempotent=idempotent)
+            return result.get("message", {}).get("content", "")
+        except AIServiceUnavailable as e:
+            logger.warning(f"AI Chat Service Unavailable: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"AI Chat Service Error: {e}", exc_info=True)
+            raise
+    
+    async def _stream_request(
+        self, prompt: str, images: List[str] = None, task: str = None
+    ) -> AsyncIterator[str]:
+        """Streaming variant of _make_request that yields tokens as they are generated."""
+        url = f"{self.base_url}/api/generate"
+        
+        payload = {
+            "model": settings.model_for_task(task),
+            "prompt": prompt,
+            "stream": True,
+            "options": settings.options_for_task(task)
+        }
+        
+        if images:
+            payload["images"] = images
+        
+        try:
+            async for chunk in self._stream(url, payload):
+                token = chunk.get("response", "")
+                if token:
+                    yield token
+        except AIServiceUnavailable as e:
+            logger.warning(f"AI Service Unavailable: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"AI Stream Error: {e}", exc_info=True)
+            raise
+    
+    async def _stream_chat_request(
+        self, messages: List[Dict], images: List[str] = None, task: str = None
+    ) -> AsyncIterator[str]:
+        """Streaming variant of _make_chat_request that yields tokens as they are generated."""
+        url = f"{self.base_url}/api/chat"
+        
+        payload = {
+            "model": settings.model_for_task(task),
+            "messages": messages,
+            "stream": True,
+            "options": settings.options_for_task(task)
+        }
+        
+        if images and messages:
+            messages[-1]["images"] = images
+        
+        try:
+            async for chunk in self._stream(url, payload):
+                token = chunk.get("message", {}).get("content", "")
+                if token:
+                    yield token
+        except AIServiceUnavailable as e:
+            logger.warning(f"AI Chat Service Unavailable: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"AI Chat Stream Error: {e}", exc_info=True)
+            raise
     
     def _encode_image(self, image_path: str) -> str:
         """Encode image to base64."""
         with open(image_path, "rb") as f:
             return base64.b64encode(f.read()).decode("utf-8")
     
+    def _prompt_context(self, text: str, task: str, chunks: List[Dict[str, Any]] = None) -> str:
+        """
+        Fit document text into the task's prompt token budget, preferring the
+        chunks stored at processing time over re-splitting the full text.
+        """
+        budget = settings.PROMPT_TOKEN_BUDGETS.get(task, settings.CHUNK_MAX_TOKENS)
+        if chunks:
+            return select_chunks(chunks, budget)
+        return truncate_to_tokens(text, budget)
+    
     async def extract_text_from_image(self, image_path: str) -> str:
         """Extract text from image using vision model."""
         image_base64 = self._encode_image(image_path)
@@ -87,14 +292,10 @@ class AIService:
         Return only the extracted text content."""
         
         log_ai_operation("Text Extraction", f"Processing {image_path}")
-        return await self._make_request(prompt, images=[image_base64])
+        return await self._make_request(prompt, images=[image_base64], task="vision")
     
-    async def generate_summary(self, text: str, title: str = "") -> str:
-        """
-        Generate a concise, clean text summary of the document.
-        Handles potentially large text by chunking if necessary (though simplified here for context).
-        Enforces strict plain text output (no markdown).
-        """
+    def _representative_text(self, text: str) -> str:
+        """Sample long documents down to a prompt-sized overview."""
         # Chunking strategy: If text is too long (> 12000 chars), take the first, middle, and last chunks
         # to ensure the model doesn't choke, while still getting a good overview.
         # Ideally, we would summarize chunks and combine, but for speed, representative sampling works well.
@@ -104,9 +305,16 @@ class AIService:
             middle_idx = len(text) // 2
             middle = text[middle_idx - 2000 : middle_idx + 2000]
             end = text[-chunk_size:]
-            processed_text = f"{start}\n...\n{middle}\n...\n{end}"
-        else:
-            processed_text = text
+            return f"{start}\n...\n{middle}\n...\n{end}"
+        return text
+    
+    async def generate_summary(self, text: str, title: str = "") -> str:
+        """
+        Generate a concise, clean text summary of the document.
+        Handles potentially large text by chunking if necessary (though simplified here for context).
+        Enforces strict plain text output (no markdown).
+        """
+        processed_text = self._representative_text(text)
 
         prompt = f"""You are an educational content summarizer. Create a clear, concise summary of the following document content.
 
@@ -126,17 +334,17 @@ Instructions:
 Provide the plain text summary now:"""
         
         log_ai_operation("Generate Summary", title)
-        return await self._make_request(prompt)
+        return await self._make_request(prompt, task="summary")
     
-    async def generate_easy_explanation(self, text: str, title: str = "") -> str:
-        """Generate an easy-to-understand explanation."""
-        prompt = f"""You are a friendly teacher explaining complex topics to students. 
+    def _build_explanation_prompt(self, text: str, title: str = "", chunks: List[Dict[str, Any]] = None) -> str:
+        """Build the easy-explanation prompt."""
+        return f"""You are a friendly teacher explaining complex topics to students. 
 Take the following content and explain it in very simple terms that anyone can understand.
 
 Document Title: {title}
 
 Content:
-{text[:8000]}
+{self._prompt_context(text, "explanation", chunks)}
 
 Instructions:
 1. Use everyday language and simple words
@@ -146,16 +354,91 @@ Instructions:
 5. Use a conversational, friendly tone
 
 Provide the easy explanation now:"""
+    
+    async def analyze_document(
+        self, text: str, title: str = "", include_explanation: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Single-pass analysis returning summary, key concepts and (optionally) an
+        easy explanation, so the document text is evaluated by the model once.
+        Fields that are missing or malformed are left out of the result; callers
+        fall back to the dedicated generate_* / extract_* method for those.
+        """
+        explanation_field = ""
+        if include_explanation:
+            explanation_field = '\n  "easy_explanation": "A friendly, simple explanation using everyday language, analogies and examples.",'
+        
+        prompt = f"""You are an educational content assistant. Analyze the following document content.
+
+Document Title: {title}
+
+Content:
+{self._representative_text(text)}
+
+Return ONLY a JSON object in this format:
+{{
+  "summary": "A clear, concise, well-structured plain text summary of the main topics and key points.",{explanation_field}
+  "key_concepts": ["concept1", "concept2", "concept3"]
+}}
+
+Rules:
+- All text values must be PLAIN TEXT. Do NOT use markdown, asterisks (**), bullet points or hash symbols (#).
+- key_concepts lists up to 20 key concepts, terms and topics.
+
+Return ONLY the JSON object:"""
+        
+        log_ai_operation("Analyze Document", title)
+        response = await self._make_request(prompt, task="analysis")
+        
+        data = {}
+        try:
+            import re
+            json_match = re.search(r'\{[\s\S]*\}', response)
+            if json_match:
+                data = json.loads(json_match.group())
+        except json.JSONDecodeError:
+            pass
+        if not isinstance(data, dict):
+            data = {}
+        
+        result = {}
+        if isinstance(data.get("summary"), str) and data["summary"].strip():
+            result["summary"] = data["summary"].strip()
+        explanation = data.get("easy_explanation")
+        if include_explanation and isinstance(explanation, str) and explanation.strip():
+            result["easy_explanation"] = explanation.strip()
+        if isinstance(data.get("key_concepts"), list) and data["key_concepts"]:
+            result["key_concepts"] = [str(c) for c in data["key_concepts"]][:20]
+        
+        if not result:
+            logger.warning(f"⚠️ AI │ Combined analysis unparseable for {title}, falling back to single prompts")
+        return result
+    
+    async def generate_easy_explanation(
+        self, text: str, title: str = "", chunks: List[Dict[str, Any]] = None
+    ) -> str:
+        """Generate an easy-to-understand explanation."""
+        prompt = self._build_explanation_prompt(text, title, chunks)
         
         log_ai_operation("Generate Explanation", title)
-        return await self._make_request(prompt)
+        return await self._make_request(prompt, task="explanation")
+    
+    async def stream_easy_explanation(
+        self, text: str, title: str = "", chunks: List[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream an easy-to-understand explanation token by token."""
+        prompt = self._build_explanation_prompt(text, title, chunks)
+        
+        log_ai_operation("Stream Explanation", title)
+        async for token in self._stream_request(prompt, task="explanation"):
+            yield token
     
-    async def extract_key_concepts(self, text: str) -> List[str]:
+    async def extract_key_concepts(self, text: str, chunks: List[Dict[str, Any]] = None) -> List[str]:
         """Extract key concepts from the document."""
         prompt = f"""Analyze the following educational content and identify the key concepts, terms, and topics.
 
 Content:
-{text[:6000]}
+{self._prompt_context(text, "concepts", chunks)}
 
 Return a JSON array of key concepts. Example format:
 ["concept1", "concept2", "concept3"]
@@ -163,7 +446,7 @@ Return a JSON array of key concepts. Example format:
 Return ONLY the JSON array, nothing else:"""
         
         log_ai_operation("Extract Concepts")
-        response = await self._make_request(prompt)
+        response = await self._make_request(prompt, task="concepts")
         
         try:
             # Parse JSON response
@@ -178,29 +461,24 @@ Return ONLY the JSON array, nothing else:"""
         
         return []
     
-    async def generate_quiz_questions(
-        self, 
-        text: str, 
-        difficulty: str, 
-        count: int,
-        title: str = ""
-    ) -> List[Dict[str, Any]]:
-        """Generate MCQ quiz questions based on difficulty."""
-        
+    def _build_quiz_prompt(
+        self, text: str, difficulty: str, count: int, title: str = "", chunks: List[Dict[str, Any]] = None
+    ) -> str:
+        """Build the MCQ generation prompt."""
         difficulty_instructions = {
             "easy": "Focus on basic recall and simple understanding. Questions should test direct facts from the content.",
             "medium": "Include questions that require understanding relationships between concepts. Mix recall with comprehension questions.",
             "hard": "Create challenging questions that require analysis, application, and critical thinking. Include questions that combine multiple concepts."
         }
         
-        prompt = f"""You are an expert quiz creator for educational content. Generate {count} multiple-choice questions based on the following content.
+        return f"""You are an expert quiz creator for educational content. Generate {count} multiple-choice questions based on the following content.
 
 Document Title: {title}
 Difficulty Level: {difficulty.upper()}
 {difficulty_instructions.get(difficulty, difficulty_instructions["medium"])}
 
 Content:
-{text[:6000]}
+{self._prompt_context(text, "quiz", chunks)}
 
 Generate exactly {count} questions in the following JSON format:
 [
@@ -224,9 +502,20 @@ Important:
 - Make wrong answers plausible but clearly incorrect
 
 Return ONLY the JSON array:"""
+    
+    async def generate_quiz_questions(
+        self, 
+        text: str, 
+        difficulty: str, 
+        count: int,
+        title: str = "",
+        chunks: List[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Generate MCQ quiz questions based on difficulty."""
+        prompt = self._build_quiz_prompt(text, difficulty, count, title, chunks)
         
         log_ai_operation("Generate Quiz", f"{title} ({difficulty})")
-        response = await self._make_request(prompt)
+        response = await self._make_request(prompt, task="quiz")
         
         try:
             # Try to parse JSON
@@ -246,6 +535,29 @@ Return ONLY the JSON array:"""
         
         return []
     
+    async def stream_quiz_questions(
+        self, 
+        text: str, 
+        difficulty: str, 
+        count: int,
+        title: str = "",
+        chunks: List[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Generate MCQ quiz questions, yielding each one as soon as its JSON object is complete."""
+        prompt = self._build_quiz_prompt(text, difficulty, count, title, chunks)
+        parser = JSONObjectStreamParser()
+        emitted = 0
+        
+        log_ai_operation("Stream Quiz", f"{title} ({difficulty})")
+        async for token in self._stream_request(prompt, task="quiz"):
+            for question in parser.feed(token):
+                if "question_text" not in question:
+                    continue
+                yield question
+                emitted += 1
+                if emitted >= count:
+                    return
+    
     async def analyze_weak_topics(
         self, 
         wrong_answers: List[Dict], 
@@ -261,7 +573,7 @@ Return ONLY the JSON array:"""
         prompt = f"""Analyze the following incorrect quiz answers and identify the topics where the student needs improvement.
 
 Document Summary:
-{document_summary[:1000]}
+{self._prompt_context(document_summary, "weak_topics")}
 
 Incorrect Answers:
 {wrong_details}
@@ -272,7 +584,7 @@ Return a JSON array of topic names. Example: ["Topic 1", "Topic 2", "Topic 3"]
 Return ONLY the JSON array:"""
         
         log_ai_operation("Analyze Weak Topics")
-        response = await self._make_request(prompt)
+        response = await self._make_request(prompt, task="weak_topics")
         
         try:
             topics = json.loads(response.strip())
@@ -288,7 +600,7 @@ Return ONLY the JSON array:"""
         prompt = f"""Analyze the following content from page {page_number} of a document.
 
 Content:
-{page_text[:4000]}
+{self._prompt_context(page_text, "page_insights")}
 
 Instructions:
 1. Summarize the main point of this page in 1-2 sentences (clean text).
@@ -303,7 +615,7 @@ Return ONLY a JSON object in this format:
 }}"""
         
         log_ai_operation("Page Insights", f"Page {page_number}")
-        response = await self._make_request(prompt)
+        response = await self._make_request(prompt, task="page_insights")
         
         try:
             import re
@@ -319,6 +631,100 @@ Return ONLY a JSON object in this format:
             "focus_topic": None
         }
 
+    def _build_chat_messages(
+        self,
+        title: str,
+        context: str,
+        summary: str,
+        recent: List[Dict[str, str]],
+        question: str
+    ) -> List[Dict[str, str]]:
+        """
+        Build chat messages with the retrieved pages first. When a follow-up
+        retrieves the same pages the system message is byte-identical, so
+        Ollama can reuse the already evaluated prefix instead of re-reading it.
+        """
+        system = f"""You are a helpful tutor answering questions about the document "{title}".
+Answer using only the document excerpts below. If the answer is not in them, say so briefly.
+Answer in plain text without markdown.
+
+Document excerpts:
+{context}"""
+        messages = [{"role": "system", "content": system}]
+        if summary:
+            messages.append({"role": "system", "content": f"Conversation so far (summary): {summary}"})
+        messages.extend({"role": m["role"], "content": m["content"]} for m in recent)
+        messages.append({"role": "user", "content": question})
+        return messages
+    
+    async def stream_document_answer(
+        self,
+        title: str,
+        context: str,
+        summary: str,
+        recent: List[Dict[str, str]],
+        question: str
+    ) -> AsyncIterator[str]:
+        """Stream an answer to a question about a document, grounded in retrieved excerpts."""
+        messages = self._build_chat_messages(title, context, summary, recent, question)
+        
+        log_ai_operation("Document Chat", title)
+        async for token in self._stream_chat_request(messages, task="chat"):
+            yield token
+    
+    async def summarize_conversation(self, summary: str, messages: List[Dict[str, str]]) -> str:
+        """Fold older chat turns into a short rolling summary."""
+        transcript = "\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+        prompt = f"""Update the running summary of a tutoring conversation.
+
+Current summary:
+{summary or "(none)"}
+
+New turns:
+{self._prompt_context(transcript, "chat_summary")}
+
+Write an updated summary in at most 5 plain sentences covering what the student asked and what was explained.
+Return only the summary:"""
+        
+        log_ai_operation("Summarize Conversation")
+        return (await self._make_request(prompt, task="chat_summary")).strip()
+    
+    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in batches through Ollama's /api/embed endpoint."""
+        url = f"{self.base_url}/api/embed"
+        model = settings.model_for_task("embedding")
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        embeddings: List[List[float]] = []
+        
+        log_ai_operation("Embed", f"{len(texts)} texts")
+        for start in range(0, len(texts), batch_size):
+            payload = {"model": model, "input": texts[start:start + batch_size]}
+            try:
+                result = await self._post(url, payload)
+            except AIServiceUnavailable as e:
+                logger.warning(f"AI Embedding Unavailable: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"AI Embedding Error: {e}", exc_info=True)
+                raise
+            embeddings.extend(result.get("embeddings", []))
+        
+        return embeddings
+
+    def _lookup_wiki_term(self, term: str) -> Optional[Dict[str, str]]:
+        """Blocking Wikipedia lookup for a single term."""
+        # Basic search to get closest match
+        search_res = wikipedia.search(term, results=1)
+        if not search_res:
+            return None
+            
+        page = wikipedia.page(search_res[0], auto_suggest=False)
+        return {
+            "term": term,
+            "definition": page.summary[:300] + "...",
+            "url": page.url
+        }
+
     async def enrich_context_with_wiki(self, terms: List[str]) -> List[Dict[str, str]]:
         """Fetch Wikipedia definitions for terms."""
         results = []
@@ -327,17 +733,10 @@ Return ONLY a JSON object in this format:
             
         for term in terms[:5]: # XMLLimit to top 5 terms to avoid slowness
             try:
-                # Basic search to get closest match
-                search_res = wikipedia.search(term, results=1)
-                if not search_res:
-                    continue
-                    
-                page = wikipedia.page(search_res[0], auto_suggest=False)
-                results.append({
-                    "term": term,
-                    "definition": page.summary[:300] + "...",
-                    "url": page.url
-                })
+                # The wikipedia client is synchronous; keep it off the event loop
+                entry = await asyncio.to_thread(self._lookup_wiki_term, term)
+                if entry:
+                    results.append(entry)
             except Exception as e:
                 logger.warning(f"Wiki error for {term}: {e}")
                 continue
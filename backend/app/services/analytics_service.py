@@ -0,0 +1,177 @@
+"""Progress analytics computed with aggregation pipelines over quiz_results."""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Tuple, Callable, Awaitable
+
+from bson import ObjectId
+
+from app.database import get_quiz_results_collection, get_user_stats_collection
+
+WINDOW_DAYS = {"day": 1, "week": 7, "month": 31}
+SCORE_BUCKETS = [0, 20, 40, 60, 80, 101]
+
+
+class AnalyticsService:
+    """
+    Server-side rollups of a user's exam results.
+
+    Every pipeline starts with an indexed $match on user_id and projects
+    only the scalar fields it needs, so `answers` arrays never leave the
+    server and nothing is truncated. Results are cached per user and keyed
+    by the user's result count from `user_stats`, which every submission
+    increments, so a new submission invalidates them on every worker.
+    """
+
+    MAX_CACHED_ENTRIES = 512
+
+    def __init__(self):
+        self._cache: "OrderedDict[Tuple, Tuple[int, Any]]" = OrderedDict()
+
+    async def _cached(self, user_id: ObjectId, key: Tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+        stats = await get_user_stats_collection().find_one({"_id": user_id}, {"result_count": 1})
+        version = stats.get("result_count", 0) if stats else 0
+
+        cache_key = (str(user_id),) + key
+        cached = self._cache.get(cache_key)
+        if cached and cached[0] == version:
+            self._cache.move_to_end(cache_key)
+            return cached[1]
+
+        value = await compute()
+        self._cache[cache_key] = (version, value)
+        while len(self._cache) > self.MAX_CACHED_ENTRIES:
+            self._cache.popitem(last=False)
+        return value
+
+    def invalidate(self, user_id: ObjectId):
+        """Drop a user's cached analytics in this process."""
+        prefix = str(user_id)
+        for key in [k for k in self._cache if k[0] == prefix]:
+            del self._cache[key]
+
+    async def _aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await get_quiz_results_collection().aggregate(pipeline).to_list(length=None)
+
+    async def score_trend(self, user_id: ObjectId, window: str, periods: int) -> List[Dict[str, Any]]:
+        """Average score, quiz count and study time per day/week/month."""
+        since = datetime.utcnow() - timedelta(days=WINDOW_DAYS[window] * periods)
+
+        async def compute():
+            rows = await self._aggregate([
+                {"$match": {"user_id": user_id, "completed_at": {"$gte": since}}},
+                {"$project": {"completed_at": 1, "score_percentage": 1, "time_taken": 1}},
+                {"$group": {
+                    "_id": {"$dateTrunc": {"date": "$completed_at", "unit": window, "startOfWeek": "monday"}},
+                    "quizzes_taken": {"$sum": 1},
+                    "average_score": {"$avg": "$score_percentage"},
+                    "study_time": {"$sum": "$time_taken"}
+                }},
+                {"$sort": {"_id": 1}}
+            ])
+            return [
+                {
+                    "period_start": row["_id"],
+                    "quizzes_taken": row["quizzes_taken"],
+                    "average_score": round(row["average_score"], 1),
+                    "study_time": row["study_time"] // 60
+                }
+                for row in rows
+            ]
+
+        return await self._cached(user_id, ("trend", window, periods, since.date()), compute)
+
+    async def by_difficulty(self, user_id: ObjectId) -> List[Dict[str, Any]]:
+        """Quiz count, average score and answer accuracy per difficulty."""
+        async def compute():
+            rows = await self._aggregate([
+                {"$match": {"user_id": user_id}},
+                {"$project": {"difficulty": 1, "score_percentage": 1, "correct_answers": 1, "total_questions": 1}},
+                {"$group": {
+                    "_id": "$difficulty",
+                    "quizzes_taken": {"$sum": 1},
+                    "average_score": {"$avg": "$score_percentage"},
+                    "correct_answers": {"$sum": "$correct_answers"},
+                    "total_questions": {"$sum": "$total_questions"}
+                }},
+                {"$sort": {"_id": 1}}
+            ])
+            return [
+                {
+                    "difficulty": row["_id"],
+                    "quizzes_taken": row["quizzes_taken"],
+                    "average_score": round(row["average_score"], 1),
+                    "accuracy": round(row["correct_answers"] / row["total_questions"] * 100, 1)
+                    if row["total_questions"] else 0.0
+                }
+                for row in rows
+            ]
+
+        return await self._cached(user_id, ("difficulty",), compute)
+
+    async def by_document(self, user_id: ObjectId) -> List[Dict[str, Any]]:
+        """Per-document attempts, scores and mastery (share of questions answered correctly)."""
+        async def compute():
+            rows = await self._aggregate([
+                {"$match": {"user_id": user_id}},
+                {"$project": {
+                    "document_id": 1, "score_percentage": 1, "correct_answers": 1,
+                    "total_questions": 1, "completed_at": 1
+                }},
+                {"$group": {
+                    "_id": "$document_id",
+                    "attempts": {"$sum": 1},
+                    "average_score": {"$avg": "$score_percentage"},
+                    "best_score": {"$max": "$score_percentage"},
+                    "correct_answers": {"$sum": "$correct_answers"},
+                    "total_questions": {"$sum": "$total_questions"},
+                    "last_attempt": {"$max": "$completed_at"}
+                }},
+                {"$lookup": {
+                    "from": "documents",
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "pipeline": [{"$project": {"title": 1}}],
+                    "as": "document"
+                }},
+                {"$sort": {"last_attempt": -1}}
+            ])
+            return [
+                {
+                    "document_id": str(row["_id"]),
+                    "title": row["document"][0]["title"] if row["document"] else None,
+                    "attempts": row["attempts"],
+                    "average_score": round(row["average_score"], 1),
+                    "best_score": row["best_score"],
+                    "mastery": round(row["correct_answers"] / row["total_questions"] * 100, 1)
+                    if row["total_questions"] else 0.0,
+                    "last_attempt": row["last_attempt"]
+                }
+                for row in rows
+            ]
+
+        return await self._cached(user_id, ("document",), compute)
+
+    async def score_distribution(self, user_id: ObjectId) -> List[Dict[str, Any]]:
+        """Number of results per score band."""
+        async def compute():
+            rows = await self._aggregate([
+                {"$match": {"user_id": user_id}},
+                {"$project": {"score_percentage": 1}},
+                {"$bucket": {
+                    "groupBy": "$score_percentage",
+                    "boundaries": SCORE_BUCKETS,
+                    "default": "other",
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ])
+            counts = {row["_id"]: row["count"] for row in rows}
+            return [
+                {"min_score": low, "max_score": min(high, 100), "count": counts.get(low, 0)}
+                for low, high in zip(SCORE_BUCKETS, SCORE_BUCKETS[1:])
+            ]
+
+        return await self._cached(user_id, ("distribution",), compute)
+
+
+# Singleton instance
+analytics_service = AnalyticsService()
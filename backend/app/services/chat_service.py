@@ -0,0 +1,227 @@
+"""Document Q&A chat: per-turn retrieval and compact conversation state."""
+import asyncio
+import hashlib
+import math
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from bson import ObjectId
+
+from app.config import settings
+from app.database import get_documents_collection, get_conversations_collection
+from app.services.ai_service import ai_service
+from app.services.search_service import tokenize
+from app.utils.logger import logger
+from app.utils.text_chunker import select_chunks
+
+
+class DocumentChunkIndex:
+    """BM25 statistics over one document's stored chunks."""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, title: str, chunks: List[Dict[str, Any]]):
+        self.title = title
+        self.chunks = chunks
+        self.term_counts = [Counter(tokenize(c["text"])) for c in chunks]
+        self.lengths = [sum(tc.values()) for tc in self.term_counts]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        self.doc_freq = Counter()
+        for tc in self.term_counts:
+            self.doc_freq.update(tc.keys())
+        # Identifies this chunking; stored chunk indices are only valid against the same one
+        digest = hashlib.blake2b(digest_size=8)
+        for c in chunks:
+            digest.update(c["text"].encode())
+            digest.update(b"\0")
+        self.version = f"{len(chunks)}:{digest.hexdigest()}"
+
+    def valid(self, indices: List[int]) -> List[int]:
+        """The indices that point at a chunk of this index."""
+        return [i for i in indices if isinstance(i, int) and 0 <= i < len(self.chunks)]
+
+    def retrieve(self, terms: List[str], k: int) -> List[int]:
+        """Indices of the k best-matching chunks, in document order."""
+        return sorted(self.rank(terms, k))
+
+    def rank(self, terms: List[str], k: int) -> List[int]:
+        """Indices of the k best-matching chunks, best first."""
+        n = len(self.chunks)
+        if not n or not terms:
+            return []
+        scores = []
+        for i, tc in enumerate(self.term_counts):
+            score = 0.0
+            norm = self.K1 * (1 - self.B + self.B * self.lengths[i] / (self.avg_length or 1))
+            for term in terms:
+                tf = tc.get(term)
+                if tf:
+                    df = self.doc_freq[term]
+                    score += math.log(1 + (n - df + 0.5) / (df + 0.5)) * tf * (self.K1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((score, i))
+        return [i for _, i in sorted(scores, reverse=True)[:k]]
+
+
+class ChatService:
+    """
+    Answers questions about a document one turn at a time.
+
+    Each turn retrieves a few relevant chunks, and only those plus a rolling
+    summary and the last few messages go to the model. Conversations store
+    just that (summary, recent messages, last retrieved chunk indices and a
+    small query -> chunks cache), so per-turn cost stays flat as the
+    conversation grows. Identical retrievals produce an identical prompt
+    prefix, which lets Ollama reuse its evaluated context. Stored indices are
+    tagged with the chunking they came from and ignored once the document
+    has been reprocessed.
+    """
+
+    MAX_CACHED_DOCUMENTS = 32
+
+    def __init__(self):
+        self._indexes: "OrderedDict[Tuple[str, datetime], DocumentChunkIndex]" = OrderedDict()
+
+    async def get_document_index(self, user_id: ObjectId, document_id: ObjectId) -> Optional[DocumentChunkIndex]:
+        """Load (or reuse) the chunk index for a user's processed document."""
+        documents = get_documents_collection()
+        head = await documents.find_one(
+            {"_id": document_id, "user_id": user_id},
+            {"updated_at": 1, "processing_status": 1}
+        )
+        if not head:
+            return None
+
+        key = (str(document_id), head["updated_at"])
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+            return index
+
+        doc = await documents.find_one({"_id": document_id}, {"title": 1, "chunks": 1})
+        # Tokenizing every chunk is CPU work; keep it off the event loop
+        index = await asyncio.to_thread(DocumentChunkIndex, doc["title"], doc.get("chunks") or [])
+        self._indexes[key] = index
+        while len(self._indexes) > self.MAX_CACHED_DOCUMENTS:
+            self._indexes.popitem(last=False)
+        return index
+
+    async def get_or_create_conversation(
+        self, user_id: ObjectId, document_id: ObjectId, conversation_id: Optional[str]
+    ) -> Optional[dict]:
+        """Fetch the user's conversation for this document, or start a new one."""
+        conversations = get_conversations_collection()
+        if conversation_id:
+            try:
+                return await conversations.find_one({
+                    "_id": ObjectId(conversation_id),
+                    "user_id": user_id,
+                    "document_id": document_id
+                })
+            except Exception:
+                return None
+
+        now = datetime.utcnow()
+        conversation = {
+            "user_id": user_id,
+            "document_id": document_id,
+            "summary": "",
+            "messages": [],
+            "turn_count": 0,
+            "last_chunks": [],
+            "retrieval_cache": [],
+            "chunks_version": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        result = await conversations.insert_one(conversation)
+        conversation["_id"] = result.inserted_id
+        return conversation
+
+    def retrieve(self, index: DocumentChunkIndex, conversation: dict, question: str) -> Tuple[List[int], str, bool]:
+        """
+        Pick chunk indices for a turn. Returns (indices, query key, cache hit).
+        Follow-ups with no matching terms ("can you explain that more?")
+        reuse the previous turn's chunks.
+        """
+        terms = sorted(set(tokenize(question)))
+        key = " ".join(terms)
+        # Indices stored against an earlier chunking point at the wrong text (or past the end)
+        current = conversation.get("chunks_version") == index.version
+
+        if current:
+            for entry in conversation.get("retrieval_cache", []):
+                if entry["key"] == key:
+                    cached = index.valid(entry["chunks"])
+                    if cached:
+                        return cached, key, True
+
+        indices = index.retrieve(terms, settings.CHAT_RETRIEVAL_CHUNKS)
+        if not indices and current:
+            indices = index.valid(conversation.get("last_chunks") or [])
+        if not indices:
+            indices = list(range(min(len(index.chunks), settings.CHAT_RETRIEVAL_CHUNKS)))
+        return indices, key, False
+
+    def build_context(self, index: DocumentChunkIndex, indices: List[int]) -> str:
+        """Prompt context for the retrieved chunks, labelled with their pages."""
+        return select_chunks(
+            index.chunks,
+            settings.PROMPT_TOKEN_BUDGETS.get("chat", 2000),
+            index.valid(indices),
+            label=lambda chunk: f"[Pages {chunk['page_start']}-{chunk['page_end']}] "
+        )
+
+    async def record_turn(
+        self,
+        conversation: dict,
+        question: str,
+        answer: str,
+        indices: List[int],
+        query_key: str,
+        cache_hit: bool,
+        chunks_version: str
+    ):
+        """Persist a completed turn, folding old messages into the summary when needed."""
+        now = datetime.utcnow()
+        messages = conversation.get("messages", []) + [
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": answer}
+        ]
+        summary = conversation.get("summary", "")
+
+        overflow = len(messages) - settings.CHAT_RECENT_MESSAGES
+        if overflow > 0:
+            try:
+                summary = await ai_service.summarize_conversation(summary, messages[:overflow])
+                messages = messages[overflow:]
+            except Exception as e:
+                # Keep the messages; folding is retried on the next turn
+                logger.warning(f"⚠️ Chat │ Could not fold conversation summary: {e}")
+
+        cache = conversation.get("retrieval_cache", [])
+        if conversation.get("chunks_version") != chunks_version:
+            cache = []
+        if not cache_hit and query_key:
+            cache = (cache + [{"key": query_key, "chunks": indices}])[-settings.CHAT_RETRIEVAL_CACHE_SIZE:]
+
+        update = {
+            "summary": summary,
+            "messages": messages,
+            "last_chunks": indices,
+            "retrieval_cache": cache,
+            "chunks_version": chunks_version,
+            "updated_at": now
+        }
+        await get_conversations_collection().update_one(
+            {"_id": conversation["_id"]},
+            {"$set": update, "$inc": {"turn_count": 1}}
+        )
+        conversation.update(update)
+        conversation["turn_count"] = conversation.get("turn_count", 0) + 1
+
+
+# Singleton instance
+chat_service = ChatService()
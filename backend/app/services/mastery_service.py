@@ -0,0 +1,80 @@
+"""Per-user, per-topic mastery counters updated from graded answers."""
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import get_topic_mastery_collection
+
+
+class MasteryService:
+    """
+    One `topic_mastery` document per (user, topic) with total/correct counters
+    and a decayed mastery score (0-100).
+
+    The score is an exponential moving average over answers: a batch of n
+    answers with accuracy a moves it by weight w = 1 - (1 - alpha)^n toward a,
+    the same as applying the answers one at a time at their mean. Each exam
+    becomes one bulk write of pipeline upserts, one per topic. The
+    (user_id, mastery) index serves "weakest topics" reads directly.
+    """
+
+    def topic_key(self, topic: str) -> str:
+        return " ".join(topic.lower().split())
+
+    async def record(self, user_id: ObjectId, graded: List[Tuple[Optional[str], bool]]):
+        """Apply (topic, is_correct) pairs from one graded exam."""
+        per_topic: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for topic, is_correct in graded:
+            if not topic:
+                continue
+            entry = per_topic.setdefault(self.topic_key(topic), {"topic": topic, "total": 0, "correct": 0})
+            entry["total"] += 1
+            entry["correct"] += int(is_correct)
+
+        if not per_topic:
+            return
+
+        alpha = settings.TOPIC_MASTERY_DECAY
+        operations = []
+        for key, entry in per_topic.items():
+            accuracy = entry["correct"] / entry["total"] * 100
+            weight = 1 - (1 - alpha) ** entry["total"]
+            operations.append(UpdateOne(
+                {"user_id": user_id, "topic_key": key},
+                [{"$set": {
+                    "topic": entry["topic"],
+                    "total_questions": {"$add": [{"$ifNull": ["$total_questions", 0]}, entry["total"]]},
+                    "correct_answers": {"$add": [{"$ifNull": ["$correct_answers", 0]}, entry["correct"]]},
+                    # A new topic starts at its first batch's accuracy
+                    "mastery": {"$add": [
+                        {"$multiply": [{"$ifNull": ["$mastery", accuracy]}, 1 - weight]},
+                        accuracy * weight
+                    ]},
+                    "last_seen": "$$NOW"
+                }}],
+                upsert=True
+            ))
+
+        await get_topic_mastery_collection().bulk_write(operations, ordered=False)
+
+    async def get_topics(self, user_id: ObjectId, limit: int = 50) -> List[Dict[str, Any]]:
+        """A user's topics, most practiced first."""
+        cursor = get_topic_mastery_collection().find(
+            {"user_id": user_id}, {"_id": 0, "topic": 1, "total_questions": 1, "correct_answers": 1, "mastery": 1}
+        ).sort("total_questions", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def weakest_topics(self, user_id: ObjectId, limit: int = 5, min_questions: int = 1) -> List[Dict[str, Any]]:
+        """Topics with the lowest mastery, answered at least `min_questions` times."""
+        cursor = get_topic_mastery_collection().find(
+            {"user_id": user_id, "total_questions": {"$gte": min_questions}},
+            {"_id": 0, "topic": 1, "total_questions": 1, "correct_answers": 1, "mastery": 1}
+        ).sort("mastery", 1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+
+# Singleton instance
+mastery_service = MasteryService()
@@ -0,0 +1,164 @@
+"""Per-document bank of pre-generated quiz questions."""
+from datetime import datetime
+from typing import List, Dict, Any, Set
+
+from bson import ObjectId
+
+from app.config import settings
+from app.database import get_question_bank_collection, get_quizzes_collection
+from app.services.quiz_service import quiz_service
+from app.services.resilience import deadline_scope
+from app.utils.logger import logger
+from app.utils.minhash import LSHIndex
+from app.utils.single_flight import SingleFlight
+
+
+class QuestionBankService:
+    """
+    Stores generated questions per document, tagged with difficulty, page and
+    topic, so quiz creation can sample from the bank instead of waiting on a
+    full generation.
+
+    Draws skip questions used in the user's most recent quizzes on the same
+    document. When the unused supply for a difficulty drops below
+    QUESTION_BANK_LOW_WATERMARK it is topped back up to QUESTION_BANK_TARGET
+    in the background; concurrent refills for the same bank are coalesced.
+    """
+
+    def __init__(self):
+        self._refills = SingleFlight()
+
+    async def recently_used(self, user_id: ObjectId, document_id: ObjectId) -> Set[ObjectId]:
+        """Bank ids of questions in the user's latest quizzes on this document."""
+        cursor = get_quizzes_collection().find(
+            {"user_id": user_id, "document_id": document_id},
+            {"questions.bank_id": 1}
+        ).sort("created_at", -1).limit(settings.QUESTION_BANK_RECENT_QUIZZES)
+
+        used = set()
+        for quiz in await cursor.to_list(length=None):
+            for question in quiz.get("questions", []):
+                if question.get("bank_id"):
+                    used.add(ObjectId(question["bank_id"]))
+        return used
+
+    async def draw(
+        self, document_id: ObjectId, difficulty: str, count: int, exclude: Set[ObjectId]
+    ) -> List[Dict[str, Any]]:
+        """Sample up to `count` bank questions not in `exclude`."""
+        cursor = get_question_bank_collection().aggregate([
+            {"$match": {
+                "document_id": document_id,
+                "difficulty": difficulty,
+                "_id": {"$nin": list(exclude)}
+            }},
+            {"$sample": {"size": count}}
+        ])
+        return await cursor.to_list(length=count)
+
+    async def available(self, document_id: ObjectId, difficulty: str, exclude: Set[ObjectId]) -> int:
+        """Number of bank questions not in `exclude`."""
+        return await get_question_bank_collection().count_documents({
+            "document_id": document_id,
+            "difficulty": difficulty,
+            "_id": {"$nin": list(exclude)}
+        })
+
+    async def document_index(self, document_id: ObjectId, difficulty: str) -> LSHIndex:
+        """LSH index over a bank's stored MinHash signatures."""
+        rows = await get_question_bank_collection().find(
+            {"document_id": document_id, "difficulty": difficulty},
+            {"signature": 1, "question_text": 1, "options": 1}
+        ).to_list(length=None)
+        return quiz_service.build_index(rows)
+
+    async def add_questions(
+        self, doc: dict, difficulty: str, questions: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Store generated questions, rejecting near-duplicates of banked ones. Returns stored rows."""
+        index = await self.document_index(doc["_id"], difficulty)
+        kept = quiz_service.dedupe(questions, index)
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "document_id": doc["_id"],
+                "user_id": doc["user_id"],
+                "difficulty": difficulty,
+                "question_text": q.get("question_text", ""),
+                "options": q.get("options", []),
+                "correct_answer": q.get("correct_answer", "A"),
+                "explanation": q.get("explanation", ""),
+                "page_number": q.get("page_number"),
+                "topic": q.get("topic"),
+                "signature": q["signature"],
+                "created_at": now
+            }
+            for q in kept
+        ]
+        if rows:
+            await get_question_bank_collection().insert_many(rows)
+        if len(kept) < len(questions):
+            logger.info(
+                f"🏦 Question Bank │ Rejected {len(questions) - len(kept)} malformed or near-duplicate "
+                f"{difficulty} questions for {doc['_id']}"
+            )
+        return rows
+
+    async def generate(
+        self, doc: dict, difficulty: str, count: int, title: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate and bank `count` new questions. Slots lost to near-duplicates are
+        re-requested (only those slots) for up to QUESTION_REPLACEMENT_ROUNDS rounds.
+        """
+        stored = []
+        for round_number in range(1 + settings.QUESTION_REPLACEMENT_ROUNDS):
+            missing = count - len(stored)
+            if missing <= 0:
+                break
+            try:
+                questions = await quiz_service.generate_questions(doc, difficulty, missing, title)
+            except Exception:
+                # Keep what earlier rounds produced
+                if stored:
+                    break
+                raise
+            if not questions:
+                break
+            stored.extend(await self.add_questions(doc, difficulty, questions))
+        return stored
+
+    async def fill(self, doc: dict, difficulty: str, count: int) -> int:
+        """Generate `count` questions for the bank. Returns how many were stored."""
+        if count <= 0:
+            return 0
+        rows = await self.generate(doc, difficulty, count)
+        logger.info(f"🏦 Question Bank │ Stored {len(rows)} {difficulty} questions for {doc['_id']}")
+        return len(rows)
+
+    async def seed_document(self, doc: dict):
+        """Populate the bank for a freshly processed document."""
+        for difficulty in settings.QUESTION_BANK_SEED_DIFFICULTIES:
+            await self.refill(doc, difficulty)
+
+    async def refill(self, doc: dict, difficulty: str):
+        """Top a bank up to QUESTION_BANK_TARGET unused questions (background task)."""
+        async def work():
+            with deadline_scope(settings.AI_BACKGROUND_DEADLINE):
+                exclude = await self.recently_used(doc["user_id"], doc["_id"])
+                missing = settings.QUESTION_BANK_TARGET - await self.available(doc["_id"], difficulty, exclude)
+                return await self.fill(doc, difficulty, missing)
+
+        try:
+            await self._refills.run(f"{doc['_id']}:{difficulty}", work)
+        except Exception as e:
+            logger.warning(f"⚠️ Question Bank │ Refill failed for {doc['_id']} ({difficulty}): {e}")
+
+    async def remove_document(self, document_id: ObjectId):
+        """Drop a document's banked questions."""
+        await get_question_bank_collection().delete_many({"document_id": document_id})
+
+
+# Singleton instance
+question_bank_service = QuestionBankService()
@@ -0,0 +1,247 @@
+"""Retrieval-grounded quiz generation that covers the whole document."""
+import asyncio
+import math
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.ai_service import ai_service
+from app.services.resilience import AIServiceUnavailable
+from app.utils.logger import logger
+from app.utils.minhash import MinHasher, LSHIndex
+from app.utils.text_chunker import estimate_tokens, truncate_to_tokens
+
+
+class QuizService:
+    """
+    Builds quizzes from small, diverse slices of a document instead of one
+    prompt over its first few thousand characters.
+
+    Stored chunks are split into contiguous strata across the document; one
+    segment is picked per stratum, preferring pages whose focus topic has not
+    been used yet. Each segment gets its own small prompt, run in parallel,
+    and the results are interleaved, de-duplicated and trimmed to the
+    requested count.
+    """
+
+    # Smallest share of the quiz prompt budget worth giving one streamed segment
+    MIN_SEGMENT_TOKENS = 192
+
+    def __init__(self):
+        self.hasher = MinHasher(settings.MINHASH_PERMUTATIONS)
+
+    def page_topics(self, doc: dict) -> Dict[int, str]:
+        """Map page number -> focus topic from stored page insights."""
+        return {
+            p["page_number"]: p["focus_topic"]
+            for p in doc.get("page_summaries", [])
+            if p.get("focus_topic")
+        }
+
+    def select_diverse_chunks(self, doc: dict, n: int) -> List[int]:
+        """Pick up to n chunk indices spread over the document with distinct topics where possible."""
+        chunks = doc.get("chunks") or []
+        if not chunks or n <= 0:
+            return []
+        n = min(n, len(chunks))
+        topics = self.page_topics(doc)
+
+        selected, used_topics = [], set()
+        for stratum in range(n):
+            start = stratum * len(chunks) // n
+            end = max(start + 1, (stratum + 1) * len(chunks) // n)
+            candidates = range(start, end)
+            middle = (start + end - 1) // 2
+
+            choice = None
+            for i in sorted(candidates, key=lambda i: abs(i - middle)):
+                topic = topics.get(chunks[i]["page_start"])
+                if topic is None or topic.lower() not in used_topics:
+                    choice = i
+                    break
+            if choice is None:
+                choice = middle
+
+            topic = topics.get(chunks[choice]["page_start"])
+            if topic:
+                used_topics.add(topic.lower())
+            selected.append(choice)
+
+        return selected
+
+    def segment_chunks(self, doc: dict, index: int) -> List[Dict[str, Any]]:
+        """A chunk plus its successor, giving each prompt a little surrounding context."""
+        chunks = doc["chunks"]
+        return chunks[index:index + 2]
+
+    def context_chunks(self, doc: dict, segments: int = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Diverse chunks for a single prompt (used by the streaming endpoint).
+
+        The prompt holds only the quiz token budget, so the number of segments
+        is taken from it and each chunk is trimmed to an equal share; otherwise
+        the first couple of full chunks would use it up and the rest of the
+        document would never reach the model.
+        """
+        chunks = doc.get("chunks")
+        if not chunks:
+            return None
+        budget = settings.PROMPT_TOKEN_BUDGETS.get("quiz", settings.CHUNK_MAX_TOKENS)
+        segments = segments or min(settings.QUIZ_MAX_SEGMENTS, max(1, budget // self.MIN_SEGMENT_TOKENS))
+        indices = self.select_diverse_chunks(doc, segments)
+        share = max(1, budget // len(indices))
+
+        selected = []
+        for i in indices:
+            chunk = chunks[i]
+            if chunk.get("token_count", estimate_tokens(chunk["text"])) > share:
+                text = truncate_to_tokens(chunk["text"], share)
+                chunk = {**chunk, "text": text, "token_count": estimate_tokens(text)}
+            selected.append(chunk)
+        return selected
+
+    def clean_question(self, question: Any) -> Optional[Dict[str, Any]]:
+        """
+        The question with its options reduced to option_id/option_text, or None
+        if it is malformed: no text, fewer than two well-formed options with
+        distinct ids, or a correct answer that is not one of them.
+        """
+        if not isinstance(question, dict):
+            return None
+        text, options = question.get("question_text"), question.get("options")
+        if not isinstance(text, str) or not text.strip() or not isinstance(options, list):
+            return None
+
+        cleaned, option_ids = [], set()
+        for option in options:
+            if not isinstance(option, dict):
+                return None
+            option_id, option_text = option.get("option_id"), option.get("option_text")
+            if not isinstance(option_id, str) or not isinstance(option_text, str):
+                return None
+            option_id = option_id.strip()
+            if not option_id or option_id in option_ids:
+                return None
+            option_ids.add(option_id)
+            cleaned.append({"option_id": option_id, "option_text": option_text})
+
+        correct = question.get("correct_answer")
+        if len(cleaned) < 2 or not isinstance(correct, str) or correct.strip() not in option_ids:
+            return None
+        explanation = question.get("explanation")
+        return {
+            **question,
+            "question_text": text.strip(),
+            "options": cleaned,
+            "correct_answer": correct.strip(),
+            "explanation": explanation if isinstance(explanation, str) else ""
+        }
+
+    def signature(self, question: Dict[str, Any]) -> np.ndarray:
+        """MinHash signature over a question's text and option texts."""
+        options = " ".join(
+            opt.get("option_text", "") for opt in question.get("options", []) if isinstance(opt, dict)
+        )
+        return self.hasher.signature(f"{question.get('question_text', '')} {options}")
+
+    def build_index(self, questions: List[Dict[str, Any]]) -> LSHIndex:
+        """LSH index over questions, using their stored `signature` bytes when present."""
+        index = LSHIndex(settings.MINHASH_PERMUTATIONS, settings.MINHASH_BANDS)
+        for i, question in enumerate(questions):
+            stored = question.get("signature")
+            index.add(i, MinHasher.from_bytes(stored) if stored else self.signature(question))
+        return index
+
+    def dedupe(self, questions: List[Dict[str, Any]], index: LSHIndex = None) -> List[Dict[str, Any]]:
+        """
+        Drop malformed questions (see `clean_question`) and near-duplicates of
+        an earlier one or of anything already in `index`. Kept questions are
+        returned cleaned, added to the index and get their signature bytes
+        attached as `signature`.
+        """
+        index = index if index is not None else self.build_index([])
+        kept = []
+        for question in questions:
+            question = self.clean_question(question)
+            if question is None:
+                continue
+            signature = self.signature(question)
+            if index.find_duplicate(signature, settings.QUESTION_DUPLICATE_THRESHOLD) is not None:
+                continue
+            index.add(len(index), signature)
+            question["signature"] = MinHasher.to_bytes(signature)
+            kept.append(question)
+        return kept
+
+    async def generate_questions(
+        self, doc: dict, difficulty: str, count: int, title: str = ""
+    ) -> List[Dict[str, Any]]:
+        """Generate `count` questions grounded in chunks from across the document."""
+        chunks = doc.get("chunks") or []
+        if not chunks:
+            return await ai_service.generate_quiz_questions(
+                doc["extracted_text"], difficulty, count, title
+            )
+
+        n_segments = min(
+            len(chunks),
+            settings.QUIZ_MAX_SEGMENTS,
+            max(1, math.ceil(count / settings.QUIZ_QUESTIONS_PER_SEGMENT))
+        )
+        indices = self.select_diverse_chunks(doc, n_segments)
+        topics = self.page_topics(doc)
+
+        # Ask each segment for its share plus one spare to absorb duplicates
+        base, extra = divmod(count, len(indices))
+        quotas = [base + (1 if i < extra else 0) + 1 for i in range(len(indices))]
+
+        semaphore = asyncio.Semaphore(settings.QUIZ_PARALLEL_PROMPTS)
+
+        async def run_segment(index: int, quota: int) -> List[Dict[str, Any]]:
+            segment = self.segment_chunks(doc, index)
+            async with semaphore:
+                questions = await ai_service.generate_quiz_questions(
+                    "", difficulty, quota, title, chunks=segment
+                )
+            # Tag provenance only on well-formed questions; stray items must not sink the segment
+            cleaned = [q for q in map(self.clean_question, questions or []) if q is not None]
+            page = segment[0]["page_start"]
+            for question in cleaned:
+                question["page_number"] = page
+                question["topic"] = topics.get(page)
+            return cleaned
+
+        results = await asyncio.gather(
+            *(run_segment(i, q) for i, q in zip(indices, quotas)),
+            return_exceptions=True
+        )
+
+        per_segment = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Quiz │ Segment generation failed: {result}")
+                continue
+            per_segment.append(result)
+
+        if not per_segment:
+            unavailable = [r for r in results if isinstance(r, AIServiceUnavailable)]
+            if unavailable:
+                raise unavailable[0]
+            return []
+
+        # Interleave segments so a trimmed quiz still spans the document
+        interleaved = []
+        for rank in range(max(len(s) for s in per_segment)):
+            interleaved.extend(s[rank] for s in per_segment if rank < len(s))
+
+        questions = self.dedupe(interleaved)[:count]
+        logger.info(
+            f"📝 Quiz │ {len(questions)}/{count} questions from {len(per_segment)} segments "
+            f"(pages {sorted({q.get('page_number') for q in questions if q.get('page_number')})})"
+        )
+        return questions
+
+
+# Singleton instance
+quiz_service = QuizService()
@@ -0,0 +1,141 @@
+"""Resilience helpers for outbound AI calls: retries, circuit breaker and deadlines."""
+import asyncio
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any
+
+from app.utils.logger import logger
+
+
+class AIServiceUnavailable(Exception):
+    """Raised when the AI backend is known to be down or the caller's deadline has passed."""
+
+
+# Absolute deadline (time.monotonic()) for AI calls made in the current context
+_deadline: ContextVar[Optional[float]] = ContextVar("ai_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """
+    Bound every AI call made inside the block by a shared deadline.
+    Nested scopes can only shorten the deadline, never extend it.
+    """
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        new_deadline = min(new_deadline, current)
+    token = _deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None if no deadline is set."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff delay for a retry attempt (0-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def sleep_before_retry(attempt: int, base: float, cap: float) -> bool:
+    """
+    Sleep for a jittered backoff unless that would overrun the deadline.
+    Returns False when there is no time left for another attempt.
+    """
+    delay = backoff_delay(attempt, base, cap)
+    remaining = remaining_time()
+    if remaining is not None and remaining <= delay:
+        return False
+    await asyncio.sleep(delay)
+    return True
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    -> calls flow normally
+    open      -> calls fail fast until reset_timeout has elapsed
+    half_open -> a single probe call is let through; success closes, failure re-opens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed, moving open -> half_open when due."""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        # Half-open: only one probe at a time
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        """Record a successful call."""
+        if self.state != self.CLOSED:
+            logger.info(f"🔌 Breaker │ {self.name} recovered, closing circuit")
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """Free the half-open probe slot for a call that ended without an outcome (e.g. cancelled)."""
+        self._probe_in_flight = False
+
+    def record_failure(self, error: Exception = None):
+        """Record a failed call, opening the circuit once the threshold is reached."""
+        self.failure_count += 1
+        self._probe_in_flight = False
+        if error is not None:
+            self.last_error = f"{type(error).__name__}: {error}"
+
+        if self.state == self.HALF_OPEN or self.failure_count >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"🔌 Breaker │ {self.name} opened after {self.failure_count} failures"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for health reporting."""
+        retry_in = None
+        if self.state == self.OPEN and self.opened_at is not None:
+            retry_in = max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+        return {
+            "state": self.state,
+            "failure_count": self.failure_count,
+            "retry_in_seconds": retry_in,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,144 @@
+"""Spaced-repetition review of questions answered wrongly in exams."""
+from datetime import datetime, time, timedelta
+from typing import List, Dict, Any, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.database import get_review_items_collection, get_quizzes_collection
+from app.utils.spaced_repetition import sm2, DEFAULT_EASINESS
+
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+
+
+class ReviewService:
+    """
+    Keeps one `review_items` document per (user, quiz, question) that was
+    answered wrongly, scheduled with SM-2.
+
+    Items only reference their quiz question; sessions are built by batch
+    fetching the stored quiz questions, so no LLM call is involved. The
+    (user_id, due_at) index makes the due queue a range query, and a graded
+    session updates every schedule in one bulk write.
+    """
+
+    async def add_wrong_answers(
+        self, user_id: ObjectId, document_id: ObjectId, quiz_id: ObjectId, question_ids: List[str]
+    ):
+        """Schedule wrongly answered exam questions for review now, resetting known ones."""
+        if not question_ids:
+            return
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"user_id": user_id, "quiz_id": quiz_id, "question_id": question_id},
+                {
+                    "$set": {"repetitions": 0, "interval_days": 0, "due_at": now},
+                    "$inc": {"lapses": 1},
+                    "$setOnInsert": {
+                        "document_id": document_id,
+                        "easiness": DEFAULT_EASINESS,
+                        "created_at": now
+                    }
+                },
+                upsert=True
+            )
+            for question_id in question_ids
+        ]
+        await get_review_items_collection().bulk_write(operations, ordered=False)
+
+    async def _questions_for(self, items: List[Dict[str, Any]]) -> Dict[Tuple[ObjectId, str], dict]:
+        """Batch-fetch the stored quiz questions referenced by review items."""
+        wanted: Dict[ObjectId, set] = {}
+        for item in items:
+            wanted.setdefault(item["quiz_id"], set()).add(item["question_id"])
+        if not wanted:
+            return {}
+
+        cursor = get_quizzes_collection().find({"_id": {"$in": list(wanted)}}, {"questions": 1})
+        questions = {}
+        for quiz in await cursor.to_list(length=None):
+            for question in quiz.get("questions", []):
+                if question["id"] in wanted[quiz["_id"]]:
+                    questions[(quiz["_id"], question["id"])] = question
+        return questions
+
+    async def due_items(self, user_id: ObjectId, limit: int) -> Tuple[List[Tuple[dict, dict]], int]:
+        """Items due by the end of today (UTC) with their questions, earliest first, plus the total due count."""
+        collection = get_review_items_collection()
+        end_of_today = datetime.combine(datetime.utcnow().date() + timedelta(days=1), time.min)
+        query = {"user_id": user_id, "due_at": {"$lt": end_of_today}}
+        items = await collection.find(query).sort("due_at", 1).limit(limit).to_list(length=limit)
+        total_due = await collection.count_documents(query)
+
+        questions = await self._questions_for(items)
+        paired = [
+            (item, questions[(item["quiz_id"], item["question_id"])])
+            for item in items
+            if (item["quiz_id"], item["question_id"]) in questions
+        ]
+        return paired, total_due
+
+    async def grade(self, user_id: ObjectId, answers: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Grade a session of {item_id: selected option} and reschedule all items in one bulk write."""
+        # Keyed by the parsed id: ObjectId() also accepts non-canonical spellings (e.g. uppercase hex)
+        selected = {}
+        for item_id, answer in answers.items():
+            try:
+                selected[ObjectId(item_id)] = answer
+            except Exception:
+                continue
+
+        collection = get_review_items_collection()
+        items = await collection.find(
+            {"_id": {"$in": list(selected)}, "user_id": user_id}
+        ).to_list(length=None)
+        questions = await self._questions_for(items)
+
+        now = datetime.utcnow()
+        operations, results = [], []
+        for item in items:
+            question = questions.get((item["quiz_id"], item["question_id"]))
+            if question is None:
+                continue
+            is_correct = selected[item["_id"]] == question["correct_answer"]
+            repetitions, interval_days, easiness = sm2(
+                item.get("repetitions", 0),
+                item.get("interval_days", 0),
+                item.get("easiness", DEFAULT_EASINESS),
+                QUALITY_CORRECT if is_correct else QUALITY_WRONG
+            )
+            next_due_at = now + timedelta(days=interval_days)
+            update = {
+                "$set": {
+                    "repetitions": repetitions,
+                    "interval_days": interval_days,
+                    "easiness": easiness,
+                    "due_at": next_due_at,
+                    "last_reviewed_at": now
+                }
+            }
+            if not is_correct:
+                update["$inc"] = {"lapses": 1}
+            operations.append(UpdateOne({"_id": item["_id"]}, update))
+            results.append({
+                "item_id": str(item["_id"]),
+                "is_correct": is_correct,
+                "correct_answer": question["correct_answer"],
+                "explanation": question.get("explanation", ""),
+                "interval_days": interval_days,
+                "next_due_at": next_due_at
+            })
+
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+        return results
+
+    async def remove_document(self, document_id: ObjectId):
+        """Drop review items for a deleted document."""
+        await get_review_items_collection().delete_many({"document_id": document_id})
+
+
+# Singleton instance
+review_service = ReviewService()
@@ -0,0 +1,250 @@
+"""BM25 full-text search over the pages of a user's documents."""
+import asyncio
+import heapq
+import math
+import re
+from array import array
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Tuple
+
+from bson import ObjectId
+
+from app.database import (
+    get_documents_collection, get_search_postings_collection, get_search_documents_collection
+)
+from app.utils.logger import logger
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens with stopwords and single characters removed."""
+    return [
+        token for token in _WORD_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def pack_postings(postings: List[Tuple[int, int]]) -> bytes:
+    """Pack (page_number, term_frequency) pairs into a flat uint32 array."""
+    packed = array("I")
+    for page_number, tf in postings:
+        packed.append(page_number)
+        packed.append(tf)
+    return packed.tobytes()
+
+
+def unpack_uint32(data: bytes) -> array:
+    """Inverse of pack_postings / page length packing."""
+    values = array("I")
+    values.frombytes(data)
+    return values
+
+
+class SearchService:
+    """
+    Inverted index stored in MongoDB.
+
+    search_postings holds one row per (user, term, document) whose `postings`
+    field is a packed uint32 array of interleaved page numbers and term
+    frequencies. search_documents holds one row per document with its packed
+    per-page token lengths for BM25 length normalization. Updating a document
+    replaces only its own rows, so indexing is incremental.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    SNIPPET_RADIUS = 90
+
+    async def index_document(
+        self, user_id: ObjectId, document_id: ObjectId, title: str, pages: List[str]
+    ):
+        """(Re)build the index rows for one document from its page texts."""
+        postings = get_search_postings_collection()
+        search_docs = get_search_documents_collection()
+
+        await self.remove_document(document_id)
+
+        term_postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        page_lengths = array("I")
+        indexed_pages = 0
+        for page_number, page_text in enumerate(pages, start=1):
+            tokens = tokenize(page_text or "")
+            page_lengths.append(len(tokens))
+            if not tokens:
+                continue
+            indexed_pages += 1
+            for term, tf in Counter(tokens).items():
+                term_postings[term].append((page_number, tf))
+
+        rows = [
+            {
+                "user_id": user_id,
+                "document_id": document_id,
+                "term": term,
+                "postings": pack_postings(pairs)
+            }
+            for term, pairs in term_postings.items()
+        ]
+        if rows:
+            await postings.insert_many(rows, ordered=False)
+
+        await search_docs.insert_one({
+            "user_id": user_id,
+            "document_id": document_id,
+            "title": title,
+            "page_lengths": page_lengths.tobytes(),
+            "page_count": indexed_pages,
+            "total_length": sum(page_lengths)
+        })
+
+        logger.info(f"🔎 Search │ Indexed {len(rows)} terms over {indexed_pages} pages for {document_id}")
+
+    async def remove_document(self, document_id: ObjectId):
+        """Drop every index row belonging to a document."""
+        await get_search_postings_collection().delete_many({"document_id": document_id})
+        await get_search_documents_collection().delete_one({"document_id": document_id})
+
+    async def _corpus_stats(self, user_id: ObjectId) -> Tuple[int, float]:
+        """Number of indexed pages and average page length for a user's library."""
+        cursor = get_search_documents_collection().aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": None,
+                "pages": {"$sum": "$page_count"},
+                "length": {"$sum": "$total_length"}
+            }}
+        ])
+        stats = await cursor.to_list(length=1)
+        if not stats or not stats[0]["pages"]:
+            return 0, 0.0
+        return stats[0]["pages"], stats[0]["length"] / stats[0]["pages"]
+
+    async def search(
+        self, user_id: ObjectId, query: str, limit: int = 10
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Rank pages by BM25 for the query. Returns (top hits, total matching pages)."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], 0
+
+        postings_cursor = get_search_postings_collection().find(
+            {"user_id": user_id, "term": {"$in": terms}},
+            {"_id": 0, "document_id": 1, "term": 1, "postings": 1}
+        )
+        rows, (total_pages, avg_length) = await asyncio.gather(
+            postings_cursor.to_list(length=None),
+            self._corpus_stats(user_id)
+        )
+        if not rows or not total_pages:
+            return [], 0
+
+        unpacked = [(row["document_id"], row["term"], unpack_uint32(row["postings"])) for row in rows]
+
+        doc_freq = Counter()
+        for _, term, values in unpacked:
+            doc_freq[term] += len(values) // 2
+        idf = {
+            term: math.log(1 + (total_pages - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+        doc_ids = list({doc_id for doc_id, _, _ in unpacked})
+        meta_cursor = get_search_documents_collection().find(
+            {"document_id": {"$in": doc_ids}},
+            {"_id": 0, "document_id": 1, "title": 1, "page_lengths": 1}
+        )
+        meta = {m["document_id"]: m for m in await meta_cursor.to_list(length=None)}
+        lengths = {doc_id: unpack_uint32(m["page_lengths"]) for doc_id, m in meta.items()}
+
+        scores: Dict[Tuple[ObjectId, int], float] = defaultdict(float)
+        k1, b = self.K1, self.B
+        for doc_id, term, values in unpacked:
+            page_lengths = lengths.get(doc_id)
+            if page_lengths is None:
+                continue
+            term_idf = idf[term]
+            for i in range(0, len(values), 2):
+                page_number, tf = values[i], values[i + 1]
+                norm = k1 * (1 - b + b * page_lengths[page_number - 1] / avg_length)
+                scores[(doc_id, page_number)] += term_idf * tf * (k1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        snippets = await self._snippets([key for key, _ in top], terms)
+
+        hits = [
+            {
+                "document_id": str(doc_id),
+                "title": meta[doc_id]["title"],
+                "page_number": page_number,
+                "score": round(score, 4),
+                "snippet": snippets.get((doc_id, page_number), "")
+            }
+            for (doc_id, page_number), score in top
+        ]
+        return hits, len(scores)
+
+    async def _snippets(
+        self, keys: List[Tuple[ObjectId, int]], terms: List[str]
+    ) -> Dict[Tuple[ObjectId, int], str]:
+        """Build a text window around the first query term on each hit page."""
+        pages_by_doc: Dict[ObjectId, List[int]] = defaultdict(list)
+        for doc_id, page_number in keys:
+            pages_by_doc[doc_id].append(page_number)
+
+        documents = get_documents_collection()
+        term_re = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")", re.IGNORECASE)
+
+        async def fetch(doc_id: ObjectId, page_numbers: List[int]):
+            # Only the stored chunks covering hit pages leave the server
+            cursor = documents.aggregate([
+                {"$match": {"_id": doc_id}},
+                {"$project": {"chunks": {"$filter": {
+                    "input": {"$ifNull": ["$chunks", []]},
+                    "cond": {"$or": [
+                        {"$and": [
+                            {"$lte": ["$$this.page_start", p]},
+                            {"$gte": ["$$this.page_end", p]}
+                        ]}
+                        for p in page_numbers
+                    ]}
+                }}}}
+            ])
+            result = await cursor.to_list(length=1)
+            return doc_id, result[0]["chunks"] if result else []
+
+        fetched = await asyncio.gather(*(fetch(d, p) for d, p in pages_by_doc.items()))
+
+        snippets = {}
+        for doc_id, chunks in fetched:
+            for page_number in pages_by_doc[doc_id]:
+                candidates = sorted(
+                    (c for c in chunks if c["page_start"] <= page_number <= c["page_end"]),
+                    key=lambda c: c["page_start"] != page_number
+                )
+                for chunk in candidates:
+                    match = term_re.search(chunk["text"])
+                    if not match:
+                        continue
+                    start = max(0, match.start() - self.SNIPPET_RADIUS)
+                    end = min(len(chunk["text"]), match.end() + self.SNIPPET_RADIUS)
+                    snippet = chunk["text"][start:end].strip()
+                    snippets[(doc_id, page_number)] = (
+                        ("…" if start > 0 else "") + snippet + ("…" if end < len(chunk["text"]) else "")
+                    )
+                    break
+        return snippets
+
+
+# Singleton instance
+search_service = SearchService()
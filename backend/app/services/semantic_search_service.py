@@ -0,0 +1,160 @@
+"""Embedding-based semantic search over document chunks and page summaries."""
+import asyncio
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from app.config import settings
+from app.database import get_embeddings_collection
+from app.services.ai_service import ai_service
+from app.utils.logger import logger
+from app.utils.vector_index import VectorIndex, normalize_rows
+
+
+class SemanticSearchService:
+    """
+    Stores float32 embeddings per document in MongoDB and serves cosine
+    top-k queries from an in-process VectorIndex per user.
+
+    Each document is stored as one or more `embeddings` rows (split every
+    PART_SIZE vectors to stay well under the BSON size limit) holding the raw
+    float32 matrix bytes plus item metadata. Per-user indexes are cached and
+    rebuilt only when the set of stored rows changes.
+    """
+
+    PART_SIZE = 1000
+    PREVIEW_CHARS = 300
+
+    def __init__(self):
+        self._cache: "OrderedDict[str, Tuple[tuple, VectorIndex, List[Dict[str, Any]]]]" = OrderedDict()
+
+    async def index_document(
+        self,
+        user_id: ObjectId,
+        document_id: ObjectId,
+        title: str,
+        chunks: List[Dict[str, Any]],
+        page_summaries: List[Dict[str, Any]]
+    ):
+        """Embed a document's chunks and page summaries and store the vectors."""
+        items, texts = [], []
+        for chunk in chunks:
+            items.append({
+                "kind": "chunk",
+                "page_start": chunk["page_start"],
+                "page_end": chunk["page_end"],
+                "text": chunk["text"][:self.PREVIEW_CHARS]
+            })
+            texts.append(chunk["text"])
+        for page in page_summaries:
+            text = " ".join([page.get("content") or ""] + list(page.get("key_points") or [])).strip()
+            if not text:
+                continue
+            items.append({
+                "kind": "page_summary",
+                "page_start": page["page_number"],
+                "page_end": page["page_number"],
+                "text": text[:self.PREVIEW_CHARS]
+            })
+            texts.append(text)
+
+        if not texts:
+            return
+
+        vectors = await ai_service.embed_texts(texts)
+        if len(vectors) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        matrix = normalize_rows(np.array(vectors, dtype=np.float32))
+
+        embeddings = get_embeddings_collection()
+        await embeddings.delete_many({"document_id": document_id})
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "document_id": document_id,
+                "title": title,
+                "part": part,
+                "dim": matrix.shape[1],
+                "items": items[start:start + self.PART_SIZE],
+                "vectors": matrix[start:start + self.PART_SIZE].tobytes(),
+                "indexed_at": now
+            }
+            for part, start in enumerate(range(0, len(items), self.PART_SIZE))
+        ]
+        await embeddings.insert_many(rows)
+        self._cache.pop(str(user_id), None)
+
+        logger.info(f"🧭 Semantic │ Stored {len(items)} vectors (dim {matrix.shape[1]}) for {document_id}")
+
+    async def remove_document(self, user_id: ObjectId, document_id: ObjectId):
+        """Drop a document's vectors."""
+        await get_embeddings_collection().delete_many({"document_id": document_id})
+        self._cache.pop(str(user_id), None)
+
+    async def _get_index(self, user_id: ObjectId) -> Tuple[VectorIndex, List[Dict[str, Any]]]:
+        """Return the user's cached index, rebuilding it if stored rows changed."""
+        embeddings = get_embeddings_collection()
+        key = str(user_id)
+
+        # Cheap signature query keeps caches coherent across workers
+        signature_rows = await embeddings.find(
+            {"user_id": user_id}, {"document_id": 1, "part": 1, "indexed_at": 1}
+        ).to_list(length=None)
+        signature = tuple(sorted((str(r["document_id"]), r["part"], r["indexed_at"]) for r in signature_rows))
+
+        cached = self._cache.get(key)
+        if cached and cached[0] == signature:
+            self._cache.move_to_end(key)
+            return cached[1], cached[2]
+
+        rows = await embeddings.find({"user_id": user_id}).sort(
+            [("document_id", 1), ("part", 1)]
+        ).to_list(length=None)
+
+        # Rows embedded with a different model dimension cannot share one matrix
+        dims = Counter(r["dim"] for r in rows)
+        dim = dims.most_common(1)[0][0] if dims else 0
+
+        items, blocks = [], []
+        for row in rows:
+            if row["dim"] != dim:
+                continue
+            blocks.append(np.frombuffer(row["vectors"], dtype=np.float32).reshape(-1, dim))
+            for item in row["items"]:
+                items.append({**item, "document_id": str(row["document_id"]), "title": row["title"]})
+
+        matrix = np.vstack(blocks) if blocks else np.zeros((0, dim), dtype=np.float32)
+        index = await asyncio.to_thread(
+            VectorIndex, matrix, settings.VECTOR_IVF_THRESHOLD, settings.VECTOR_IVF_NPROBE
+        )
+
+        self._cache[key] = (signature, index, items)
+        self._cache.move_to_end(key)
+        while len(self._cache) > settings.VECTOR_INDEX_CACHE_USERS:
+            self._cache.popitem(last=False)
+
+        return index, items
+
+    async def search(self, user_id: ObjectId, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Embed the query and return the most similar chunks / page summaries."""
+        query_vectors, (index, items) = await asyncio.gather(
+            ai_service.embed_texts([query]),
+            self._get_index(user_id)
+        )
+        if not query_vectors or not len(index) or len(query_vectors[0]) != index.vectors.shape[1]:
+            return []
+
+        rows, scores = index.search(np.asarray(query_vectors[0], dtype=np.float32), limit)
+        return [
+            {**items[row], "score": round(float(score), 4)}
+            for row, score in zip(rows, scores)
+        ]
+
+
+# Singleton instance
+semantic_search_service = SemanticSearchService()
@@ -0,0 +1,227 @@
+"""Materialized per-user learning statistics."""
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.database import get_user_stats_collection, get_quiz_results_collection
+from app.utils.logger import logger
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Rebuilds that lose to a concurrent update are recomputed at most this many times
+REBUILD_ATTEMPTS = 3
+
+# A rebuild remembers the results it counted that completed this recently, since their
+# record_result may still be on its way and must not add them a second time
+REBUILD_RECENT_WINDOW = timedelta(minutes=10)
+
+
+def _add(field: str, value) -> Dict[str, Any]:
+    """Aggregation expression adding value to a possibly missing numeric field."""
+    return {"$add": [{"$ifNull": [f"${field}", 0]}, value]}
+
+
+def _add_unless_counted(field: str, value) -> Dict[str, Any]:
+    """Like _add, but a no-op for a result the last rebuild already included (see record_result)."""
+    return {"$cond": ["$_counted", f"${field}", _add(field, value)]}
+
+
+def _streak_stages(day: date) -> list:
+    """Pipeline stages advancing the daily streak for activity on `day`."""
+    today, yesterday = day.isoformat(), (day - timedelta(days=1)).isoformat()
+    return [
+        {"$set": {"current_streak": {"$switch": {
+            "branches": [
+                {"case": {"$eq": ["$last_active_date", today]}, "then": "$current_streak"},
+                {"case": {"$eq": ["$last_active_date", yesterday]}, "then": _add("current_streak", 1)}
+            ],
+            "default": 1
+        }}}},
+        {"$set": {
+            "best_streak": {"$max": [{"$ifNull": ["$best_streak", 0]}, "$current_streak"]},
+            "last_active_date": today
+        }}
+    ]
+
+
+class StatsService:
+    """
+    Keeps one `user_stats` document per user (_id = user id) with running sums
+    and counts, so progress endpoints read a single small document instead of
+    scanning quiz results.
+
+    Each submission is applied with one pipeline update, which increments the
+    totals and per-difficulty breakdown and advances the streak atomically.
+    Users whose stats predate this document get them rebuilt once from
+    quiz_results on first read. A result is stored before it is recorded, so
+    a rebuild may already include it; the rebuild lists the recent results it
+    counted and record_result skips those.
+    """
+
+    async def record_result(
+        self, user_id: ObjectId, result_id: ObjectId, difficulty: str, score: float, time_taken: int,
+        correct: int, total: int, day: Optional[date] = None
+    ) -> dict:
+        """Apply one stored exam result to the user's stats. Returns the updated document."""
+        prefix = f"by_difficulty.{difficulty}"
+        return await get_user_stats_collection().find_one_and_update(
+            {"_id": user_id},
+            [
+                {"$set": {"_counted": {"$in": [result_id, {"$ifNull": ["$rebuilt_result_ids", []]}]}}},
+                {"$set": {
+                    "result_count": _add_unless_counted("result_count", 1),
+                    "score_sum": _add_unless_counted("score_sum", score),
+                    "time_taken_sum": _add_unless_counted("time_taken_sum", time_taken),
+                    "questions_answered": _add_unless_counted("questions_answered", total),
+                    "correct_answers": _add_unless_counted("correct_answers", correct),
+                    f"{prefix}.count": _add_unless_counted(f"{prefix}.count", 1),
+                    f"{prefix}.score_sum": _add_unless_counted(f"{prefix}.score_sum", score),
+                    f"{prefix}.time_taken_sum": _add_unless_counted(f"{prefix}.time_taken_sum", time_taken),
+                    "updated_at": "$$NOW"
+                }},
+                {"$unset": "_counted"},
+                *_streak_stages(day or datetime.utcnow().date())
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def record_activity(self, user_id: ObjectId, day: Optional[date] = None) -> dict:
+        """Register study activity for the streak. Returns the updated document."""
+        return await get_user_stats_collection().find_one_and_update(
+            {"_id": user_id},
+            [*_streak_stages(day or datetime.utcnow().date()), {"$set": {"updated_at": "$$NOW"}}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def get_stats(self, user_id: ObjectId) -> dict:
+        """The user's stats document, rebuilt from quiz_results if it was never built."""
+        stats = await get_user_stats_collection().find_one({"_id": user_id})
+        if stats is None or "rebuilt_at" not in stats:
+            stats = await self.rebuild(user_id)
+        return stats
+
+    async def rebuild(self, user_id: ObjectId) -> dict:
+        """
+        Recompute totals and breakdowns from stored results (answers never leave the server).
+
+        The write only lands if the stats document is unchanged since it was
+        read, so a result or activity recorded meanwhile is never overwritten;
+        on a conflict the rebuild is retried against the new state.
+        """
+        collection = get_user_stats_collection()
+        for _ in range(REBUILD_ATTEMPTS):
+            existing = await collection.find_one({"_id": user_id})
+            if existing is not None and "rebuilt_at" in existing:
+                # Another request rebuilt it first
+                return existing
+
+            stats = await self._aggregate(user_id, existing or {})
+            if existing is None:
+                try:
+                    await collection.insert_one({"_id": user_id, **stats})
+                except DuplicateKeyError:
+                    # A concurrent record_result created the document first
+                    continue
+            else:
+                written = await collection.update_one(
+                    {
+                        "_id": user_id,
+                        "rebuilt_at": {"$exists": False},
+                        "result_count": existing.get("result_count"),
+                        "updated_at": existing.get("updated_at")
+                    },
+                    {"$set": stats}
+                )
+                if not written.matched_count:
+                    continue
+
+            logger.info(f"📊 Stats │ Rebuilt stats for user {user_id} from {stats['result_count']} results")
+            return {"_id": user_id, **stats}
+
+        # Still contended: serve the computed stats now and leave the rebuild to a later read
+        logger.warning(f"⚠️ Stats │ Rebuild for user {user_id} kept conflicting with new results")
+        return {"_id": user_id, **stats}
+
+    async def _aggregate(self, user_id: ObjectId, existing: dict) -> dict:
+        """Stats computed from quiz_results, keeping streak activity known only to `existing`."""
+        results = get_quiz_results_collection()
+        recent_since = datetime.utcnow() - REBUILD_RECENT_WINDOW
+        cursor = results.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": "$difficulty",
+                "recent_ids": {"$addToSet": {
+                    "$cond": [{"$gte": ["$completed_at", recent_since]}, "$_id", None]
+                }},
+                "count": {"$sum": 1},
+                "score_sum": {"$sum": "$score_percentage"},
+                "time_taken_sum": {"$sum": "$time_taken"},
+                "questions_answered": {"$sum": "$total_questions"},
+                "correct_answers": {"$sum": "$correct_answers"}
+            }}
+        ])
+        groups = await cursor.to_list(length=None)
+
+        day_rows = await results.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$completed_at"}}}}
+        ]).to_list(length=None)
+
+        current = best = 0
+        last_active = None
+        for day in sorted(date.fromisoformat(row["_id"]) for row in day_rows):
+            current = current + 1 if last_active and (day - last_active).days == 1 else 1
+            best = max(best, current)
+            last_active = day
+        last_active = last_active.isoformat() if last_active else None
+
+        # Activity logged outside of quizzes is only known to the stats document itself
+        if existing.get("last_active_date") and existing["last_active_date"] >= (last_active or ""):
+            last_active = existing["last_active_date"]
+            current = max(current, existing.get("current_streak", 0))
+            best = max(best, existing.get("best_streak", 0), current)
+
+        return {
+            "result_count": sum(g["count"] for g in groups),
+            "score_sum": sum(g["score_sum"] for g in groups),
+            "time_taken_sum": sum(g["time_taken_sum"] for g in groups),
+            "questions_answered": sum(g["questions_answered"] for g in groups),
+            "correct_answers": sum(g["correct_answers"] for g in groups),
+            "by_difficulty": {
+                g["_id"]: {
+                    "count": g["count"],
+                    "score_sum": g["score_sum"],
+                    "time_taken_sum": g["time_taken_sum"]
+                }
+                for g in groups if g["_id"] in DIFFICULTIES
+            },
+            "current_streak": current,
+            "best_streak": best,
+            "last_active_date": last_active,
+            "rebuilt_result_ids": [i for g in groups for i in g["recent_ids"] if i is not None],
+            "rebuilt_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+
+    def current_streak(self, stats: dict, today: Optional[date] = None) -> int:
+        """Streak as of today; a streak whose last activity is older than yesterday has lapsed."""
+        last = stats.get("last_active_date")
+        if not last:
+            return 0
+        today = today or datetime.utcnow().date()
+        if (today - date.fromisoformat(last)).days > 1:
+            return 0
+        return stats.get("current_streak", 0)
+
+    def average_score(self, stats: dict) -> float:
+        count = stats.get("result_count", 0)
+        return stats.get("score_sum", 0) / count if count else 0.0
+
+
+# Singleton instance
+stats_service = StatsService()
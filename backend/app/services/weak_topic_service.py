@@ -0,0 +1,210 @@
+"""Weak topic analysis for submitted exams."""
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from bson import ObjectId
+
+from app.config import settings
+from app.database import (
+    get_documents_collection, get_quiz_results_collection, get_quizzes_collection
+)
+from app.models.quiz import AnalysisStatus
+from app.services.ai_service import ai_service
+from app.services.chat_service import chat_service, DocumentChunkIndex
+from app.services.resilience import deadline_scope
+from app.services.search_service import tokenize
+from app.utils.exam_answers import wrong_question_ids
+from app.utils.logger import logger
+
+
+class WeakTopicService:
+    """
+    Derives weak topics from a quiz's wrong answers without the LLM.
+
+    Each question is mapped to a page focus topic (produced by page insights
+    during processing): directly through its stored page/topic provenance,
+    or else by BM25-matching its text and correct option against the
+    document's chunks. Documents without page topics fall back to their
+    key concepts. Errors are counted per topic and topics are ranked by
+    wrong answers, then by error rate. The LLM prompt is an optional
+    refinement run in the background, which patches the stored result.
+    """
+
+    MATCH_CANDIDATES = 3
+
+    async def document_topics(self, document_id: ObjectId) -> Tuple[Dict[int, str], List[str]]:
+        """(page number -> focus topic, key concepts) for a document."""
+        doc = await get_documents_collection().find_one(
+            {"_id": document_id},
+            {"page_summaries.page_number": 1, "page_summaries.focus_topic": 1, "key_concepts": 1}
+        )
+        if not doc:
+            return {}, []
+        page_topics = {
+            p["page_number"]: p["focus_topic"]
+            for p in doc.get("page_summaries", [])
+            if p.get("focus_topic")
+        }
+        return page_topics, doc.get("key_concepts") or []
+
+    def match_concept(self, concepts: List[str], question: Dict[str, Any]) -> Optional[str]:
+        """Key concept sharing the most terms with a question, if any."""
+        terms = set(tokenize(question.get("question_text", "")))
+        best, best_overlap = None, 0
+        for concept in concepts:
+            overlap = len(terms & set(tokenize(concept)))
+            if overlap > best_overlap:
+                best, best_overlap = concept, overlap
+        return best
+
+    def match_topic(
+        self, index: Optional[DocumentChunkIndex], topics: Dict[int, str], question: Dict[str, Any]
+    ) -> Optional[str]:
+        """Topic of the chunk that best matches a question's text and correct option."""
+        if index is None:
+            return None
+        correct = next(
+            (opt.get("option_text", "") for opt in question.get("options", [])
+             if opt.get("option_id") == question.get("correct_answer")),
+            ""
+        )
+        terms = list(dict.fromkeys(tokenize(f"{question.get('question_text', '')} {correct}")))
+        for i in index.rank(terms, self.MATCH_CANDIDATES):
+            chunk = index.chunks[i]
+            for page in range(chunk["page_start"], chunk["page_end"] + 1):
+                if page in topics:
+                    return topics[page]
+        return None
+
+    def rank_topics(
+        self,
+        questions: List[Dict[str, Any]],
+        question_topics: List[Optional[str]],
+        wrong_ids: Set[str]
+    ) -> List[str]:
+        """Rank topics by wrong answers, then error rate, then first appearance."""
+        counts: "OrderedDict[str, List[int]]" = OrderedDict()
+        for question, topic in zip(questions, question_topics):
+            if not topic:
+                continue
+            wrong_total = counts.setdefault(topic, [0, 0])
+            wrong_total[1] += 1
+            if question["id"] in wrong_ids:
+                wrong_total[0] += 1
+
+        ranked = sorted(
+            ((topic, wrong, total, order) for order, (topic, (wrong, total)) in enumerate(counts.items()) if wrong),
+            key=lambda t: (-t[1], -t[1] / t[2], t[3])
+        )
+        return [topic for topic, _, _, _ in ranked[:settings.WEAK_TOPICS_MAX]]
+
+    async def question_topics(
+        self, user_id: ObjectId, document_id: ObjectId, questions: List[Dict[str, Any]]
+    ) -> List[Optional[str]]:
+        """
+        Topic of each question: its stored provenance, else the focus topic of the
+        best-matching chunk's page, else the document key concept it mentions most.
+        """
+        page_topics, concepts = await self.document_topics(document_id)
+
+        index = None
+        topics = []
+        for question in questions:
+            topic = question.get("topic") or page_topics.get(question.get("page_number"))
+            if not topic and page_topics:
+                if index is None:
+                    index = await chat_service.get_document_index(user_id, document_id)
+                topic = self.match_topic(index, page_topics, question)
+            if not topic:
+                topic = self.match_concept(concepts, question)
+            topics.append(topic)
+        return topics
+
+    async def local_weak_topics(
+        self,
+        user_id: ObjectId,
+        document_id: ObjectId,
+        questions: List[Dict[str, Any]],
+        wrong_ids: Set[str]
+    ) -> List[str]:
+        """Deterministic weak topics for a graded quiz."""
+        if not wrong_ids:
+            return []
+        topics = await self.question_topics(user_id, document_id, questions)
+        return self.rank_topics(questions, topics, wrong_ids)
+
+    async def analyze_result(
+        self,
+        result_id: ObjectId,
+        document_id: ObjectId,
+        wrong_answers: List[Dict[str, Any]],
+        local_topics: List[str] = ()
+    ):
+        """Background task: refine weak topics with the LLM and patch the exam result."""
+        results = get_quiz_results_collection()
+        update = {
+            "weak_topics": list(local_topics),
+            # Locally derived topics are still a usable answer if the refinement fails
+            "weak_topics_status": (AnalysisStatus.COMPLETED if local_topics else AnalysisStatus.FAILED).value
+        }
+
+        try:
+            doc = await get_documents_collection().find_one({"_id": document_id}, {"summary": 1})
+            if doc and doc.get("summary"):
+                with deadline_scope(settings.AI_BACKGROUND_DEADLINE):
+                    weak_topics = await ai_service.analyze_weak_topics(wrong_answers, doc["summary"])
+                update = {
+                    "weak_topics": weak_topics or list(local_topics),
+                    "weak_topics_status": AnalysisStatus.COMPLETED.value
+                }
+        except Exception as e:
+            logger.warning(f"⚠️ Weak Topics │ Analysis failed for result {result_id}: {e}")
+
+        update["weak_topics_updated_at"] = datetime.utcnow()
+        await results.update_one({"_id": result_id}, {"$set": update})
+
+    async def recompute_results(self, user_id: ObjectId) -> int:
+        """Recompute local weak topics for all of a user's stored results. Returns results updated."""
+        results = get_quiz_results_collection()
+        cursor = results.find(
+            {"user_id": user_id, "wrong_answers": {"$gt": 0}},
+            {"quiz_id": 1, "document_id": 1, "question_ids": 1, "correct_bitmap": 1, "answers": 1}
+        )
+        result_list = await cursor.to_list(length=None)
+
+        quiz_ids = list({r["quiz_id"] for r in result_list})
+        quizzes = {
+            q["_id"]: q["questions"]
+            for q in await get_quizzes_collection().find(
+                {"_id": {"$in": quiz_ids}}, {"questions": 1}
+            ).to_list(length=None)
+        }
+
+        updated = 0
+        now = datetime.utcnow()
+        for result in result_list:
+            # Missing quizzes leave only answers stored before compaction to match against
+            questions = quizzes.get(result["quiz_id"]) or [
+                {"id": a["question_id"], "question_text": a["question_text"]} for a in result.get("answers", [])
+            ]
+            wrong_ids = wrong_question_ids(result)
+            weak_topics = await self.local_weak_topics(user_id, result["document_id"], questions, wrong_ids)
+            if not weak_topics:
+                continue
+            await results.update_one(
+                {"_id": result["_id"]},
+                {"$set": {
+                    "weak_topics": weak_topics,
+                    "weak_topics_status": AnalysisStatus.COMPLETED.value,
+                    "weak_topics_updated_at": now
+                }}
+            )
+            updated += 1
+
+        logger.info(f"🎯 Weak Topics │ Recomputed {updated}/{len(result_list)} results for user {user_id}")
+        return updated
+
+
+# Singleton instance
+weak_topic_service = WeakTopicService()
@@ -0,0 +1,75 @@
+"""Compact storage of graded exam answers."""
+from typing import List, Dict, Any, Iterable, Optional, Set
+
+# Result fields holding the graded answers; list reads exclude them
+ANSWER_FIELDS = ("question_ids", "selected_answers", "correct_bitmap", "answers")
+
+MISSING_QUESTION_TEXT = "This question is no longer available"
+
+
+def pack_bits(flags: Iterable[bool]) -> bytes:
+    """Pack booleans into a bitmap, bit i of byte i // 8 for flag i."""
+    flags = list(flags)
+    packed = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            packed[i >> 3] |= 1 << (i & 7)
+    return bytes(packed)
+
+
+def unpack_bits(packed: bytes, count: int) -> List[bool]:
+    return [bool(packed[i >> 3] >> (i & 7) & 1) for i in range(count)]
+
+
+def compact_answers(questions: List[Dict[str, Any]], answer_lookup: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Grade submitted answers against quiz questions into the stored form:
+    question ids and selected options in quiz order plus a correctness bitmap.
+    Question text, correct options and explanations stay in the quiz.
+    """
+    selected = [answer_lookup.get(q["id"], "") for q in questions]
+    return {
+        "question_ids": [q["id"] for q in questions],
+        "selected_answers": selected,
+        "correct_bitmap": pack_bits(s == q["correct_answer"] for s, q in zip(selected, questions))
+    }
+
+
+def correctness(result: Dict[str, Any]) -> List[bool]:
+    """Per-question correctness of a stored result, in quiz order."""
+    if "question_ids" not in result:
+        return [a["is_correct"] for a in result.get("answers", [])]
+    return unpack_bits(result["correct_bitmap"], len(result["question_ids"]))
+
+
+def wrong_question_ids(result: Dict[str, Any]) -> Set[str]:
+    if "question_ids" not in result:
+        return {a["question_id"] for a in result.get("answers", []) if not a["is_correct"]}
+    return {qid for qid, ok in zip(result["question_ids"], correctness(result)) if not ok}
+
+
+def hydrate_answers(
+    result: Dict[str, Any], questions: Optional[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """
+    Full answer details for a stored result, joined with its quiz questions.
+    Results stored before compaction already carry them.
+    """
+    if "question_ids" not in result:
+        return result.get("answers", [])
+
+    by_id = {q["id"]: q for q in questions or []}
+    answers = []
+    for question_id, selected, is_correct in zip(
+        result["question_ids"], result["selected_answers"], correctness(result)
+    ):
+        question = by_id.get(question_id)
+        answers.append({
+            "question_id": question_id,
+            "question_text": question["question_text"] if question else MISSING_QUESTION_TEXT,
+            "selected_answer": selected,
+            "correct_answer": question["correct_answer"] if question else (selected if is_correct else ""),
+            "is_correct": is_correct,
+            "explanation": question.get("explanation", "") if question else ""
+        })
+    return answers
@@ -0,0 +1,88 @@
+"""
+Conditional GET helpers.
+
+Responses carry an ETag and `Cache-Control: private, no-cache`, so browsers
+keep the body but revalidate it on every use; a request whose If-None-Match
+names the current ETag gets an empty 304. ETags come either from the body
+bytes (`etag_for`) or, so that a 304 can be answered before the heavy fields
+are fetched and serialized, from the version fields of the underlying
+documents (`version_etag`).
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+from app.utils.serializers import FastJSONResponse
+
+PRIVATE_REVALIDATE = "private, no-cache"
+
+# Bump when the serialized shape of versioned responses changes
+RESPONSE_VERSION = 1
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag derived from the response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def version_etag(*parts: Any) -> str:
+    """Weak ETag for a response determined by ids and version fields such as updated_at."""
+    digest = hashlib.blake2b(repr((RESPONSE_VERSION,) + parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_conditional(request: Request) -> bool:
+    """Whether the client sent a cached ETag worth checking before a full fetch."""
+    return "if-none-match" in request.headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names this ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in (_opaque(tag) for tag in header.split(","))
+
+
+def not_modified(request: Request, etag: str, cache_control: str = PRIVATE_REVALIDATE) -> Optional[Response]:
+    """A 304 response if the client's copy is current, else None."""
+    if not etag_matches(request, etag):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def cached_json(content: Any, etag: str, cache_control: str = PRIVATE_REVALIDATE) -> FastJSONResponse:
+    """JSON response carrying its validator."""
+    return FastJSONResponse(content, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def json_bytes_response(
+    request: Request,
+    body: bytes,
+    etag: str = None,
+    status_code: int = status.HTTP_200_OK,
+    cache_control: str = PRIVATE_REVALIDATE
+) -> Response:
+    """Serve an already serialized JSON body as is, or a 304 when the client's copy is current."""
+    etag = etag or etag_for(body)
+    if status_code == status.HTTP_200_OK:
+        response = not_modified(request, etag, cache_control)
+        if response:
+            return response
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
@@ -0,0 +1,57 @@
+"""Incremental JSON parsing for streamed model output."""
+import json
+from typing import List, Dict, Any
+
+
+class JSONObjectStreamParser:
+    """
+    Pull complete top-level objects out of a JSON array as it streams in.
+
+    Feed raw text chunks; every `{...}` that closes at nesting depth zero is
+    parsed and returned immediately, so callers can act on the first object
+    long before the closing `]` arrives. Text outside objects (markdown
+    fences, the array brackets, commas) is ignored.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk and return the objects completed by it."""
+        completed = []
+        for char in chunk:
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        obj = json.loads("".join(self._buffer))
+                        if isinstance(obj, dict):
+                            completed.append(obj)
+                    except json.JSONDecodeError:
+                        pass
+                    self._buffer = []
+        return completed
@@ -0,0 +1,98 @@
+"""MinHash signatures and banded LSH for near-duplicate text detection."""
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+import numpy as np
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_EMPTY = np.iinfo(np.uint64).max
+
+
+def shingles(text: str) -> Set[int]:
+    """Hashed word unigrams and bigrams of a text."""
+    words = _WORD_RE.findall(text.lower())
+    grams = set(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return {zlib.crc32(g.encode("utf-8")) for g in grams}
+
+
+class MinHasher:
+    """
+    Computes fixed-length MinHash signatures with universal hashing
+    (a * x + b) mod p, vectorized over all permutations at once. The seed
+    fixes the permutations, so stored signatures stay comparable.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (uint64 array of length num_perm)."""
+        hashed = np.fromiter(shingles(text), dtype=np.uint64)
+        if not hashed.size:
+            return np.full(self.num_perm, _EMPTY, dtype=np.uint64)
+        permuted = (self._a[:, None] * hashed[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+        return float(np.count_nonzero(a == b)) / len(a)
+
+    @staticmethod
+    def to_bytes(signature: np.ndarray) -> bytes:
+        return signature.astype(np.uint64).tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype=np.uint64)
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing over MinHash signatures.
+
+    Signatures are split into `bands` bands; items sharing any band are
+    candidates, and candidates are confirmed with the estimated similarity.
+    With 64 permutations in 16 bands of 4 rows, pairs above ~0.5 similarity
+    almost always collide while dissimilar pairs rarely do.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[bytes]:
+        for band in range(self.bands):
+            yield signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key: Hashable, signature: np.ndarray):
+        self._signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band][band_key].append(key)
+
+    def candidates(self, signature: np.ndarray) -> Set[Hashable]:
+        found = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            found.update(self._buckets[band].get(band_key, ()))
+        return found
+
+    def find_duplicate(self, signature: np.ndarray, threshold: float) -> Optional[Hashable]:
+        """Key of a stored item at least `threshold` similar to signature, if any."""
+        for key in self.candidates(signature):
+            if MinHasher.similarity(signature, self._signatures[key]) >= threshold:
+                return key
+        return None
@@ -0,0 +1,118 @@
+"""
+Direct MongoDB document to JSON serializers for the hot read endpoints.
+
+Each function produces the exact JSON shape of its response model (see
+app/models) from a stored document, without constructing and validating
+pydantic models. Bodies are encoded with orjson, which also handles
+datetimes natively and ObjectIds through `_default`.
+"""
+from typing import List, Dict, Any, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+
+from app.utils.exam_answers import hydrate_answers
+
+WIKI_CONTEXT_FIELDS = ("term", "definition", "url")
+NORMALIZATION_STATS_FIELDS = (
+    "chars_before", "chars_after", "chars_saved", "tokens_before", "tokens_after", "tokens_saved"
+)
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class: orjson encoding that also accepts ObjectIds."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def document_dict(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """DocumentResponse shape."""
+    stats = doc.get("normalization_stats")
+    return {
+        "id": str(doc["_id"]),
+        "user_id": str(doc["user_id"]),
+        "title": doc["title"],
+        "file_type": doc["file_type"],
+        "file_size": doc["file_size"],
+        "extracted_text": doc.get("extracted_text"),
+        "summary": doc.get("summary"),
+        "page_summaries": [],
+        "easy_explanation": doc.get("easy_explanation"),
+        "key_concepts": doc.get("key_concepts", []),
+        "wiki_context": [
+            {field: entry[field] for field in WIKI_CONTEXT_FIELDS}
+            for entry in doc.get("wiki_context") or []
+        ],
+        "page_count": doc.get("page_count", 0),
+        "normalization_stats": {
+            **{field: stats[field] for field in NORMALIZATION_STATS_FIELDS},
+            "boilerplate_lines_removed": stats.get("boilerplate_lines_removed", 0)
+        } if stats else None,
+        "processing_status": doc.get("processing_status", "pending"),
+        "created_at": doc["created_at"],
+        "updated_at": doc["updated_at"]
+    }
+
+
+def question_dict(q: Dict[str, Any], include_answers: bool = False) -> Dict[str, Any]:
+    """QuizQuestion shape; answers are blanked unless requested."""
+    return {
+        "id": q["id"],
+        "question_text": q["question_text"],
+        "options": [{"option_id": opt["option_id"], "option_text": opt["option_text"]} for opt in q["options"]],
+        "correct_answer": q["correct_answer"] if include_answers else "",
+        "explanation": q["explanation"] if include_answers else ""
+    }
+
+
+def quiz_dict(quiz: Dict[str, Any], include_answers: bool = False) -> Dict[str, Any]:
+    """QuizResponse shape."""
+    return {
+        "id": str(quiz["_id"]),
+        "user_id": str(quiz["user_id"]),
+        "document_id": str(quiz["document_id"]),
+        "title": quiz["title"],
+        "difficulty": quiz["difficulty"],
+        "question_count": quiz["question_count"],
+        "questions": [question_dict(q, include_answers) for q in quiz.get("questions", [])],
+        "created_at": quiz["created_at"]
+    }
+
+
+def result_summary_dict(result: Dict[str, Any]) -> Dict[str, Any]:
+    """ExamResultSummary shape."""
+    return {
+        "id": str(result["_id"]),
+        "user_id": str(result["user_id"]),
+        "quiz_id": str(result["quiz_id"]),
+        "document_id": str(result["document_id"]),
+        "quiz_title": result["quiz_title"],
+        "total_questions": result["total_questions"],
+        "correct_answers": result["correct_answers"],
+        "wrong_answers": result["wrong_answers"],
+        "score_percentage": float(result["score_percentage"]),
+        "time_taken": result["time_taken"],
+        "difficulty": result["difficulty"],
+        "weak_topics": result.get("weak_topics", []),
+        "weak_topics_status": result.get("weak_topics_status", "completed"),
+        "completed_at": result["completed_at"]
+    }
+
+
+def result_dict(result: Dict[str, Any], questions: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """ExamResultResponse shape, with answers joined from the quiz questions."""
+    summary = result_summary_dict(result)
+    summary["answers"] = hydrate_answers(result, questions)
+    return summary
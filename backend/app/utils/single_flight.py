@@ -0,0 +1,30 @@
+"""Request coalescing for expensive, idempotent work."""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key.
+
+    The first caller starts the work; callers arriving while it is in flight
+    await the same task instead of starting their own. The task is shielded,
+    so a caller that disconnects does not cancel the work for the others.
+    Deduplication is per process.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory() for key, or join the run already in progress."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: str) -> bool:
+        """Whether work for key is currently running."""
+        return key in self._inflight
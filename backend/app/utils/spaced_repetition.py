@@ -0,0 +1,26 @@
+"""SM-2 spaced-repetition scheduling."""
+from typing import Tuple
+
+MIN_EASINESS = 1.3
+DEFAULT_EASINESS = 2.5
+
+
+def sm2(repetitions: int, interval_days: int, easiness: float, quality: int) -> Tuple[int, int, float]:
+    """
+    Apply one review graded 0-5 (>= 3 is a successful recall).
+    Returns the new (repetitions, interval in days, easiness factor).
+    """
+    if quality >= 3:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = round(interval_days * easiness)
+        repetitions += 1
+    else:
+        repetitions = 0
+        interval_days = 1
+
+    easiness += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return repetitions, interval_days, max(MIN_EASINESS, easiness)
@@ -0,0 +1,167 @@
+"""Token-aware, sentence-aligned text chunking."""
+import re
+from typing import List, Dict, Any, Optional, Callable
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+# Average characters per sub-word token for BPE tokenizers on English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the model token count without loading a tokenizer.
+    Each punctuation mark counts as one token and words count as one token
+    per CHARS_PER_TOKEN characters, which tracks BPE tokenizers closely on prose.
+    """
+    count = 0
+    for match in _TOKEN_RE.finditer(text):
+        length = match.end() - match.start()
+        count += 1 if length <= CHARS_PER_TOKEN else -(-length // CHARS_PER_TOKEN)
+    return count
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, treating blank lines as hard boundaries."""
+    sentences = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        sentences.extend(s for s in _SENTENCE_END_RE.split(paragraph) if s)
+    return sentences
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> List[str]:
+    """Hard-split a sentence that alone exceeds the budget at word boundaries."""
+    pieces, current, current_tokens = [], [], 0
+    for word in sentence.split(" "):
+        word_tokens = estimate_tokens(word)
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, ending on a sentence boundary where possible."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept, used = [], 0
+    for sentence in split_sentences(text):
+        tokens = estimate_tokens(sentence)
+        if used + tokens > max_tokens:
+            if not kept:
+                # First sentence is already too long; fall back to word boundary
+                return _split_long_sentence(sentence, max_tokens)[0]
+            break
+        kept.append(sentence)
+        used += tokens
+    return " ".join(kept)
+
+
+def chunk_pages(
+    pages: List[str],
+    max_tokens: int = 512,
+    overlap_tokens: int = 64
+) -> List[Dict[str, Any]]:
+    """
+    Split page texts into sentence-aligned chunks of at most max_tokens.
+
+    Consecutive chunks share up to overlap_tokens of trailing sentences so
+    context is not lost at boundaries. Each chunk records the page range it
+    was drawn from, so callers can cite or select chunks by page.
+    """
+    # Flatten into (sentence, page_number, tokens)
+    units = []
+    for page_number, page_text in enumerate(pages, start=1):
+        if not page_text or not page_text.strip():
+            continue
+        for sentence in split_sentences(page_text):
+            tokens = estimate_tokens(sentence)
+            if tokens > max_tokens:
+                for piece in _split_long_sentence(sentence, max_tokens):
+                    units.append((piece, page_number, estimate_tokens(piece)))
+            else:
+                units.append((sentence, page_number, tokens))
+
+    chunks: List[Dict[str, Any]] = []
+    window: List[tuple] = []
+    window_tokens = 0
+
+    def flush():
+        chunks.append({
+            "index": len(chunks),
+            "text": " ".join(u[0] for u in window),
+            "page_start": window[0][1],
+            "page_end": window[-1][1],
+            "token_count": window_tokens
+        })
+
+    for unit in units:
+        if window and window_tokens + unit[2] > max_tokens:
+            flush()
+            # Carry trailing sentences forward as overlap
+            carried, carried_tokens = [], 0
+            for prev in reversed(window):
+                if carried_tokens + prev[2] > overlap_tokens or carried_tokens + prev[2] + unit[2] > max_tokens:
+                    break
+                carried.insert(0, prev)
+                carried_tokens += prev[2]
+            window, window_tokens = carried, carried_tokens
+        window.append(unit)
+        window_tokens += unit[2]
+
+    if window:
+        flush()
+
+    return chunks
+
+
+def _drop_overlap(previous: str, text: str) -> str:
+    """Text without the leading sentences it repeats from the end of the previous chunk."""
+    previous_sentences, sentences = split_sentences(previous), split_sentences(text)
+    for n in range(min(len(previous_sentences), len(sentences) - 1), 0, -1):
+        if previous_sentences[-n:] == sentences[:n]:
+            return " ".join(sentences[n:])
+    return text
+
+
+def select_chunks(
+    chunks: List[Dict[str, Any]],
+    max_tokens: int,
+    indices: Optional[List[int]] = None,
+    label: Optional[Callable[[Dict[str, Any]], str]] = None
+) -> str:
+    """
+    Join stored chunks into prompt context within a token budget.
+    Uses the given chunk indices in order, or all chunks from the start.
+    A chunk that directly follows the previous selected one skips the
+    sentences it shares with it as overlap. `label` optionally gives a
+    prefix for each chunk's text (e.g. its pages).
+    """
+    selected = [chunks[i] for i in indices] if indices is not None else chunks
+    parts, used, previous = [], 0, None
+    for chunk in selected:
+        text, tokens = chunk["text"], chunk["token_count"]
+        follows = previous is not None and chunk.get("index") is not None and previous.get("index") == chunk["index"] - 1
+        if follows:
+            trimmed = _drop_overlap(previous["text"], text)
+            if trimmed != text:
+                text, tokens = trimmed, estimate_tokens(trimmed)
+        prefix = label(chunk) if label else ""
+        if used + tokens > max_tokens:
+            if not parts:
+                parts.append(prefix + truncate_to_tokens(text, max_tokens))
+            break
+        parts.append(prefix + text)
+        used += tokens
+        previous = chunk
+    return "\n\n".join(parts)
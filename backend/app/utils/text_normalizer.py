@@ -0,0 +1,170 @@
+"""Clean extracted document text before it is sent to the model."""
+import re
+from collections import Counter
+from typing import List, Tuple, Dict
+
+from app.utils.text_chunker import estimate_tokens
+
+# Lines near the top/bottom of a page that are checked for running headers/footers
+EDGE_LINES = 3
+
+_PAGE_NUMBER_RE = re.compile(
+    r"^\s*(?:page\s*)?[-–—]?\s*\d{1,4}\s*[-–—]?\s*(?:(?:of|/)\s*\d{1,4})?\s*$",
+    re.IGNORECASE
+)
+# Strict Roman numerals (i..mmm...), so words made of those letters ("civil", "dim") do not match
+_ROMAN_PAGE_RE = re.compile(
+    r"^\s*(?=[mdclxvi])m*(c[md]|d?c{0,3})(x[cl]|l?x{0,3})(i[xv]|v?i{0,3})\s*$", re.IGNORECASE
+)
+_HYPHEN_BREAK_RE = re.compile(r"(\w+)([-\xad])\n\s*(\w+)")  # hyphen or soft hyphen
+_WORD_RE = re.compile(r"\w+")
+# C0 controls, replacement char, private use area, zero-width and bidi marks, BOM
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\ufffd\ue000-\uf8ff\u200b-\u200f\u202a-\u202e\u2066-\u2069\ufeff]")
+_LEADER_RE = re.compile(r"(?:\s?[.\u00b7\u2022_\-\u2013\u2014=*~]){4,}")
+_SPACES_RE = re.compile(r"[ \t\u00a0]+")  # includes no-break space
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+_ROMAN_VALUES = {"i": 1, "v": 5, "x": 10, "l": 50, "c": 100, "d": 500, "m": 1000}
+
+
+def _roman_value(line: str) -> int:
+    """Value of a bare Roman numeral line, or 0 if the line is not one."""
+    token = line.strip()
+    if not _ROMAN_PAGE_RE.match(token):
+        return 0
+    values = [_ROMAN_VALUES[c] for c in token.lower()]
+    return sum(-v if i + 1 < len(values) and v < values[i + 1] else v for i, v in enumerate(values))
+
+
+def _roman_edge_values(pages: List[List[str]]) -> List[set]:
+    """Per page, the values of lowercase Roman numerals found on its edge lines."""
+    return [
+        {_roman_value(line) for line in lines[:EDGE_LINES] + lines[-EDGE_LINES:] if line.strip().islower()} - {0}
+        for lines in pages
+    ]
+
+
+def _is_roman_page_number(line: str, page_index: int, edge_values: List[set]) -> bool:
+    """
+    A bare uppercase Roman numeral ("XII"), or a lowercase one ("xii") that
+    continues the numbering of a neighbouring page. One-word lines such as
+    "mix" or "li" are valid numerals too, but only count when in sequence.
+    """
+    token = line.strip()
+    value = _roman_value(token)
+    if not value:
+        return False
+    if token.isupper():
+        return True
+    if not token.islower():
+        return False
+    before = edge_values[page_index - 1] if page_index > 0 else set()
+    after = edge_values[page_index + 1] if page_index + 1 < len(edge_values) else set()
+    return value - 1 in before or value + 1 in after
+
+
+def _hyphen_joiner(pages: List[str]):
+    """
+    Replacement for a word broken across lines. Soft hyphens always join.
+    A hard hyphen joins only lowercase continuations, and is kept when the
+    document itself suggests a compound: the joined word never occurs but
+    the second part on its own ("known" after "well-") or the hyphenated form does.
+    """
+    text = "\n".join(p for p in pages if p)
+    vocabulary = Counter(word.lower() for word in _WORD_RE.findall(text))
+    hyphenated = set(m.group(0).lower() for m in re.finditer(r"\w+-\w+", text))
+
+    def join(match: re.Match) -> str:
+        left, hyphen, right = match.groups()
+        if hyphen != "-":
+            return left + right
+        if not right[0].islower():
+            return f"{left}-{right}"
+        if vocabulary[(left + right).lower()]:
+            return left + right
+        if vocabulary[right.lower()] > 1 or f"{left}-{right}".lower() in hyphenated:
+            return f"{left}-{right}"
+        return left + right
+
+    return join
+
+
+def _line_signature(line: str) -> str:
+    """Signature used to match a header/footer across pages (page numbers vary)."""
+    return re.sub(r"\d+", "#", " ".join(line.lower().split()))
+
+
+def _find_boilerplate(pages: List[List[str]]) -> set:
+    """Signatures of edge lines that repeat on enough pages to be headers/footers."""
+    if len(pages) < 3:
+        return set()
+
+    counts = Counter()
+    for lines in pages:
+        edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+        counts.update({_line_signature(line) for line in edges if line.strip()})
+
+    threshold = max(3, len(pages) // 2)
+    return {sig for sig, count in counts.items() if count >= threshold and sig.strip("# ")}
+
+
+def _clean_page(text: str) -> str:
+    """Page-local cleanup: artifacts and whitespace."""
+    text = _CONTROL_RE.sub("", text)
+    text = _LEADER_RE.sub(" ", text)
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in text.split("\n")]
+    text = "\n".join(lines)
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def normalize_pages(pages: List[str]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Strip boilerplate from page texts.
+
+    Removes running headers/footers (edge lines repeated across pages), bare
+    page numbers, hyphenated line breaks, dot leaders, control characters and
+    redundant whitespace. Returns the cleaned pages (same length and order as
+    the input) and statistics on how much text was removed.
+    """
+    # Re-join hyphenated words first so wrapped fragments are not mistaken for boilerplate
+    join = _hyphen_joiner(pages)
+    split_pages = [_HYPHEN_BREAK_RE.sub(join, page or "").split("\n") for page in pages]
+    boilerplate = _find_boilerplate(split_pages)
+    roman_edges = _roman_edge_values(split_pages)
+
+    cleaned = []
+    removed_lines = 0
+    for page_index, lines in enumerate(split_pages):
+        kept = []
+        last = len(lines) - 1
+        # On short pages every line would be an edge line, so nothing is stripped from them
+        has_edges = len(lines) > 2 * EDGE_LINES
+        for i, line in enumerate(lines):
+            near_edge = has_edges and (i < EDGE_LINES or i > last - EDGE_LINES)
+            if near_edge and (
+                _PAGE_NUMBER_RE.match(line)
+                or _is_roman_page_number(line, page_index, roman_edges)
+                or _line_signature(line) in boilerplate
+            ):
+                if line.strip():
+                    removed_lines += 1
+                continue
+            kept.append(line)
+        cleaned.append(_clean_page("\n".join(kept)))
+
+    before = "\n\n".join(p for p in pages if p)
+    after = "\n\n".join(p for p in cleaned if p)
+    tokens_before = estimate_tokens(before)
+    tokens_after = estimate_tokens(after)
+
+    stats = {
+        "chars_before": len(before),
+        "chars_after": len(after),
+        "chars_saved": len(before) - len(after),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+        "boilerplate_lines_removed": removed_lines
+    }
+    return cleaned, stats
@@ -0,0 +1,100 @@
+"""In-process cosine-similarity vector index (flat or IVF) built on NumPy."""
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so cosine similarity becomes a dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+def kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Spherical k-means on unit vectors.
+    Returns (centroids, assignment of each vector to a centroid).
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, vectors.shape[0])
+    centroids = vectors[rng.choice(vectors.shape[0], n_clusters, replace=False)].copy()
+    assignments = np.zeros(vectors.shape[0], dtype=np.int64)
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters so every list stays useful
+            sums[empty] = vectors[rng.choice(vectors.shape[0], int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+
+    assignments = np.argmax(vectors @ centroids.T, axis=1)
+    return centroids, assignments
+
+
+class VectorIndex:
+    """
+    Cosine top-k search over a matrix of unit vectors.
+
+    Small corpora are searched exhaustively with a single matrix-vector
+    product. Once the corpus reaches ivf_threshold vectors, a coarse
+    k-means quantizer (IVF) with ~sqrt(n) lists is built and each query
+    only scores the vectors in its nprobe closest lists.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        ivf_threshold: int = 20000,
+        nprobe: int = 8
+    ):
+        self.vectors = normalize_rows(vectors) if len(vectors) else np.zeros((0, 0), dtype=np.float32)
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[np.ndarray] = []
+
+        if self.vectors.shape[0] >= ivf_threshold:
+            n_lists = max(1, int(np.sqrt(self.vectors.shape[0])))
+            self.centroids, assignments = kmeans(self.vectors, n_lists)
+            order = np.argsort(assignments, kind="stable")
+            bounds = np.searchsorted(assignments[order], np.arange(self.centroids.shape[0] + 1))
+            self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.centroids.shape[0])]
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def uses_ivf(self) -> bool:
+        return self.centroids is not None
+
+    def search(self, query: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (row indices, cosine scores) of the k nearest vectors, best first."""
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = normalize_rows(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+
+        if not self.uses_ivf:
+            scores = self.vectors @ query
+            best = top_k(scores, k)
+            return best, scores[best]
+
+        probe = top_k(self.centroids @ query, self.nprobe)
+        candidates = np.concatenate([self.lists[i] for i in probe])
+        scores = self.vectors[candidates] @ query
+        best = top_k(scores, k)
+        return candidates[best], scores[best]
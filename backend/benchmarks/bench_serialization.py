@@ -0,0 +1,230 @@
+"""
+Benchmark response serialization for the hot list and detail endpoints.
+
+Compares the previous path, where pydantic response models are built field
+by field and then validated and encoded by FastAPI's default JSONResponse,
+with the direct document-to-bytes serializers in app.utils.serializers.
+Also checks that both paths produce the same JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --results 100 500 --questions 20 --repeat 20
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.document import DocumentResponse, DocumentListResponse
+from app.models.quiz import (
+    QuizResponse, QuizQuestion, QuizOption, ExamResultResponse, ExamResultSummary,
+    ExamResultListResponse, AnswerDetail
+)
+from app.utils.exam_answers import compact_answers, hydrate_answers
+from app.utils.serializers import dumps, document_dict, quiz_dict, result_dict, result_summary_dict
+
+
+def make_quiz(n_questions: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "user_id": ObjectId(),
+        "document_id": ObjectId(),
+        "title": "Cell Biology",
+        "difficulty": "medium",
+        "question_count": n_questions,
+        "questions": [
+            {
+                "id": str(ObjectId()),
+                "question_text": f"Which organelle is responsible for process number {i}?",
+                "options": [
+                    {"option_id": letter, "option_text": f"Option {letter} for question {i}"}
+                    for letter in "ABCD"
+                ],
+                "correct_answer": "ABCD"[i % 4],
+                "explanation": "The explanation names the organelle and why the others are wrong. " * 3
+            }
+            for i in range(n_questions)
+        ],
+        "created_at": datetime(2026, 1, 1, 12, 0, 0, 123000)
+    }
+
+
+def make_result(quiz: dict, i: int) -> dict:
+    selected = {q["id"]: "A" for q in quiz["questions"]}
+    graded = compact_answers(quiz["questions"], selected)
+    correct = sum(q["correct_answer"] == "A" for q in quiz["questions"])
+    total = len(quiz["questions"])
+    return {
+        "_id": ObjectId(),
+        "user_id": quiz["user_id"],
+        "quiz_id": quiz["_id"],
+        "document_id": quiz["document_id"],
+        "quiz_title": quiz["title"],
+        "total_questions": total,
+        "correct_answers": correct,
+        "wrong_answers": total - correct,
+        "score_percentage": round(correct / total * 100, 2),
+        "time_taken": 300 + i,
+        "difficulty": quiz["difficulty"],
+        **graded,
+        "weak_topics": ["Mitochondria", "Cell membrane"],
+        "weak_topics_status": "completed",
+        "completed_at": datetime(2026, 1, 1, 12, 0, 0, 456000) + timedelta(hours=i)
+    }
+
+
+def make_document(text_chars: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "user_id": ObjectId(),
+        "title": "Lecture notes",
+        "file_type": "pdf",
+        "file_size": 123456,
+        "extracted_text": ("Cells are the basic unit of life. " * (text_chars // 34 + 1))[:text_chars],
+        "summary": "A summary of the lecture. " * 20,
+        "easy_explanation": "An easy explanation. " * 30,
+        "key_concepts": [f"Concept {i}" for i in range(10)],
+        "wiki_context": [
+            {"term": f"Term {i}", "definition": "A definition. " * 5, "url": f"https://en.wikipedia.org/wiki/T{i}"}
+            for i in range(5)
+        ],
+        "page_count": 12,
+        "normalization_stats": {
+            "chars_before": 1000, "chars_after": 900, "chars_saved": 100,
+            "tokens_before": 250, "tokens_after": 225, "tokens_saved": 25, "boilerplate_lines_removed": 4
+        },
+        "processing_status": "completed",
+        "created_at": datetime(2026, 1, 1, 9, 0, 0, 789000),
+        "updated_at": datetime(2026, 1, 2, 9, 0, 0, 789000)
+    }
+
+
+# The previous path: hand-built pydantic models, as the routers constructed them
+
+def model_result_fields(result: dict) -> dict:
+    return dict(
+        id=str(result["_id"]), user_id=str(result["user_id"]), quiz_id=str(result["quiz_id"]),
+        document_id=str(result["document_id"]), quiz_title=result["quiz_title"],
+        total_questions=result["total_questions"], correct_answers=result["correct_answers"],
+        wrong_answers=result["wrong_answers"], score_percentage=result["score_percentage"],
+        time_taken=result["time_taken"], difficulty=result["difficulty"],
+        weak_topics=result.get("weak_topics", []), weak_topics_status=result["weak_topics_status"],
+        completed_at=result["completed_at"]
+    )
+
+
+def model_quiz(quiz: dict, include_answers: bool) -> QuizResponse:
+    return QuizResponse(
+        id=str(quiz["_id"]), user_id=str(quiz["user_id"]), document_id=str(quiz["document_id"]),
+        title=quiz["title"], difficulty=quiz["difficulty"], question_count=quiz["question_count"],
+        questions=[
+            QuizQuestion(
+                id=q["id"], question_text=q["question_text"],
+                options=[QuizOption(**opt) for opt in q["options"]],
+                correct_answer=q["correct_answer"] if include_answers else "",
+                explanation=q["explanation"] if include_answers else ""
+            )
+            for q in quiz["questions"]
+        ],
+        created_at=quiz["created_at"]
+    )
+
+
+def model_document(doc: dict) -> DocumentResponse:
+    return DocumentResponse(
+        id=str(doc["_id"]), user_id=str(doc["user_id"]), title=doc["title"], file_type=doc["file_type"],
+        file_size=doc["file_size"], extracted_text=doc.get("extracted_text"), summary=doc.get("summary"),
+        easy_explanation=doc.get("easy_explanation"), key_concepts=doc.get("key_concepts", []),
+        wiki_context=doc.get("wiki_context") or [], normalization_stats=doc.get("normalization_stats"),
+        page_count=doc.get("page_count", 0), processing_status=doc["processing_status"],
+        created_at=doc["created_at"], updated_at=doc["updated_at"]
+    )
+
+
+def encode_with_fastapi(response_model, build):
+    """Build the model, then validate and encode it the way FastAPI does for `response_model`."""
+    field = create_response_field(name="response", type_=response_model, mode="serialization")
+
+    def run() -> bytes:
+        # With is_coroutine=True nothing is awaited, so the coroutine finishes on its first step
+        coroutine = serialize_response(field=field, response_content=build())
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return JSONResponse(done.value).body
+        raise RuntimeError("serialize_response unexpectedly awaited")
+
+    return run
+
+
+def median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def cases(n_results: int, n_questions: int, n_documents: int, text_chars: int):
+    quiz = make_quiz(n_questions)
+    results = [make_result(quiz, i) for i in range(n_results)]
+    documents = [make_document(text_chars) for _ in range(n_documents)]
+
+    yield (
+        f"results list ({n_results})",
+        encode_with_fastapi(ExamResultListResponse, lambda: ExamResultListResponse(
+            results=[ExamResultSummary(**model_result_fields(r)) for r in results], total=len(results)
+        )),
+        lambda: dumps({"results": [result_summary_dict(r) for r in results], "total": len(results)})
+    )
+    yield (
+        f"result detail ({n_questions} answers)",
+        encode_with_fastapi(ExamResultResponse, lambda: ExamResultResponse(
+            **model_result_fields(results[0]),
+            answers=[AnswerDetail(**a) for a in hydrate_answers(results[0], quiz["questions"])]
+        )),
+        lambda: dumps(result_dict(results[0], quiz["questions"]))
+    )
+    yield (
+        f"quiz with answers ({n_questions} q)",
+        encode_with_fastapi(QuizResponse, lambda: model_quiz(quiz, include_answers=True)),
+        lambda: dumps(quiz_dict(quiz, include_answers=True))
+    )
+    yield (
+        f"documents list ({n_documents})",
+        encode_with_fastapi(DocumentListResponse, lambda: DocumentListResponse(
+            documents=[model_document(d) for d in documents], total=len(documents), page=1, limit=len(documents)
+        )),
+        lambda: dumps({
+            "documents": [document_dict(d) for d in documents],
+            "total": len(documents), "page": 1, "limit": len(documents)
+        })
+    )
+
+
+def run(result_counts, n_questions: int, n_documents: int, text_chars: int, repeat: int):
+    print(f"{'case':<28} {'pydantic ms':>12} {'direct ms':>10} {'speedup':>8} {'same json':>10}")
+    for n_results in result_counts:
+        for name, previous, direct in cases(n_results, n_questions, n_documents, text_chars):
+            same = json.loads(previous()) == json.loads(direct())
+            previous_ms = median_ms(previous, repeat)
+            direct_ms = median_ms(direct, repeat)
+            print(f"{name:<28} {previous_ms:>12.3f} {direct_ms:>10.3f} {previous_ms / direct_ms:>7.1f}x {str(same):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--text-chars", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.results, args.questions, args.documents, args.text_chars, args.repeat)
@@ -0,0 +1,66 @@
+"""
+Benchmark semantic search query latency against corpus size.
+
+Compares exhaustive (flat) cosine search with the IVF index used once a
+user's library grows past VECTOR_IVF_THRESHOLD, and reports IVF recall@k
+against the exact result.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_search
+    python -m benchmarks.bench_vector_search --sizes 1000 10000 100000 --dim 768
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.vector_index import VectorIndex
+
+
+def _latency_ms(index: VectorIndex, queries: np.ndarray, k: int) -> float:
+    """Median per-query latency in milliseconds."""
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def run(sizes, dim: int, k: int, n_queries: int, nprobe: int):
+    rng = np.random.default_rng(42)
+    print(f"{'vectors':>9} {'flat p50 ms':>12} {'ivf build s':>12} {'ivf p50 ms':>11} {'recall@' + str(k):>10}")
+
+    for size in sizes:
+        # Clustered data approximates real embeddings better than pure noise
+        centers = rng.standard_normal((max(1, size // 500), dim)).astype(np.float32)
+        vectors = centers[rng.integers(0, len(centers), size)] + 0.5 * rng.standard_normal((size, dim)).astype(np.float32)
+        queries = vectors[rng.integers(0, size, n_queries)] + 0.1 * rng.standard_normal((n_queries, dim)).astype(np.float32)
+
+        flat = VectorIndex(vectors, ivf_threshold=size + 1)
+        flat_ms = _latency_ms(flat, queries, k)
+
+        start = time.perf_counter()
+        ivf = VectorIndex(vectors, ivf_threshold=0, nprobe=nprobe)
+        build_s = time.perf_counter() - start
+        ivf_ms = _latency_ms(ivf, queries, k)
+
+        hits = 0
+        for query in queries:
+            exact = set(flat.search(query, k)[0].tolist())
+            approx = set(ivf.search(query, k)[0].tolist())
+            hits += len(exact & approx)
+        recall = hits / (k * n_queries)
+
+        print(f"{size:>9} {flat_ms:>12.3f} {build_s:>12.2f} {ivf_ms:>11.3f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000, 100000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.k, args.queries, args.nprobe)
@@ -0,0 +1,10 @@
+import client from './client';
+
+export const dashboardAPI = {
+    get: async (documentsLimit = 4, resultsLimit = 5) => {
+        const response = await client.get(
+            `/api/dashboard/?documents_limit=${documentsLimit}&results_limit=${resultsLimit}`
+        );
+        return response.data;
+    },
+};
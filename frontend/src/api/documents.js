@@ -27,6 +27,11 @@ export const documentsAPI = {
         await client.delete(`/api/documents/${id}`);
     },
 
+    getEnrichment: async (id) => {
+        const response = await client.get(`/api/documents/${id}/enrichment`);
+        return response.data;
+    },
+
     reprocess: async (id) => {
         const response = await client.post(`/api/documents/${id}/reprocess`);
         return response.data;
@@ -31,4 +31,9 @@ export const quizAPI = {
         const response = await client.get(`/api/quiz/results/${id}`);
         return response.data;
     },
+
+    getWeakTopics: async (id, wait = 0) => {
+        const response = await client.get(`/api/quiz/results/${id}/weak-topics?wait=${wait}`);
+        return response.data;
+    },
 };
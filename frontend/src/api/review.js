@@ -0,0 +1,13 @@
+import client from './client';
+
+export const reviewAPI = {
+    getDue: async (limit = 20) => {
+        const response = await client.get(`/api/review/due?limit=${limit}`);
+        return response.data;
+    },
+
+    submit: async (answers) => {
+        const response = await client.post('/api/review/submit', { answers });
+        return response.data;
+    },
+};
@@ -0,0 +1,9 @@
+import client from './client';
+
+export const searchAPI = {
+    search: async (query, limit = 10) => {
+        const params = new URLSearchParams({ q: query, limit });
+        const response = await client.get(`/api/search/?${params}`);
+        return response.data;
+    },
+};
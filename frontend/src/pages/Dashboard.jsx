@@ -3,9 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import Loader from '../components/common/Loader';
 import Card from '../components/common/Card';
 import Button from '../components/common/Button';
-import { progressAPI } from '../api/progress';
-import { documentsAPI } from '../api/documents';
-import { quizAPI } from '../api/quiz';
+import { dashboardAPI } from '../api/dashboard';
 import {
     AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer
 } from 'recharts';
@@ -69,15 +67,11 @@ export default function Dashboard() {
 
     const fetchDashboardData = async () => {
         try {
-            const [overviewData, docsData, resultsData] = await Promise.all([
-                progressAPI.getOverview(),
-                documentsAPI.list(1, 4),
-                quizAPI.listResults()
-            ]);
+            const data = await dashboardAPI.get();
 
-            setOverview(overviewData);
-            setRecentDocs(docsData.documents || []);
-            setRecentResults((resultsData.results || []).slice(0, 5));
+            setOverview(data.overview);
+            setRecentDocs(data.recent_documents || []);
+            setRecentResults(data.recent_results || []);
         } catch (error) {
             console.error('Failed to fetch dashboard data:', error);
         } finally {
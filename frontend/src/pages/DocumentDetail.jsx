@@ -26,13 +26,32 @@ export default function DocumentDetail() {
     const [showQuizModal, setShowQuizModal] = useState(false);
     const [creatingQuiz, setCreatingQuiz] = useState(false);
     const [reprocessing, setReprocessing] = useState(false);
+    const [enrichmentRequested, setEnrichmentRequested] = useState(false);
 
     useEffect(() => {
         fetchDocument();
+        setEnrichmentRequested(false);
         const interval = setInterval(fetchDocument, 5000);
         return () => clearInterval(interval);
     }, [id]);
 
+    // Easy explanation and wiki context may be generated lazily on first view
+    useEffect(() => {
+        if (!document || enrichmentRequested) return;
+        if (document.processing_status !== 'completed' || document.easy_explanation) return;
+
+        setEnrichmentRequested(true);
+        documentsAPI.getEnrichment(id)
+            .then((enrichment) => {
+                setDocument((prev) => prev && ({
+                    ...prev,
+                    easy_explanation: enrichment.easy_explanation,
+                    wiki_context: enrichment.wiki_context,
+                }));
+            })
+            .catch((error) => console.error('Failed to fetch enrichment:', error));
+    }, [document, enrichmentRequested, id]);
+
     const fetchDocument = async () => {
         try {
             const data = await documentsAPI.get(id);
@@ -27,6 +27,33 @@ export default function ExamResults() {
         fetchResult();
     }, [id]);
 
+    // Weak topics are analyzed after submission; long-poll until they are ready
+    useEffect(() => {
+        if (!result || result.weak_topics_status !== 'pending') return;
+
+        let cancelled = false;
+        const poll = async () => {
+            try {
+                const analysis = await quizAPI.getWeakTopics(id, 20);
+                if (cancelled) return;
+                if (analysis.status === 'pending') {
+                    poll();
+                    return;
+                }
+                setResult((prev) => prev && ({
+                    ...prev,
+                    weak_topics: analysis.weak_topics,
+                    weak_topics_status: analysis.status,
+                }));
+            } catch (error) {
+                console.error('Failed to fetch weak topics:', error);
+            }
+        };
+        poll();
+
+        return () => { cancelled = true; };
+    }, [result?.weak_topics_status, id]);
+
     const fetchResult = async () => {
         try {
             const data = await quizAPI.getResult(id);
@@ -139,6 +166,11 @@ export default function ExamResults() {
             </div>
 
             {/* Weak Topics */}
+            {result.weak_topics_status === 'pending' && (
+                <Card className="p-6">
+                    <Loader text="Analyzing topics to review..." />
+                </Card>
+            )}
             {result.weak_topics && result.weak_topics.length > 0 && (
                 <Card className="p-6">
                     <h2 className="text-lg font-bold mb-4 flex items-center gap-2 text-slate-900">